@@ -0,0 +1,86 @@
+import argparse
+import contextlib
+import io
+import pickle
+import tracemalloc
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+
+from front_end import SHAPES
+
+from lox import Lox
+from lox.flat_ast import FlatParser, FlatResolver
+from lox.parser import Parser
+from lox.regex_scanner import RegexScanner
+from lox.resolver import Resolver
+
+PROGRAMS_DIR = Path(__file__).parent / "lox"
+
+
+def count_nodes(node: object) -> int:
+    if isinstance(node, list):
+        return sum(count_nodes(child) for child in node)
+    if not is_dataclass(node):
+        return 0
+    return 1 + sum(count_nodes(getattr(node, field.name)) for field in fields(node))
+
+
+def ast_memory(source: str) -> tuple[int, int, int]:
+    # the tokens are scanned first, so only the tree itself is counted
+    tokens = RegexScanner(source).scan_tokens()
+    tracemalloc.start()
+    try:
+        statements = Parser(tokens).parse()
+        Resolver().resolve(statements)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    serialized = len(pickle.dumps(statements, protocol=pickle.HIGHEST_PROTOCOL))
+    return count_nodes(statements), size, serialized
+
+
+def flat_memory(source: str) -> tuple[int, int]:
+    tokens = RegexScanner(source).scan_tokens()
+    tracemalloc.start()
+    try:
+        ast = FlatParser(tokens).parse()
+        FlatResolver(ast).resolve(ast.items(ast.program))
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, len(ast.dump())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--program", default="binary_trees")
+    args = parser.parse_args()
+    print(
+        f"{'shape':<12}{'nodes':>10}{'objects':>12}{'per node':>10}{'flat':>12}"
+        f"{'per node':>10}{'pickled':>12}{'dumped':>12}"
+    )
+    for shape, generate in SHAPES.items():
+        source = generate(args.size, 12, 40)
+        nodes, size, serialized = ast_memory(source)
+        flat_size, dumped = flat_memory(source)
+        print(
+            f"{shape:<12}{nodes:>10,}{size / 1024:>9,.0f}KiB{size / nodes:>9.0f}B"
+            f"{flat_size / 1024:>9,.0f}KiB{flat_size / nodes:>9.0f}B"
+            f"{serialized / 1024:>9,.0f}KiB{dumped / 1024:>9,.0f}KiB"
+        )
+
+    lox = Lox(stats=True)
+    source = (PROGRAMS_DIR / f"{args.program}.lox").read_text()
+    with contextlib.redirect_stdout(io.StringIO()):
+        lox.run(source)
+    assert lox.stats is not None
+    print(
+        f"\n{args.program}: peak {lox.stats.peak_memory / 1024:,.0f} KiB, "
+        f"{lox.stats.environments:,} environments, "
+        f"{lox.stats.instances:,} instances"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import contextlib
+import io
+import statistics
+import textwrap
+import time
+
+from lox import ENGINES, Lox
+
+PROGRAMS = {
+    "fib": textwrap.dedent(
+        """\
+        fun fib(n) {
+            if (n < 2) return n;
+            return fib(n - 2) + fib(n - 1);
+        }
+        print fib(20);
+        """
+    ),
+    "arithmetic": textwrap.dedent(
+        """\
+        var sum = 0;
+        for (var i = 0; i < 100000; i = i + 1) {
+            sum = sum + i * 2 - i / 2;
+        }
+        print sum;
+        """
+    ),
+    "locals": textwrap.dedent(
+        """\
+        {
+            var a = 1;
+            var b = 2;
+            var sum = 0;
+            for (var i = 0; i < 30000; i = i + 1) {
+                var c = a + b;
+                {
+                    var d = c * i;
+                    sum = sum + d - a;
+                }
+            }
+            print sum;
+        }
+        """
+    ),
+    "methods": textwrap.dedent(
+        """\
+        class Counter {
+            init() {
+                this.count = 0;
+            }
+            inc() {
+                this.count = this.count + 1;
+            }
+        }
+        var counter = Counter();
+        for (var i = 0; i < 30000; i = i + 1) {
+            counter.inc();
+        }
+        print counter.count;
+        """
+    ),
+    "instantiate": textwrap.dedent(
+        """        class Base {
+            init(x) {
+                this.x = x;
+            }
+        }
+        class Middle < Base {}
+        class Leaf < Middle {}
+        for (var i = 0; i < 20000; i = i + 1) {
+            Leaf(i);
+        }
+        """
+    ),
+}
+
+
+def measure(engine: str, source: str, repeat: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        lox = Lox(engine=engine)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            lox.run(source)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'program':<12}" + "".join(f"{engine:>12}" for engine in ENGINES))
+    for name, source in PROGRAMS.items():
+        medians = [
+            statistics.median(measure(engine, source, args.repeat))
+            for engine in ENGINES
+        ]
+        print(f"{name:<12}" + "".join(f"{m * 1000:>10.1f}ms" for m in medians))
+
+
+if __name__ == "__main__":
+    main()
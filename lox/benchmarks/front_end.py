@@ -0,0 +1,202 @@
+import argparse
+import gc
+import math
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+import lox.error as error
+from lox.parser import Parser
+from lox.regex_scanner import RegexScanner
+from lox.resolver import Resolver
+from lox.scanner import Scanner
+
+
+def functions(size: int, depth: int, terms: int) -> str:
+    lines = ["fun f0(a, b, c) { return a; }"]
+    for i in range(1, size):
+        lines.append(
+            f"fun f{i}(a, b, c) {{\n"
+            f"    var x = a + b * c;\n"
+            f"    if (x > {i}) {{ return x - 1; }}\n"
+            f"    return f{i - 1}(x, b, c);\n"
+            f"}}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+NESTED = ("if (x < {0})", "while (x < {0})", "for (var i{0} = 0; i{0} < 2;)")
+
+
+def nesting(size: int, depth: int, terms: int) -> str:
+    lines = ["var x = 0;"]
+    for i in range(size):
+        indent = ""
+        for level in range(depth):
+            header = NESTED[level % len(NESTED)].format(level)
+            lines.append(f"{indent}{header} {{")
+            indent += "    "
+        lines.append(f"{indent}x = x + {i};")
+        for _ in range(depth):
+            indent = indent[:-4]
+            lines.append(f"{indent}}}")
+    return "\n".join(lines) + "\n"
+
+
+def expressions(size: int, depth: int, terms: int) -> str:
+    operators = ["+", "-", "*", "/", "<", "==", "and", "or"]
+    lines = ["var a = 1;"]
+    for i in range(size):
+        parts = [f"(a + {j})" if j % 5 == 0 else str(j) for j in range(terms)]
+        expression = parts[0]
+        for j, part in enumerate(parts[1:]):
+            expression += f" {operators[j % len(operators)]} {part}"
+        lines.append(f"var e{i} = {expression};")
+    return "\n".join(lines) + "\n"
+
+
+def classes(size: int, depth: int, terms: int) -> str:
+    lines = [
+        "class C0 {\n"
+        "    init(x) { this.v0 = x; }\n"
+        "    m0() { return this.v0; }\n"
+        "}"
+    ]
+    for i in range(1, size):
+        lines.append(
+            f"class C{i} < C{i - 1} {{\n"
+            f"    init(x) {{ super.init(x); this.v{i} = x; }}\n"
+            f"    m{i}() {{ return super.m{i - 1}() + this.v{i}; }}\n"
+            f"}}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+SHAPES: dict[str, Callable[[int, int, int], str]] = {
+    "functions": functions,
+    "nesting": nesting,
+    "expressions": expressions,
+    "classes": classes,
+}
+
+SCANNERS = {
+    "regex": RegexScanner,
+    "scanner": Scanner,
+}
+
+PHASES = ("scan", "parse", "resolve")
+
+
+def run_phases(
+    scanner_class: type[RegexScanner] | type[Scanner], source: str
+) -> dict[str, Callable[[], Any]]:
+    # Each phase runs on the output of the previous one, so it is timed alone.
+    state: dict[str, Any] = {}
+
+    def scan():
+        state["tokens"] = scanner_class(source).scan_tokens()
+
+    def parse():
+        state["statements"] = Parser(state["tokens"]).parse()
+
+    def resolve():
+        Resolver().resolve(state["statements"])
+
+    return {"scan": scan, "parse": parse, "resolve": resolve}
+
+
+def measure(
+    scanner_class: type[RegexScanner] | type[Scanner], source: str, repeat: int
+) -> tuple[int, dict[str, float], dict[str, int]]:
+    best = {phase: math.inf for phase in PHASES}
+    tokens = 0
+    for _ in range(repeat):
+        steps = run_phases(scanner_class, source)
+        for phase in PHASES:
+            gc.collect()
+            start = time.perf_counter()
+            steps[phase]()
+            best[phase] = min(best[phase], time.perf_counter() - start)
+        tokens = len(scanner_class(source).scan_tokens())
+    if error.had_error:
+        raise SystemExit("the generated program has errors")
+    peak: dict[str, int] = {}
+    steps = run_phases(scanner_class, source)
+    tracemalloc.start()
+    try:
+        for phase in PHASES:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            steps[phase]()
+            peak[phase] = tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return tokens, best, peak
+
+
+def exponent(points: list[tuple[int, float]]) -> float:
+    # least-squares slope of log(time) against log(tokens); 1 means linear
+    xs = [math.log(n) for n, _ in points]
+    ys = [math.log(t) for _, t in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    return covariance / sum((x - mean_x) ** 2 for x in xs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shape", action="append", choices=SHAPES)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--depth", type=int, default=12, help="nesting depth")
+    parser.add_argument("--terms", type=int, default=40, help="expression length")
+    parser.add_argument("--scanner", choices=SCANNERS, default="regex")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="how far the scaling exponent may exceed 1 and still count as linear",
+    )
+    args = parser.parse_args()
+    scanner_class = SCANNERS[args.scanner]
+    sizes = sorted(args.sizes)
+    print(
+        f"{'shape':<12}{'size':>6}{'lines':>9}{'tokens':>10}  {'phase':<8}"
+        f"{'time':>10}{'lines/s':>12}{'tokens/s':>12}{'peak':>11}"
+    )
+    superlinear: list[str] = []
+    exponents: list[tuple[str, str, float]] = []
+    for shape in args.shape or list(SHAPES):
+        times: dict[str, list[tuple[int, float]]] = {phase: [] for phase in PHASES}
+        for size in sizes:
+            source = SHAPES[shape](size, args.depth, args.terms)
+            lines = source.count("\n")
+            tokens, best, peak = measure(scanner_class, source, args.repeat)
+            for phase in PHASES:
+                times[phase].append((tokens, best[phase]))
+                print(
+                    f"{shape:<12}{size:>6}{lines:>9,}{tokens:>10,}  {phase:<8}"
+                    f"{best[phase] * 1000:>8.1f}ms{lines / best[phase]:>12,.0f}"
+                    f"{tokens / best[phase]:>12,.0f}{peak[phase] / 1024:>8,.0f}KiB"
+                )
+        if len(sizes) < 2:
+            continue
+        for phase in PHASES:
+            slope = exponent(times[phase])
+            exponents.append((shape, phase, slope))
+            if slope > 1 + args.tolerance:
+                superlinear.append(f"{shape}/{phase}")
+    print(f"\n{'shape':<12}{'phase':<8}{'exponent':>10}")
+    for shape, phase, slope in exponents:
+        verdict = "linear" if slope <= 1 + args.tolerance else "SUPERLINEAR"
+        print(f"{shape:<12}{phase:<8}{slope:>10.2f}  {verdict}")
+    if superlinear:
+        print(f"superlinear phases: {', '.join(superlinear)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import statistics
+import textwrap
+import time
+from typing import Any
+
+from lox import ENGINES, Lox
+from lox.return_class import Return
+
+SOURCE = textwrap.dedent(
+    """\
+    fun fib(n) {
+        if (n < 2) return n;
+        return fib(n - 2) + fib(n - 1);
+    }
+    var result = fib({n});
+    """
+)
+
+raised = 0
+
+
+def counting_init(self: Return, value: Any, *args: object) -> None:
+    global raised
+    raised += 1
+    Exception.__init__(self, *args)
+    self.value = value
+
+
+def main():
+    global raised
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-n", type=int, default=20)
+    args = parser.parse_args()
+    Return.__init__ = counting_init  # type: ignore[method-assign]
+    source = SOURCE.replace("{n}", str(args.n))
+    print(f"{'engine':<10}{'time':>12}{'raised returns':>16}")
+    for engine in ENGINES:
+        timings: list[float] = []
+        for _ in range(args.repeat):
+            raised = 0
+            lox = Lox(engine=engine)
+            start = time.perf_counter()
+            lox.run(source)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        print(f"{engine:<10}{median * 1000:>10.1f}ms{raised:>16,}")
+
+
+if __name__ == "__main__":
+    main()
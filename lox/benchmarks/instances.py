@@ -0,0 +1,52 @@
+import argparse
+import timeit
+import tracemalloc
+
+from lox.lox_class import LoxClass
+from lox.lox_instance import LoxInstance
+from lox.token_type import Token, TokenType
+
+FIELDS = [Token(TokenType.IDENTIFIER, name, None, 1) for name in ("x", "y", "z")]
+
+
+def memory_per_instance(klass: LoxClass, count: int) -> float:
+    tracemalloc.start()
+    try:
+        instances: list[LoxInstance] = []
+        for i in range(count):
+            instance = LoxInstance(klass)
+            value = float(i)
+            for field in FIELDS:
+                instance.set(field, value)
+            instances.append(instance)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # the float values are shared by every field of an instance
+    return (size - count * 24) / count
+
+
+def access_time(klass: LoxClass, number: int) -> tuple[float, float]:
+    instance = LoxInstance(klass)
+    for field in FIELDS:
+        instance.set(field, 1.0)
+    y = FIELDS[1]
+    get = min(timeit.repeat(lambda: instance.get(y), number=number, repeat=5))
+    set_ = min(timeit.repeat(lambda: instance.set(y, 2.0), number=number, repeat=5))
+    return get / number, set_ / number
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--number", type=int, default=200_000)
+    args = parser.parse_args()
+    klass = LoxClass("Point", None, {})
+    size = memory_per_instance(klass, args.count)
+    get, set_ = access_time(klass, args.number)
+    print(f"memory per instance with 3 fields: {size:.0f} B")
+    print(f"get: {get * 1e9:.0f} ns, set: {set_ * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
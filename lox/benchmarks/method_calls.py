@@ -0,0 +1,70 @@
+import argparse
+import statistics
+import textwrap
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from lox import ENGINES, Lox
+from lox.closure_interpreter import CompiledFunction
+from lox.lox_function import LoxFunction
+from lox.transpiler import PyFunction
+
+SOURCE = textwrap.dedent(
+    """\
+    class Vector {
+        init(x, y) {
+            this.x = x;
+            this.y = y;
+        }
+        dot(other) {
+            return this.x * other.x + this.y * other.y;
+        }
+    }
+    class Scaled < Vector {
+        dot(other) {
+            return super.dot(other) * 2;
+        }
+    }
+    var a = Scaled(1, 2);
+    var b = Vector(3, 4);
+    var total = 0;
+    for (var i = 0; i < 20000; i = i + 1) {
+        total = total + a.dot(b);
+    }
+    """
+)
+
+binds: Counter[str] = Counter()
+
+
+def counting(name: str, bind: Callable[..., Any]) -> Callable[..., Any]:
+    def wrapper(self: Any, instance: Any) -> Any:
+        binds[name] += 1
+        return bind(self, instance)
+
+    return wrapper
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for cls in (LoxFunction, CompiledFunction, PyFunction):
+        cls.bind = counting(cls.__name__, cls.bind)
+    print(f"{'engine':<10}{'time':>12}{'bound methods':>16}")
+    for engine in ENGINES:
+        timings: list[float] = []
+        for _ in range(args.repeat):
+            binds.clear()
+            lox = Lox(engine=engine)
+            start = time.perf_counter()
+            lox.run(SOURCE)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        print(f"{engine:<10}{median * 1000:>10.1f}ms{sum(binds.values()):>16,}")
+
+
+if __name__ == "__main__":
+    main()
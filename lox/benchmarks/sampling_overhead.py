@@ -0,0 +1,47 @@
+import argparse
+import contextlib
+import io
+import time
+
+from compare_engines import PROGRAMS
+
+from lox import Lox
+from lox.sampler import DEFAULT_RATE, Sampler
+
+
+def run(engine: str, source: str, rate: int | None) -> float:
+    lox = Lox(engine=engine)
+    sampler = Sampler(rate) if rate is not None else None
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if sampler is None:
+            lox.run(source)
+        else:
+            with sampler:
+                lox.run(source)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE)
+    args = parser.parse_args()
+    print(f"{'program':<12}{'engine':<10}{'plain':>12}{'sampled':>12}{'overhead':>10}")
+    for name, source in PROGRAMS.items():
+        for engine in ("tree", "closure"):
+            # interleaved and best-of, so machine noise affects both sides alike
+            plain: list[float] = []
+            sampled: list[float] = []
+            for _ in range(args.repeat):
+                plain.append(run(engine, source, None))
+                sampled.append(run(engine, source, args.rate))
+            overhead = min(sampled) / min(plain) - 1
+            print(
+                f"{name:<12}{engine:<10}{min(plain) * 1000:>10.1f}ms"
+                f"{min(sampled) * 1000:>10.1f}ms{overhead:>10.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import statistics
+import textwrap
+import time
+
+from lox.regex_scanner import RegexScanner
+from lox.scanner import Scanner
+
+SNIPPET = textwrap.dedent(
+    """\
+    // a small class with some arithmetic
+    class Point {
+        init(x, y) {
+            this.x = x;
+            this.y = y;
+        }
+        length() {
+            return this.x * this.x + this.y * this.y >= 10.25 and !nil;
+        }
+    }
+    var origin = Point(0, 1.5);
+    print "length: " + origin.length();
+    """
+)
+
+SCANNERS = {
+    "scanner": Scanner,
+    "regex": RegexScanner,
+}
+
+
+def measure(
+    scanner_class: type[Scanner] | type[RegexScanner], source: str, repeat: int
+) -> tuple[int, float]:
+    timings: list[float] = []
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(scanner_class(source).scan_tokens())
+        timings.append(time.perf_counter() - start)
+    return count, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--copies", type=int, default=200)
+    args = parser.parse_args()
+    source = SNIPPET * args.copies
+    for name, scanner_class in SCANNERS.items():
+        count, median = measure(scanner_class, source, args.repeat)
+        print(f"{name:<10}{count / median:>14,.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
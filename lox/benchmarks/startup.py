@@ -0,0 +1,65 @@
+import argparse
+import os
+import statistics
+import tempfile
+import textwrap
+import time
+
+from lox import Lox
+
+PRELUDE_ENTRY = textwrap.dedent(
+    """\
+    class Shape{i} {{
+        init(width, height) {{
+            this.width = width;
+            this.height = height;
+        }}
+        area() {{
+            return this.width * this.height;
+        }}
+    }}
+    fun scale{i}(shape, factor) {{
+        var result = Shape{i}(shape.width * factor, shape.height * factor);
+        for (var step = 0; step < factor; step = step + 1) {{
+            if (step == factor - 1 or result.area() > 1000) return result;
+        }}
+        return result;
+    }}
+    """
+)
+
+
+def write_script(directory: str, size: int) -> str:
+    path = os.path.join(directory, "prelude.lox")
+    with open(path, "w") as f:
+        for i in range(size):
+            f.write(PRELUDE_ENTRY.format(i=i))
+        f.write("var done = scale0(Shape0(1, 2), 3).area();\n")
+    return path
+
+
+def measure(path: str, use_cache: bool, repeat: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Lox().run_file(path, use_cache=use_cache)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--size", type=int, default=500)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_script(directory, args.size)
+        cold = statistics.median(measure(path, False, args.repeat))
+        Lox().run_file(path)
+        warm = statistics.median(measure(path, True, args.repeat))
+    print(f"{'cold':<8}{cold * 1000:>10.1f}ms")
+    print(f"{'warm':<8}{warm * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from lox import ENGINES, Lox
+
+try:
+    from lox2.vm import VM
+except ImportError:
+    VM = None
+
+PROGRAMS_DIR = Path(__file__).parent / "lox"
+
+
+def runners() -> dict[str, Callable[[str], None]]:
+    engines: dict[str, Callable[[str], None]] = {
+        engine: lambda source, engine=engine: Lox(engine=engine).run(source)
+        for engine in ENGINES
+    }
+    if VM is not None:
+        engines["lox2"] = lambda source: VM().interpret(source)
+    return engines
+
+
+def measure(run: Callable[[str], None], source: str) -> tuple[float, str]:
+    out = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        run(source)
+    return time.perf_counter() - start, out.getvalue()
+
+
+def compare(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    threshold: float,
+) -> list[str]:
+    regressions: list[str] = []
+    print(f"\n{'program':<18}{'engine':<10}{'baseline':>12}{'now':>12}{'change':>10}")
+    for program, engines in results.items():
+        for engine, result in engines.items():
+            before = baseline.get(program, {}).get(engine)
+            if before is None:
+                continue
+            change = result["median"] / before["median"] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{program}/{engine}")
+            print(
+                f"{program:<18}{engine:<10}{before['median'] * 1000:>10.1f}ms"
+                f"{result['median'] * 1000:>10.1f}ms{change:>10.1%}{flag}"
+            )
+    return regressions
+
+
+def main():
+    available = runners()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("programs", nargs="*", help="names of programs to run")
+    parser.add_argument("--engine", action="append", choices=available)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", metavar="PATH", help="write the results to PATH")
+    parser.add_argument(
+        "--baseline", metavar="PATH", help="compare with results saved by --json"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="fractional slowdown of a median that counts as a regression",
+    )
+    args = parser.parse_args()
+    engines = args.engine or list(available)
+    paths = sorted(PROGRAMS_DIR.glob("*.lox"))
+    if args.programs:
+        paths = [path for path in paths if path.stem in args.programs]
+
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    mismatches: list[str] = []
+    print(f"{'program':<18}{'engine':<10}{'median':>12}{'stdev':>12}")
+    for path in paths:
+        source = path.read_text()
+        expected: str | None = None
+        results[path.stem] = {}
+        for engine in engines:
+            timings: list[float] = []
+            for _ in range(args.repeat):
+                elapsed, output = measure(available[engine], source)
+                timings.append(elapsed)
+                if expected is None:
+                    expected = output
+                elif output != expected:
+                    mismatches.append(f"{path.stem}/{engine}")
+            median = statistics.median(timings)
+            stdev = statistics.stdev(timings) if len(timings) > 1 else 0.0
+            results[path.stem][engine] = {"median": median, "stdev": stdev}
+            print(
+                f"{path.stem:<18}{engine:<10}{median * 1000:>10.1f}ms"
+                f"{stdev * 1000:>10.1f}ms"
+            )
+
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            document = {
+                "python": platform.python_version(),
+                "repeat": args.repeat,
+                "results": results,
+            }
+            json.dump(document, f, indent=2)
+    regressions: list[str] = []
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+    for mismatch in sorted(set(mismatches)):
+        print(f"output differs from the first engine: {mismatch}", file=sys.stderr)
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+    if mismatches or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
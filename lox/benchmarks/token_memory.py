@@ -0,0 +1,63 @@
+import argparse
+import textwrap
+import tracemalloc
+from dataclasses import dataclass
+
+from lox.regex_scanner import RegexScanner
+from lox.token_type import Token, TokenType
+
+CHUNK = textwrap.dedent(
+    """\
+    fun area{i}(width, height) {{
+        var result = width * height;
+        if (result > 100) print "large " + result;
+        return result;
+    }}
+    var total{i} = area{i}(3, 4.5) + area{i}(10, 20);
+    """
+)
+
+
+# the token representation before spans, kept here for comparison
+@dataclass(frozen=True)
+class DataclassToken:
+    type: TokenType
+    lexeme: str
+    literal: str | float | None
+    line: int
+
+
+def span_tokens(source: str) -> list[Token]:
+    return RegexScanner(source).scan_tokens()
+
+
+def dataclass_tokens(source: str) -> list[DataclassToken]:
+    return [
+        DataclassToken(t.type, t.source[t.start : t.end], t.literal, t.line)
+        for t in RegexScanner(source).iter_tokens()
+    ]
+
+
+def retained(scan, source: str) -> tuple[int, int]:
+    tracemalloc.start()
+    try:
+        tokens = scan(source)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return len(tokens), size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=2000)
+    args = parser.parse_args()
+    source = "".join(CHUNK.format(i=i) for i in range(args.copies))
+    print(f"source: {len(source) / 1024:,.0f} KiB")
+    for name, scan in (("dataclass", dataclass_tokens), ("span", span_tokens)):
+        count, size = retained(scan, source)
+        print(f"{name:<10}{count:>10,} tokens{size / 1024:>12,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,205 @@
+import argparse
+import contextlib
+import json
 import sys
+import tracemalloc
+from typing import Callable, Iterator
 
+import lox.cache as cache
 import lox.error as error
+from lox.ast_printer import print_stmt
+from lox.cache import Program
+from lox.closure_interpreter import ClosureInterpreter
+from lox.debugger import CommandLineDebugger, Debugger, DebuggingInterpreter
+from lox.flat_ast import FlatAst, FlatParser, FlatResolver
+from lox.flat_interpreter import FlatInterpreter
 from lox.interpreter import Interpreter
+from lox.optimizer import Optimizer
 from lox.parser import Parser
+from lox.profiler import Profiler, ProfilingInterpreter
+from lox.regex_scanner import RegexScanner
 from lox.resolver import Resolver
-from lox.scanner import Scanner
+from lox.sampler import DEFAULT_RATE, Sampler
+from lox.stack_interpreter import StackInterpreter
+from lox.stats import CountingInterpreter, Stats
+from lox.transpiler import PythonInterpreter
+
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "python": PythonInterpreter,
+    "stack": StackInterpreter,
+    "flat": FlatInterpreter,
+}
 
 
 def main():
-    lox = Lox()
-    if len(sys.argv) > 2:
-        print("Usage: lox [script]")
-        sys.exit(64)
-    elif len(sys.argv) == 2:
-        lox.run_file(sys.argv[1])
-    else:
-        lox.run_prompt()
+    parser = argparse.ArgumentParser(prog="lox")
+    parser.add_argument("script", nargs="?")
+    parser.add_argument("--engine", choices=ENGINES, default="tree")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="fold constants and drop dead code before running",
+    )
+    parser.add_argument(
+        "--dump-optimized",
+        action="store_true",
+        help="print the optimized syntax tree instead of running the script",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print per-function call counts and times to stderr at exit",
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="PATH",
+        help="write the profile to PATH as JSON instead",
+    )
+    parser.add_argument(
+        "--sample-profile",
+        metavar="PATH",
+        help="sample the Lox call stack and write collapsed stacks to PATH",
+    )
+    parser.add_argument(
+        "--sample-rate",
+        type=int,
+        default=DEFAULT_RATE,
+        metavar="HZ",
+        help=f"samples per second for --sample-profile (default {DEFAULT_RATE})",
+    )
+    parser.add_argument(
+        "--stats",
+        choices=["json"],
+        help="print runtime counters and peak memory to stderr at exit",
+    )
+    parser.add_argument(
+        "--break",
+        dest="breakpoints",
+        action="append",
+        type=int,
+        default=[],
+        metavar="LINE",
+        help="debug the script, pausing at LINE (can be repeated)",
+    )
+    parser.add_argument(
+        "--step",
+        action="store_true",
+        help="debug the script, pausing at its first line",
+    )
+    args = parser.parse_args()
+    profile = args.profile or args.profile_json is not None
+    if args.engine == "flat" and (args.optimize or args.dump_optimized):
+        parser.error("the optimizer doesn't support the flat engine")
+    if profile and args.engine != "tree":
+        parser.error("profiling is only supported by the tree engine")
+    if args.stats is not None and args.engine != "tree":
+        parser.error("--stats is only supported by the tree engine")
+    if args.stats is not None and profile:
+        parser.error("--stats and --profile cannot be combined")
+    debugger = None
+    if args.breakpoints or args.step:
+        if args.engine != "tree":
+            parser.error("debugging is only supported by the tree engine")
+        if profile or args.stats is not None:
+            parser.error("debugging cannot be combined with --profile or --stats")
+        debugger = CommandLineDebugger()
+        debugger.breakpoints.update(args.breakpoints)
+        debugger.stepping = args.step
+    if args.sample_profile is not None and args.engine not in ("tree", "closure"):
+        parser.error("sampling is only supported by the tree and closure engines")
+    lox = Lox(
+        engine=args.engine,
+        optimize=args.optimize or args.dump_optimized,
+        profile=profile,
+        stats=args.stats is not None,
+        debugger=debugger,
+    )
+    sampler = None
+    if args.sample_profile is not None:
+        sampler = Sampler(args.sample_rate)
+        sampler.start()
+    try:
+        if args.script is not None and args.dump_optimized:
+            lox.dump_file(args.script)
+        elif args.script is not None:
+            lox.run_file(args.script, use_cache=not args.no_cache)
+        else:
+            lox.run_prompt()
+    finally:
+        if sampler is not None:
+            sampler.stop()
+            sampler.write(args.sample_profile)
+        if lox.profiler is not None and args.profile_json is not None:
+            lox.profiler.dump(args.profile_json)
+        elif lox.profiler is not None:
+            lox.profiler.report()
+        if lox.stats is not None:
+            json.dump(lox.stats.as_dict(), sys.stderr, indent=2)
+            print(file=sys.stderr)
 
 
 class Lox:
-    def __init__(self):
-        self.interpreter = Interpreter()
-        self.resolver = Resolver(self.interpreter)
+    def __init__(
+        self,
+        engine: str = "tree",
+        optimize: bool = False,
+        profile: bool = False,
+        stats: bool = False,
+        debugger: Debugger | None = None,
+    ):
+        self.profiler: Profiler | None = None
+        self.stats: Stats | None = None
+        self.debugger = debugger
+        if profile + stats + (debugger is not None) > 1:
+            raise ValueError("profiling, stats and debugging cannot be combined")
+        if debugger is not None:
+            if engine != "tree":
+                raise ValueError("debugging is only supported by the tree engine")
+            self.interpreter = DebuggingInterpreter(debugger)
+        elif stats:
+            if engine != "tree":
+                raise ValueError("stats are only supported by the tree engine")
+            self.stats = Stats()
+            self.interpreter = CountingInterpreter(self.stats)
+        elif profile:
+            if engine != "tree":
+                raise ValueError("profiling is only supported by the tree engine")
+            self.profiler = Profiler()
+            self.interpreter = ProfilingInterpreter(self.profiler)
+        else:
+            self.interpreter = ENGINES[engine]()
+        self.flat = isinstance(self.interpreter, FlatInterpreter)
+        if self.flat and optimize:
+            raise ValueError("the optimizer doesn't support the flat engine")
+        self.resolver = Resolver()
+        self.optimize = optimize
         error.had_error = False
         error.had_runtime_error = False
 
-    def run_file(self, path: str):
+    def run_file(self, path: str, use_cache: bool = True):
         with open(path) as f:
             s = f.read()
+        if use_cache:
+            self.run(s, lambda source: self.cached_front_end(path, source))
+        else:
             self.run(s)
         if error.had_error:
             sys.exit(65)
         if error.had_runtime_error:
             sys.exit(70)
 
+    def dump_file(self, path: str):
+        with open(path) as f:
+            statements = self.front_end(f.read())
+        if statements is None:
+            sys.exit(65)
+        for statement in statements:
+            if statement is not None:
+                print(print_stmt(statement))
+
     def run_prompt(self):
         while True:
             try:
@@ -46,14 +212,96 @@ class Lox:
             self.run(s)
             error.had_error = False
 
-    def run(self, source: str):
-        scanner = Scanner(source)
-        tokens = scanner.scan_tokens()
-        parser = Parser(tokens)
+    def run(
+        self,
+        source: str,
+        front_end: Callable[[str], Program | None] | None = None,
+    ):
+        front_end = front_end or self.front_end
+        if self.debugger is not None:
+            self.debugger.source_lines = source.splitlines()
+        with self.traced():
+            if isinstance(self.interpreter, PythonInterpreter):
+                self.interpreter.run(source, front_end)
+                return
+            statements = front_end(source)
+            if statements is None:
+                return
+            self.interpreter.interpret(statements)
+
+    @contextlib.contextmanager
+    def traced(self) -> Iterator[None]:
+        if self.stats is None:
+            yield
+            return
+        # leave tracing on if someone else (say, pytest) had already started it
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            yield
+            _, peak = tracemalloc.get_traced_memory()
+            self.stats.peak_memory = max(self.stats.peak_memory, peak)
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    def front_end(self, source: str) -> Program | None:
+        statements = self.analyze(source)
+        if statements is None:
+            return None
+        return self.optimized(statements)
+
+    def analyze(self, source: str) -> Program | None:
+        scanner = RegexScanner(source)
+        if self.flat:
+            return self.analyze_flat(scanner)
+        parser = Parser(scanner.iter_tokens())
         statements = parser.parse()
         if error.had_error:
-            return
-        self.resolver.resolve(statements)
+            return None
+        for index, statement in enumerate(statements):
+            # one at a time, so that a statement nested too deeply for the
+            # resolver's recursion is reported at its line
+            try:
+                self.resolver.resolve([statement])
+            except RecursionError:
+                self.resolver = Resolver()
+                error.error_nesting(statements, index)
+                return None
         if error.had_error:
-            return
-        self.interpreter.interpret(statements)
+            return None
+        return statements
+
+    def analyze_flat(self, scanner: RegexScanner) -> FlatAst | None:
+        ast = FlatParser(scanner.iter_tokens()).parse()
+        if error.had_error:
+            return None
+        resolver = FlatResolver(ast)
+        start = 0
+        for node in ast.items(ast.program):
+            try:
+                resolver.resolve([node])
+            except RecursionError:
+                # a statement's rows follow those of the one before it
+                error.error(ast.line(start, node + 1), "Too much nesting.")
+                return None
+            start = node + 1
+        if error.had_error:
+            return None
+        return ast
+
+    def cached_front_end(self, path: str, source: str) -> Program | None:
+        extension = "loxf" if self.flat else "loxc"
+        statements = cache.load(path, source, extension)
+        if statements is None:
+            statements = self.analyze(source)
+            if statements is None:
+                return None
+            cache.store(path, source, statements, extension)
+        return self.optimized(statements)
+
+    def optimized(self, statements: Program) -> Program:
+        if self.optimize:
+            return Optimizer().optimize(statements)
+        return statements
@@ -1,6 +1,7 @@
 from functools import singledispatch
 
 import lox.expr as expr
+import lox.stmt as stmt
 
 
 @singledispatch
@@ -8,11 +9,27 @@ def print_ast(expr: expr.Expr) -> str:
     raise NotImplementedError(f"print_ast() is not implemented for {type(expr)}")
 
 
+@print_ast.register
+def _(expr: expr.Assign) -> str:
+    return f"(= {expr.name.lexeme} {print_ast(expr.value)})"
+
+
 @print_ast.register
 def _(expr: expr.Binary) -> str:
     return f"({expr.operator.lexeme} {print_ast(expr.left)} {print_ast(expr.right)})"
 
 
+@print_ast.register
+def _(expr: expr.Call) -> str:
+    arguments = "".join(f" {print_ast(argument)}" for argument in expr.arguments)
+    return f"(call {print_ast(expr.callee)}{arguments})"
+
+
+@print_ast.register
+def _(expr: expr.Get) -> str:
+    return f"(. {print_ast(expr.obj)} {expr.name.lexeme})"
+
+
 @print_ast.register
 def _(expr: expr.Grouping) -> str:
     return f"(group {print_ast(expr.expression)})"
@@ -22,10 +39,105 @@ def _(expr: expr.Grouping) -> str:
 def _(expr: expr.Literal) -> str:
     if expr.value is None:
         return "nil"
+    elif isinstance(expr.value, bool):
+        return "true" if expr.value else "false"
+    elif isinstance(expr.value, str):
+        return f'"{expr.value}"'
     else:
         return f"{expr.value}"
 
 
+@print_ast.register
+def _(expr: expr.Logical) -> str:
+    return f"({expr.operator.lexeme} {print_ast(expr.left)} {print_ast(expr.right)})"
+
+
+@print_ast.register
+def _(expr: expr.Set) -> str:
+    return f"(= (. {print_ast(expr.obj)} {expr.name.lexeme}) {print_ast(expr.value)})"
+
+
+@print_ast.register
+def _(expr: expr.Super) -> str:
+    return f"(super {expr.method.lexeme})"
+
+
+@print_ast.register
+def _(expr: expr.This) -> str:
+    return "this"
+
+
 @print_ast.register
 def _(expr: expr.Unary) -> str:
     return f"({expr.operator.lexeme} {print_ast(expr.right)})"
+
+
+@print_ast.register
+def _(expr: expr.Variable) -> str:
+    return expr.name.lexeme
+
+
+@singledispatch
+def print_stmt(stmt: stmt.Stmt) -> str:
+    raise NotImplementedError(f"print_stmt() is not implemented for {type(stmt)}")
+
+
+def print_body(statements: list[stmt.Stmt | None]) -> str:
+    return "".join(f" {print_stmt(s)}" for s in statements if s is not None)
+
+
+@print_stmt.register
+def _(stmt: stmt.Block) -> str:
+    return f"(block{print_body(stmt.statements)})"
+
+
+@print_stmt.register
+def _(stmt: stmt.Class) -> str:
+    superclass = ""
+    if stmt.superclass is not None:
+        superclass = f" < {stmt.superclass.name.lexeme}"
+    methods = "".join(f" {print_stmt(method)}" for method in stmt.methods)
+    return f"(class {stmt.name.lexeme}{superclass}{methods})"
+
+
+@print_stmt.register
+def _(stmt: stmt.Expression) -> str:
+    return f"(; {print_ast(stmt.expression)})"
+
+
+@print_stmt.register
+def _(stmt: stmt.Function) -> str:
+    params = " ".join(param.lexeme for param in stmt.params)
+    return f"(fun {stmt.name.lexeme} ({params}){print_body(stmt.body)})"
+
+
+@print_stmt.register
+def _(stmt: stmt.If) -> str:
+    text = f"(if {print_ast(stmt.condition)} {print_stmt(stmt.then_branch)}"
+    if stmt.else_branch is not None:
+        text += f" {print_stmt(stmt.else_branch)}"
+    return text + ")"
+
+
+@print_stmt.register
+def _(stmt: stmt.Print) -> str:
+    return f"(print {print_ast(stmt.expression)})"
+
+
+@print_stmt.register
+def _(stmt: stmt.Return) -> str:
+    if stmt.value is None:
+        return "(return)"
+    return f"(return {print_ast(stmt.value)})"
+
+
+@print_stmt.register
+def _(stmt: stmt.Var) -> str:
+    if stmt.initializer is None:
+        return f"(var {stmt.name.lexeme})"
+    return f"(var {stmt.name.lexeme} {print_ast(stmt.initializer)})"
+
+
+@print_stmt.register
+def _(stmt: stmt.While) -> str:
+    return f"(while {print_ast(stmt.condition)} {print_stmt(stmt.body)})"
@@ -0,0 +1,55 @@
+import contextlib
+import hashlib
+import os
+import pickle
+import sys
+
+import lox.stmt as stmt
+from lox.flat_ast import FlatAst
+
+CACHE_DIR = "__loxcache__"
+MAGIC = b"LOXC"
+# bump whenever the AST, the resolver's annotations or the format change
+VERSION = 4
+
+Program = list[stmt.Stmt | None] | FlatAst
+
+
+def cache_path(path: str, extension: str = "loxc") -> str:
+    # a FlatAst is cached beside the tree, as .loxf
+    directory, filename = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(filename)[0]
+    tag = sys.implementation.cache_tag
+    return os.path.join(directory, CACHE_DIR, f"{stem}.{tag}.{extension}")
+
+
+def header(source: str) -> bytes:
+    digest = hashlib.sha256(source.encode()).digest()
+    return MAGIC + VERSION.to_bytes(4, "little") + digest
+
+
+def load(path: str, source: str, extension: str = "loxc") -> Program | None:
+    expected = header(source)
+    try:
+        with open(cache_path(path, extension), "rb") as f:
+            if f.read(len(expected)) != expected:
+                return None
+            return pickle.load(f)
+    except Exception:
+        # a stale or corrupt file can fail to unpickle in many ways (a renamed
+        # module, a changed node, a tree too deep); all of them are a miss
+        return None
+
+
+def store(path: str, source: str, statements: Program, extension: str = "loxc"):
+    target = cache_path(path, extension)
+    temp = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(temp, "wb") as f:
+            f.write(header(source))
+            pickle.dump(statements, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, target)
+    except (OSError, RecursionError, pickle.PicklingError):
+        with contextlib.suppress(OSError):
+            os.remove(temp)
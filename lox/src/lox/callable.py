@@ -8,6 +8,8 @@ if TYPE_CHECKING:
 
 
 class LoxCallable(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def arity(self) -> int:
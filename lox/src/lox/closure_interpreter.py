@@ -0,0 +1,586 @@
+from __future__ import annotations
+
+from functools import singledispatchmethod
+from typing import Any, Callable
+
+import lox.error as error
+import lox.expr as expr
+import lox.stmt as stmt
+from lox.callable import LoxCallable
+from lox.environment import Environment, GlobalEnvironment
+from lox.error import LoxRuntimeError
+from lox.interpreter import is_equal, is_truthy, stringify
+from lox.lox_class import LoxClass
+from lox.lox_function import LoxFunction
+from lox.lox_instance import LoxInstance
+from lox.native_function import Clock
+from lox.return_class import Return, TailCall
+from lox.token_type import Token, TokenType
+
+Thunk = Callable[[Environment], Any]
+
+NUMBER = (int, float)
+
+
+class CompiledFunction(LoxFunction):
+    __slots__ = ("body",)
+
+    def __init__(
+        self,
+        declaration: stmt.Function,
+        closure: Environment | GlobalEnvironment,
+        is_initializer: bool,
+        body: list[Thunk],
+    ) -> None:
+        super().__init__(declaration, closure, is_initializer)
+        self.body = body
+
+    def run(self, interpreter: Any, environment: Environment) -> None:
+        for statement in self.body:
+            statement(environment)
+
+    def bind(self, instance: LoxInstance) -> LoxFunction:
+        environment = Environment(self.closure, [instance])
+        return CompiledFunction(
+            self.declaration, environment, self.is_initializer, self.body
+        )
+
+
+class ClosureInterpreter:
+    # Compiles each resolved node into a Python closure once, so that running the
+    # program does no type dispatch and no depth lookups.
+    def __init__(self) -> None:
+        self.global_env = GlobalEnvironment()
+        self.global_env.define("clock", Clock())
+        self.scope_depth = 0
+
+    def interpret(self, statements: list[stmt.Stmt]):
+        program: list[Thunk] = []
+        for index, statement in enumerate(statements):
+            try:
+                program.append(self.compile(statement))
+            except RecursionError:
+                error.error_nesting(statements, index)
+                return
+        try:
+            for statement in program:
+                statement(self.global_env)
+        except LoxRuntimeError as e:
+            error.error_runtime(e)
+
+    def compile_block(self, statements: list[stmt.Stmt | None]) -> list[Thunk]:
+        self.scope_depth += 1
+        try:
+            return [self.compile(statement) for statement in statements]
+        finally:
+            self.scope_depth -= 1
+
+    def compile_variable(self, name: Token, expr: expr.This | expr.Variable) -> Thunk:
+        distance = expr.depth
+        slot = expr.slot
+        if distance is None:
+            global_env = self.global_env
+            return lambda env: global_env.get(name)
+        if distance == 0:
+            return lambda env: env.values[slot]
+        if distance == 1:
+            return lambda env: env.enclosing.values[slot]
+        return lambda env: env.ancestor(distance).values[slot]
+
+    def compile_define(self, name: Token, value: Thunk) -> Thunk:
+        if self.scope_depth == 0:
+            lexeme = name.lexeme
+            global_env = self.global_env
+
+            def define_global(env: Environment) -> None:
+                global_env.define(lexeme, value(env))
+
+            return define_global
+
+        def define(env: Environment) -> None:
+            env.values.append(value(env))
+
+        return define
+
+    @singledispatchmethod
+    def compile(self, node: stmt.Stmt | expr.Expr | None) -> Thunk:
+        raise NotImplementedError(
+            f"ClosureInterpreter.compile() is not implemented for {type(node)}"
+        )
+
+    # statements
+    @compile.register
+    def _(self, node: stmt.Var) -> Thunk:
+        if node.initializer is None:
+            return self.compile_define(node.name, lambda env: None)
+        return self.compile_define(node.name, self.compile(node.initializer))
+
+    @compile.register
+    def _(self, node: stmt.Expression) -> Thunk:
+        return self.compile(node.expression)
+
+    @compile.register
+    def _(self, node: stmt.Function) -> Thunk:
+        body = self.compile_block(node.body)
+        return self.compile_define(
+            node.name, lambda env: CompiledFunction(node, env, False, body)
+        )
+
+    @compile.register
+    def _(self, node: stmt.If) -> Thunk:
+        condition = self.compile(node.condition)
+        then_branch = self.compile(node.then_branch)
+        if node.else_branch is None:
+
+            def if_then(env: Environment) -> None:
+                value = condition(env)
+                if value is not None and value is not False:
+                    then_branch(env)
+
+            return if_then
+
+        else_branch = self.compile(node.else_branch)
+
+        def if_else(env: Environment) -> None:
+            value = condition(env)
+            if value is not None and value is not False:
+                then_branch(env)
+            else:
+                else_branch(env)
+
+        return if_else
+
+    @compile.register
+    def _(self, node: stmt.Print) -> Thunk:
+        expression = self.compile(node.expression)
+
+        def print_(env: Environment) -> None:
+            print(stringify(expression(env)))
+
+        return print_
+
+    @compile.register
+    def _(self, node: stmt.Return) -> Thunk:
+        if node.value is None:
+
+            def return_nil(env: Environment) -> None:
+                raise Return(None)
+
+            return return_nil
+
+        if node.tail_call:
+            assert isinstance(node.value, expr.Call)
+            target = self.compile_call_target(node.value)
+
+            def return_call(env: Environment) -> None:
+                function, this, arguments = target(env)
+                if isinstance(function, LoxFunction):
+                    raise Return(TailCall(function, this, arguments))
+                raise Return(function(self, arguments))
+
+            return return_call
+
+        value = self.compile(node.value)
+
+        def return_(env: Environment) -> None:
+            raise Return(value(env))
+
+        return return_
+
+    @compile.register
+    def _(self, node: stmt.While) -> Thunk:
+        condition = self.compile(node.condition)
+        body = self.compile(node.body)
+
+        def while_(env: Environment) -> None:
+            value = condition(env)
+            while value is not None and value is not False:
+                body(env)
+                value = condition(env)
+
+        return while_
+
+    @compile.register
+    def _(self, node: stmt.Block) -> Thunk:
+        statements = self.compile_block(node.statements)
+
+        def block(env: Environment) -> None:
+            environment = Environment(env)
+            for statement in statements:
+                statement(environment)
+
+        return block
+
+    @compile.register
+    def _(self, node: stmt.Class) -> Thunk:
+        name = node.name.lexeme
+        superclass_expr = node.superclass
+        superclass_value = (
+            self.compile(superclass_expr) if superclass_expr is not None else None
+        )
+        methods = [(method, self.compile_block(method.body)) for method in node.methods]
+
+        def class_(env: Environment) -> LoxClass:
+            superclass = None
+            if superclass_expr is not None and superclass_value is not None:
+                superclass = superclass_value(env)
+                if not isinstance(superclass, LoxClass):
+                    raise LoxRuntimeError(
+                        superclass_expr.name, "Superclass must be a class."
+                    )
+            closure = env
+            if superclass is not None:
+                closure = Environment(env, [superclass])
+            table: dict[str, LoxFunction] = {}
+            for method, body in methods:
+                lexeme = method.name.lexeme
+                table[lexeme] = CompiledFunction(
+                    method, closure, lexeme == "init", body
+                )
+            return LoxClass(name, superclass, table)
+
+        return self.compile_define(node.name, class_)
+
+    # expressions
+    @compile.register
+    def _(self, node: expr.Assign) -> Thunk:
+        value = self.compile(node.value)
+        name = node.name
+        distance = node.depth
+        slot = node.slot
+        if distance is None:
+            global_env = self.global_env
+
+            def assign_global(env: Environment) -> Any:
+                result = value(env)
+                global_env.assign(name, result)
+                return result
+
+            return assign_global
+
+        if distance == 0:
+
+            def assign_local(env: Environment) -> Any:
+                result = env.values[slot] = value(env)
+                return result
+
+            return assign_local
+
+        def assign(env: Environment) -> Any:
+            result = env.ancestor(distance).values[slot] = value(env)
+            return result
+
+        return assign
+
+    @compile.register
+    def _(self, node: expr.Literal) -> Thunk:
+        value = node.value
+        return lambda env: value
+
+    @compile.register
+    def _(self, node: expr.Logical) -> Thunk:
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        if node.operator.type == TokenType.OR:
+
+            def or_(env: Environment) -> Any:
+                value = left(env)
+                if value is not None and value is not False:
+                    return value
+                return right(env)
+
+            return or_
+
+        def and_(env: Environment) -> Any:
+            value = left(env)
+            if value is None or value is False:
+                return value
+            return right(env)
+
+        return and_
+
+    @compile.register
+    def _(self, node: expr.Set) -> Thunk:
+        obj_value = self.compile(node.obj)
+        value = self.compile(node.value)
+        name = node.name
+
+        def set_(env: Environment) -> Any:
+            obj = obj_value(env)
+            if not isinstance(obj, LoxInstance):
+                raise LoxRuntimeError(name, "Only instances have fields.")
+            result = value(env)
+            obj.set(name, result)
+            return result
+
+        return set_
+
+    @compile.register
+    def _(self, node: expr.Super) -> Thunk:
+        find = self.compile_super_method(node)
+
+        def super_(env: Environment) -> Any:
+            obj, method = find(env)
+            return method.bind(obj)
+
+        return super_
+
+    def compile_super_method(
+        self, node: expr.Super
+    ) -> Callable[[Environment], tuple[LoxInstance, LoxFunction]]:
+        distance = node.depth
+        assert distance is not None
+        method_name = node.method
+
+        def find(env: Environment) -> tuple[LoxInstance, LoxFunction]:
+            superclass = env.get_at(distance, 0)
+            obj = env.get_at(distance - 1, 0)
+            method = superclass.find_method(method_name.lexeme)
+            if method is None:
+                raise LoxRuntimeError(
+                    method_name, f"Undefined property '{method_name.lexeme}'."
+                )
+            return obj, method
+
+        return find
+
+    @compile.register
+    def _(self, node: expr.This) -> Thunk:
+        return self.compile_variable(node.keyword, node)
+
+    @compile.register
+    def _(self, node: expr.Grouping) -> Thunk:
+        return self.compile(node.expression)
+
+    @compile.register
+    def _(self, node: expr.Unary) -> Thunk:
+        right = self.compile(node.right)
+        operator = node.operator
+        match operator.type:
+            case TokenType.MINUS:
+
+                def negate(env: Environment) -> Any:
+                    value = right(env)
+                    if isinstance(value, NUMBER):
+                        return -value
+                    raise LoxRuntimeError(operator, "Operand must be a number.")
+
+                return negate
+            case TokenType.BANG:
+
+                def not_(env: Environment) -> Any:
+                    return not is_truthy(right(env))
+
+                return not_
+            case _:
+                raise Exception("Must not be reached")
+
+    @compile.register
+    def _(self, node: expr.Variable) -> Thunk:
+        return self.compile_variable(node.name, node)
+
+    @compile.register
+    def _(self, node: expr.Binary) -> Thunk:
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        operator = node.operator
+        match operator.type:
+            case TokenType.BANG_EQUAL:
+                return lambda env: not is_equal(left(env), right(env))
+            case TokenType.EQUAL_EQUAL:
+                return lambda env: is_equal(left(env), right(env))
+            case TokenType.GREATER:
+
+                def greater(env: Environment) -> Any:
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, NUMBER) and isinstance(b, NUMBER):
+                        return a > b
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+                return greater
+            case TokenType.GREATER_EQUAL:
+
+                def greater_equal(env: Environment) -> Any:
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, NUMBER) and isinstance(b, NUMBER):
+                        return a >= b
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+                return greater_equal
+            case TokenType.LESS:
+
+                def less(env: Environment) -> Any:
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, NUMBER) and isinstance(b, NUMBER):
+                        return a < b
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+                return less
+            case TokenType.LESS_EQUAL:
+
+                def less_equal(env: Environment) -> Any:
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, NUMBER) and isinstance(b, NUMBER):
+                        return a <= b
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+                return less_equal
+            case TokenType.MINUS:
+
+                def minus(env: Environment) -> Any:
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, NUMBER) and isinstance(b, NUMBER):
+                        return a - b
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+                return minus
+            case TokenType.PLUS:
+
+                def plus(env: Environment) -> Any:
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, NUMBER) and isinstance(b, NUMBER):
+                        return a + b
+                    if isinstance(a, str) and isinstance(b, str):
+                        return a + b
+                    raise LoxRuntimeError(
+                        operator, "Operands must be two numbers or two strings."
+                    )
+
+                return plus
+            case TokenType.SLASH:
+
+                def slash(env: Environment) -> Any:
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, NUMBER) and isinstance(b, NUMBER):
+                        return a / b
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+                return slash
+            case TokenType.STAR:
+
+                def star(env: Environment) -> Any:
+                    a = left(env)
+                    b = right(env)
+                    if isinstance(a, NUMBER) and isinstance(b, NUMBER):
+                        return a * b
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+                return star
+            case _:
+                raise Exception("Must not be reached")
+
+    @compile.register
+    def _(self, node: expr.Call) -> Thunk:
+        if isinstance(node.callee, expr.Get | expr.Super):
+            return self.compile_invoke(node, node.callee)
+        callee_value = self.compile(node.callee)
+        arguments_values = [self.compile(argument) for argument in node.arguments]
+        paren = node.paren
+
+        def call(env: Environment) -> Any:
+            callee = callee_value(env)
+            arguments = [argument(env) for argument in arguments_values]
+            if not isinstance(callee, LoxCallable):
+                raise LoxRuntimeError(paren, "Can only call functions and classes.")
+            if len(arguments) != callee.arity:
+                raise LoxRuntimeError(
+                    paren,
+                    f"Expected {callee.arity} arguments but got {len(arguments)}",
+                )
+            return callee(self, arguments)
+
+        return call
+
+    def compile_invoke(self, node: expr.Call, callee: expr.Get | expr.Super) -> Thunk:
+        # obj.method(...) and super.method(...) run the method with `this` passed
+        # in directly, so no bound CompiledFunction is allocated for the call.
+        if isinstance(callee, expr.Super):
+            find = self.compile_super_method(callee)
+        else:
+            find = self.compile_property(callee)
+        arguments_values = [self.compile(argument) for argument in node.arguments]
+        paren = node.paren
+
+        def invoke(env: Environment) -> Any:
+            this, function = find(env)
+            arguments = [argument(env) for argument in arguments_values]
+            if not isinstance(function, LoxCallable):
+                raise LoxRuntimeError(paren, "Can only call functions and classes.")
+            if len(arguments) != function.arity:
+                raise LoxRuntimeError(
+                    paren,
+                    f"Expected {function.arity} arguments but got {len(arguments)}",
+                )
+            if this is None:
+                return function(self, arguments)
+            return function.invoke(self, this, arguments)
+
+        return invoke
+
+    def compile_call_target(
+        self, node: expr.Call
+    ) -> Callable[[Environment], tuple[LoxCallable, LoxInstance | None, list[Any]]]:
+        callee = node.callee
+        if isinstance(callee, expr.Super):
+            find = self.compile_super_method(callee)
+        elif isinstance(callee, expr.Get):
+            find = self.compile_property(callee)
+        else:
+            callee_value = self.compile(callee)
+
+            def find(env: Environment) -> tuple[LoxInstance | None, Any]:
+                return None, callee_value(env)
+
+        arguments_values = [self.compile(argument) for argument in node.arguments]
+        paren = node.paren
+
+        def target(
+            env: Environment,
+        ) -> tuple[LoxCallable, LoxInstance | None, list[Any]]:
+            this, function = find(env)
+            arguments = [argument(env) for argument in arguments_values]
+            if not isinstance(function, LoxCallable):
+                raise LoxRuntimeError(paren, "Can only call functions and classes.")
+            if len(arguments) != function.arity:
+                raise LoxRuntimeError(
+                    paren,
+                    f"Expected {function.arity} arguments but got {len(arguments)}",
+                )
+            return function, this, arguments
+
+        return target
+
+    def compile_property(
+        self, node: expr.Get
+    ) -> Callable[[Environment], tuple[LoxInstance | None, Any]]:
+        obj_value = self.compile(node.obj)
+        name = node.name
+
+        def find(env: Environment) -> tuple[LoxInstance | None, Any]:
+            obj = obj_value(env)
+            if not isinstance(obj, LoxInstance):
+                raise LoxRuntimeError(name, "Only instances have properties.")
+            value, is_method = obj.lookup(name)
+            return (obj, value) if is_method else (None, value)
+
+        return find
+
+    @compile.register
+    def _(self, node: expr.Get) -> Thunk:
+        obj_value = self.compile(node.obj)
+        name = node.name
+
+        def get(env: Environment) -> Any:
+            obj = obj_value(env)
+            if isinstance(obj, LoxInstance):
+                return obj.get(name)
+            raise LoxRuntimeError(name, "Only instances have properties.")
+
+        return get
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import sys
+import weakref
+from typing import Any, TextIO
+
+import lox.stmt as stmt
+from lox.environment import Environment, GlobalEnvironment
+from lox.error import LoxRuntimeError
+from lox.interpreter import Interpreter, stringify
+from lox.lox_class import LoxClass
+from lox.lox_function import LoxFunction
+from lox.return_class import Completion, TailCall
+
+
+def statement_line(node: stmt.Stmt) -> int | None:
+    match node:
+        case stmt.Var() | stmt.Function() | stmt.Class():
+            return node.name.line
+        case stmt.Return():
+            return node.keyword.line
+        case stmt.If() | stmt.While() | stmt.Expression() | stmt.Print():
+            return node.token.line if node.token is not None else None
+    return None
+
+
+def declared_names(statements: list[stmt.Stmt | None]) -> list[str]:
+    # the resolver gives a scope's declarations slots in this order
+    return [
+        statement.name.lexeme
+        for statement in statements
+        if isinstance(statement, (stmt.Var, stmt.Function, stmt.Class))
+    ]
+
+
+class Debugger:
+    # The hooks a DebuggingInterpreter calls. By default it pauses at line
+    # breakpoints and after a step; subclasses decide what a pause does.
+    def __init__(self) -> None:
+        self.breakpoints: set[int] = set()
+        self.stepping = False
+        self.source_lines: list[str] = []
+        self.position: tuple[int, int] | None = None
+
+    def on_statement(
+        self, interpreter: DebuggingInterpreter, node: stmt.Stmt, line: int | None
+    ):
+        # Several statements can share a line; stop at the first of them.
+        if line is None:
+            return
+        position = (line, len(interpreter.calls))
+        if position == self.position:
+            return
+        self.position = position
+        if self.stepping or line in self.breakpoints:
+            self.stepping = False
+            self.pause(interpreter, line)
+
+    def on_call(
+        self,
+        interpreter: DebuggingInterpreter,
+        function: LoxFunction,
+        arguments: list[Any],
+    ):
+        pass
+
+    def on_return(
+        self, interpreter: DebuggingInterpreter, function: LoxFunction, value: Any
+    ):
+        pass
+
+    def on_error(self, interpreter: DebuggingInterpreter, error: LoxRuntimeError):
+        pass
+
+    def pause(self, interpreter: DebuggingInterpreter, line: int):
+        pass
+
+
+class CommandLineDebugger(Debugger):
+    def __init__(self, commands: TextIO = sys.stdin, out: TextIO = sys.stderr):
+        super().__init__()
+        self.commands = commands
+        self.out = out
+
+    def on_error(self, interpreter: DebuggingInterpreter, error: LoxRuntimeError):
+        self.write(f"runtime error: {error.args[0]}")
+        self.pause(interpreter, error.token.line)
+
+    def pause(self, interpreter: DebuggingInterpreter, line: int):
+        if 0 < line <= len(self.source_lines):
+            self.write(f"line {line}: {self.source_lines[line - 1].strip()}")
+        else:
+            self.write(f"line {line}")
+        while True:
+            self.out.write("(debug) ")
+            self.out.flush()
+            command = self.commands.readline()
+            if not command:
+                # nobody is left to ask, so run to the end
+                self.breakpoints.clear()
+                return
+            name, _, argument = command.strip().partition(" ")
+            match name:
+                case "s" | "step":
+                    self.stepping = True
+                    return
+                case "c" | "continue":
+                    return
+                case "b" | "break" if argument.isdigit():
+                    self.breakpoints.add(int(argument))
+                case "d" | "delete" if argument.isdigit():
+                    self.breakpoints.discard(int(argument))
+                case "p" | "print" if argument:
+                    self.print_variable(interpreter, argument)
+                case "env":
+                    for depth, scope in enumerate(interpreter.scopes()):
+                        values = ", ".join(
+                            f"{name} = {stringify(value)}"
+                            for name, value in scope.items()
+                        )
+                        self.write(f"[{depth}] {values}")
+                case "bt" | "where":
+                    for function in reversed(interpreter.calls):
+                        name = function.declaration.name
+                        self.write(f"{name.lexeme} (line {name.line})")
+                    self.write("<script>")
+                case _:
+                    self.write(
+                        "commands: step, continue, break LINE, delete LINE, "
+                        "print NAME, env, where"
+                    )
+
+    def print_variable(self, interpreter: DebuggingInterpreter, name: str):
+        for scope in interpreter.scopes():
+            if name in scope:
+                self.write(f"{name} = {stringify(scope[name])}")
+                return
+        self.write(f"no variable '{name}'")
+
+    def write(self, text: str):
+        print(text, file=self.out)
+
+
+class DebugFunction(LoxFunction):
+    __slots__ = ()
+
+    def run(
+        self, interpreter: DebuggingInterpreter, environment: Environment
+    ) -> Completion | TailCall | None:
+        declaration = self.declaration
+        interpreter.names[environment] = [
+            param.lexeme for param in declaration.params
+        ] + declared_names(declaration.body)
+        debugger = interpreter.debugger
+        debugger.on_call(interpreter, self, list(environment.values))
+        interpreter.calls.append(self)
+        try:
+            completion = super().run(interpreter, environment)
+        finally:
+            interpreter.calls.pop()
+        if self.is_initializer:
+            value = environment.enclosing.values[0]
+        else:
+            value = completion.value if isinstance(completion, Completion) else None
+        debugger.on_return(interpreter, self, value)
+        return completion
+
+
+class DebuggingInterpreter(Interpreter):
+    # The tree interpreter with the debugger's hooks on every statement and
+    # call. It's only used while a debugger is attached, so the plain
+    # Interpreter never checks for one.
+    function_type = DebugFunction
+
+    def __init__(self, debugger: Debugger) -> None:
+        super().__init__()
+        self.debugger = debugger
+        self.calls: list[LoxFunction] = []
+        # local environments only hold values; these are their slots' names
+        self.names: weakref.WeakKeyDictionary[
+            Environment, list[str]
+        ] = weakref.WeakKeyDictionary()
+        self.error: LoxRuntimeError | None = None
+
+    def execute(self, node: stmt.Stmt) -> Completion | TailCall | None:
+        self.debugger.on_statement(self, node, statement_line(node))
+        try:
+            if isinstance(node, stmt.Return) and node.tail_call:
+                # run as an ordinary call so that every frame shows up in calls
+                return Completion(self.evaluate(node.value))
+            return super().execute(node)
+        except LoxRuntimeError as e:
+            # report the error once, from the statement that raised it
+            if e is not self.error:
+                self.error = e
+                self.debugger.on_error(self, e)
+            raise
+
+    def execute_block(
+        self,
+        statements: list[stmt.Stmt | None],
+        environment: Environment | GlobalEnvironment,
+    ) -> Completion | TailCall | None:
+        if isinstance(environment, Environment) and environment not in self.names:
+            self.names[environment] = declared_names(statements)
+        return super().execute_block(statements, environment)
+
+    def scopes(self) -> list[dict[str, Any]]:
+        # innermost first, ending with the globals
+        scopes: list[dict[str, Any]] = []
+        environment = self.environment
+        while isinstance(environment, Environment):
+            names = self.names.get(environment)
+            if names is None:
+                # blocks and calls are named as they run; what's left are the
+                # environments that hold just `this` or a subclass's `super`
+                value = environment.values[0] if environment.values else None
+                names = ["super" if isinstance(value, LoxClass) else "this"]
+            scopes.append(
+                {
+                    names[slot] if slot < len(names) else f"#{slot}": value
+                    for slot, value in enumerate(environment.values)
+                }
+            )
+            environment = environment.enclosing
+        scopes.append(dict(self.global_env.values))
+        return scopes
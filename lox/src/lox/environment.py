@@ -1,14 +1,46 @@
 from __future__ import annotations
 
-from typing import Any, Self
+from typing import Any
 
 from lox.error import LoxRuntimeError
 from lox.token_type import Token
 
 
 class Environment:
-    def __init__(self, enclosing: Self | None = None) -> None:
+    # Local scopes hold their variables in declaration order, so the slot the
+    # resolver assigns to a declaration is its index in `values`. Weak
+    # references let the debugger label scopes without keeping them alive.
+    __slots__ = ("enclosing", "values", "__weakref__")
+
+    def __init__(
+        self,
+        enclosing: Environment | GlobalEnvironment,
+        values: list[Any] | None = None,
+    ) -> None:
         self.enclosing = enclosing
+        self.values: list[Any] = values if values is not None else []
+
+    def define(self, value: Any):
+        self.values.append(value)
+
+    def get_at(self, distance: int, slot: int) -> Any:
+        return self.ancestor(distance).values[slot]
+
+    def assign_at(self, distance: int, slot: int, value: Any):
+        self.ancestor(distance).values[slot] = value
+
+    def ancestor(self, distance: int) -> Environment:
+        environment = self
+        for _ in range(distance):
+            environment = environment.enclosing
+        return environment
+
+
+class GlobalEnvironment:
+    # Globals are late bound, so they stay keyed by name.
+    __slots__ = ("values",)
+
+    def __init__(self) -> None:
         self.values: dict[str, Any] = {}
 
     def define(self, name: str, value: Any):
@@ -18,26 +50,9 @@ class Environment:
         if name.lexeme in self.values:
             self.values[name.lexeme] = value
             return
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return
         raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
 
-    def assign_at(self, distance: int, name: Token, value: Any):
-        self.ancestor(distance).values[name.lexeme] = value
-
     def get(self, name: Token) -> Any:
         if name.lexeme in self.values:
             return self.values[name.lexeme]
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
         raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
-
-    def get_at(self, distance: int, name: str):
-        return self.ancestor(distance).values.get(name)
-
-    def ancestor(self, distance: int) -> Environment:
-        environment = self
-        for _ in range(distance):
-            environment = environment.enclosing
-        return environment
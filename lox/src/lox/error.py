@@ -1,3 +1,6 @@
+from dataclasses import fields, is_dataclass
+from typing import Any
+
 from lox.token_type import Token, TokenType
 
 had_error = False
@@ -20,6 +23,34 @@ def error(line: int, message: str):
     report(line, "", message)
 
 
+def node_line(node: object) -> int | None:
+    # The earliest line of any token under a node. It keeps its own stack, so
+    # it also works on trees nested too deeply to walk recursively.
+    lines: list[int] = []
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, Token):
+            lines.append(value.line)
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif is_dataclass(value):
+            stack.extend(getattr(value, field.name) for field in fields(value))
+    return min(lines, default=None)
+
+
+def error_nesting(statements: list[Any], index: int):
+    # statements[index] is nested too deeply for Python's recursion limit. One
+    # made only of literals has no line, so it takes the line of one before.
+    for statement in reversed(statements[: index + 1]):
+        line = node_line(statement)
+        if line is not None:
+            break
+    else:
+        line = 1
+    error(line, "Too much nesting.")
+
+
 def error_token(token: Token, message: str):
     if token.type == TokenType.EOF:
         report(token.line, " at end", message)
@@ -1,81 +1,199 @@
 # Generated by generate_ast.py
-from dataclasses import dataclass
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import ClassVar, Protocol, TypeVar
 
 from lox.token_type import Token
 
+R = TypeVar("R", covariant=True)
+
+
+class ExprVisitor(Protocol[R]):
+    def visit_assign_expr(self, expr: Assign) -> R:
+        ...
+
+    def visit_binary_expr(self, expr: Binary) -> R:
+        ...
+
+    def visit_call_expr(self, expr: Call) -> R:
+        ...
+
+    def visit_get_expr(self, expr: Get) -> R:
+        ...
+
+    def visit_grouping_expr(self, expr: Grouping) -> R:
+        ...
+
+    def visit_literal_expr(self, expr: Literal) -> R:
+        ...
+
+    def visit_logical_expr(self, expr: Logical) -> R:
+        ...
+
+    def visit_set_expr(self, expr: Set) -> R:
+        ...
+
+    def visit_super_expr(self, expr: Super) -> R:
+        ...
+
+    def visit_this_expr(self, expr: This) -> R:
+        ...
+
+    def visit_unary_expr(self, expr: Unary) -> R:
+        ...
+
+    def visit_variable_expr(self, expr: Variable) -> R:
+        ...
 
-@dataclass(frozen=True)
+
+@dataclass(slots=True)
 class Expr:
-    pass
+    kind: ClassVar[int]
+
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        raise NotImplementedError
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Assign(Expr):
+    kind: ClassVar[int] = 0
     name: Token
     value: Expr
+    depth: int | None = field(default=None, compare=False)
+    slot: int = field(default=0, compare=False)
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_assign_expr(self)
 
-@dataclass(frozen=True)
+
+@dataclass(slots=True)
 class Binary(Expr):
+    kind: ClassVar[int] = 1
     left: Expr
     operator: Token
     right: Expr
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_binary_expr(self)
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Call(Expr):
+    kind: ClassVar[int] = 2
     callee: Expr
     paren: Token
     arguments: list[Expr]
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_call_expr(self)
 
-@dataclass(frozen=True)
+
+@dataclass(slots=True)
 class Get(Expr):
+    kind: ClassVar[int] = 3
     obj: Expr
     name: Token
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_get_expr(self)
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Grouping(Expr):
+    kind: ClassVar[int] = 4
     expression: Expr
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_grouping_expr(self)
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Literal(Expr):
+    kind: ClassVar[int] = 5
     value: str | float | bool | None
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_literal_expr(self)
 
-@dataclass(frozen=True)
+
+@dataclass(slots=True)
 class Logical(Expr):
+    kind: ClassVar[int] = 6
     left: Expr
     operator: Token
     right: Expr
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_logical_expr(self)
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Set(Expr):
+    kind: ClassVar[int] = 7
     obj: Expr
     name: Token
     value: Expr
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_set_expr(self)
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Super(Expr):
+    kind: ClassVar[int] = 8
     keyword: Token
     method: Token
+    depth: int | None = field(default=None, compare=False)
+    slot: int = field(default=0, compare=False)
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_super_expr(self)
 
-@dataclass(frozen=True)
+
+@dataclass(slots=True)
 class This(Expr):
+    kind: ClassVar[int] = 9
     keyword: Token
+    depth: int | None = field(default=None, compare=False)
+    slot: int = field(default=0, compare=False)
+
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_this_expr(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Unary(Expr):
+    kind: ClassVar[int] = 10
     operator: Token
     right: Expr
 
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_unary_expr(self)
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Variable(Expr):
+    kind: ClassVar[int] = 11
     name: Token
+    depth: int | None = field(default=None, compare=False)
+    slot: int = field(default=0, compare=False)
+
+    def accept(self, visitor: ExprVisitor[R]) -> R:
+        return visitor.visit_variable_expr(self)
+
+
+KINDS: tuple[type[Expr], ...] = (
+    Assign,
+    Binary,
+    Call,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
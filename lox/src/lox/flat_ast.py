@@ -0,0 +1,457 @@
+from __future__ import annotations
+
+import marshal
+from array import array
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import lox.error as error
+import lox.expr as expr
+import lox.stmt as stmt
+from lox.parser import Parser
+from lox.resolver import ClassType, FunctionType, Resolver
+from lox.token_type import Token, TokenType
+
+ASSIGN = expr.Assign.kind
+BINARY = expr.Binary.kind
+CALL = expr.Call.kind
+GET = expr.Get.kind
+GROUPING = expr.Grouping.kind
+LITERAL = expr.Literal.kind
+LOGICAL = expr.Logical.kind
+SET = expr.Set.kind
+SUPER = expr.Super.kind
+THIS = expr.This.kind
+UNARY = expr.Unary.kind
+VARIABLE = expr.Variable.kind
+# statement kinds follow the expression kinds
+BLOCK = len(expr.KINDS) + stmt.Block.kind
+CLASS = len(expr.KINDS) + stmt.Class.kind
+EXPRESSION = len(expr.KINDS) + stmt.Expression.kind
+FUNCTION = len(expr.KINDS) + stmt.Function.kind
+IF = len(expr.KINDS) + stmt.If.kind
+PRINT = len(expr.KINDS) + stmt.Print.kind
+RETURN = len(expr.KINDS) + stmt.Return.kind
+WHILE = len(expr.KINDS) + stmt.While.kind
+VAR = len(expr.KINDS) + stmt.Var.kind
+
+NONE = -1
+
+
+class FlatAst:
+    # The whole tree as parallel columns, one row per node:
+    #
+    #   kind        token     a              b            c
+    #   Assign      name      value          slot         depth
+    #   Binary      operator  left           right
+    #   Call        paren     callee         arguments*
+    #   Get         name      object
+    #   Grouping              expression
+    #   Literal               literal
+    #   Logical     operator  left           right
+    #   Set         name      object         value
+    #   Super       keyword   method token                depth
+    #   This        keyword                  slot         depth
+    #   Unary       operator  right
+    #   Variable    name                     slot         depth
+    #   Block                 statements*
+    #   Class       name      superclass     methods*
+    #   Expression            expression
+    #   Function    name      params*        body*
+    #   If                    condition      then         else
+    #   Print                 expression
+    #   Return      keyword   value                       tail call
+    #   Var         name      initializer
+    #   While                 condition      body
+    #
+    # Tokens and literals are indices into `tokens` and `literals`. Starred
+    # columns index `lists`, which stores each list as its length followed by
+    # its items. An absent child is NONE, and so is the depth of a global.
+    # `program` is the list of top-level statements.
+    __slots__ = (
+        "kinds",
+        "token",
+        "a",
+        "b",
+        "c",
+        "lists",
+        "tokens",
+        "literals",
+        "program",
+    )
+
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.token = array("i")
+        self.a = array("i")
+        self.b = array("i")
+        self.c = array("i")
+        self.lists = array("i")
+        self.tokens: list[Token] = []
+        self.literals: list[Any] = []
+        self.program = NONE
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def add(
+        self,
+        kind: int,
+        token: Token | None = None,
+        a: int = NONE,
+        b: int = NONE,
+        c: int = NONE,
+    ) -> int:
+        self.kinds.append(kind)
+        self.token.append(NONE if token is None else self.add_token(token))
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+        return len(self.kinds) - 1
+
+    def add_token(self, token: Token) -> int:
+        self.tokens.append(token)
+        return len(self.tokens) - 1
+
+    def add_literal(self, value: Any) -> int:
+        self.literals.append(value)
+        return len(self.literals) - 1
+
+    def add_list(self, items: Iterable[int | None]) -> int:
+        values = [NONE if item is None else item for item in items]
+        start = len(self.lists)
+        self.lists.append(len(values))
+        self.lists.extend(values)
+        return start
+
+    def items(self, index: int) -> array[int]:
+        start = index + 1
+        return self.lists[start : start + self.lists[index]]
+
+    def line(self, start: int, end: int) -> int:
+        # The earliest line in rows start to end, which hold one statement, or
+        # failing that the latest line before them.
+        tokens = self.tokens
+        lines = [tokens[token].line for token in self.token[start:end] if token != NONE]
+        if lines:
+            return min(lines)
+        for token in reversed(self.token[:start]):
+            if token != NONE:
+                return tokens[token].line
+        return 1
+
+    def dump(self) -> bytes:
+        # The columns are written as they are in memory; only the token
+        # lexemes and the literals need encoding.
+        tokens = self.tokens
+        counts = array(
+            "q", [len(self.kinds), len(self.lists), len(tokens), self.program]
+        )
+        types = array("B", [token.type.value for token in tokens])
+        lines = array("i", [token.line for token in tokens])
+        rest = marshal.dumps(([token.lexeme for token in tokens], self.literals))
+        columns = [self.kinds, self.token, self.a, self.b, self.c, self.lists]
+        return b"".join([counts, *columns, types, lines, rest])
+
+    @classmethod
+    def load(cls, data: bytes) -> FlatAst:
+        view = memoryview(data)
+        offset = 0
+
+        def column(typecode: str, length: int) -> array[int]:
+            nonlocal offset
+            values = array(typecode)
+            end = offset + values.itemsize * length
+            values.frombytes(view[offset:end])
+            offset = end
+            return values
+
+        nodes, lists, tokens, program = column("q", 4)
+        ast = cls()
+        ast.program = program
+        ast.kinds = column("B", nodes)
+        ast.token = column("i", nodes)
+        ast.a = column("i", nodes)
+        ast.b = column("i", nodes)
+        ast.c = column("i", nodes)
+        ast.lists = column("i", lists)
+        types = column("B", tokens)
+        lines = column("i", tokens)
+        lexemes, ast.literals = marshal.loads(view[offset:])
+        ast.tokens = [
+            Token.span(TokenType(typ), lexeme, 0, len(lexeme), line, lexeme)
+            for typ, line, lexeme in zip(types, lines, lexemes)
+        ]
+        return ast
+
+    def __reduce__(self) -> tuple[Callable[[bytes], FlatAst], tuple[bytes]]:
+        return FlatAst.load, (self.dump(),)
+
+
+class FlatParser(Parser):
+    # Builds a FlatAst straight from the grammar, without node objects; every
+    # make_* returns the index of the row it added.
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        super().__init__(tokens)
+        self.ast = FlatAst()
+
+    def parse(self) -> FlatAst:
+        self.ast.program = self.ast.add_list(super().parse())
+        return self.ast
+
+    def make_assignment(self, target: int, value: int) -> int | None:
+        # reuses the target's row, which has the token and the slot columns
+        ast = self.ast
+        if ast.kinds[target] == VARIABLE:
+            ast.kinds[target] = ASSIGN
+            ast.a[target] = value
+            return target
+        if ast.kinds[target] == GET:
+            ast.kinds[target] = SET
+            ast.b[target] = value
+            return target
+        return None
+
+    def make_binary(self, left: int, operator: Token, right: int) -> int:
+        return self.ast.add(BINARY, operator, left, right)
+
+    def make_call(self, callee: int, paren: Token, arguments: list[int]) -> int:
+        return self.ast.add(CALL, paren, callee, self.ast.add_list(arguments))
+
+    def make_get(self, obj: int, name: Token) -> int:
+        return self.ast.add(GET, name, obj)
+
+    def make_grouping(self, expression: int) -> int:
+        return self.ast.add(GROUPING, None, expression)
+
+    def make_literal(self, value: Any) -> int:
+        return self.ast.add(LITERAL, None, self.ast.add_literal(value))
+
+    def make_logical(self, left: int, operator: Token, right: int) -> int:
+        return self.ast.add(LOGICAL, operator, left, right)
+
+    def make_super(self, keyword: Token, method: Token) -> int:
+        return self.ast.add(SUPER, keyword, self.ast.add_token(method), 0)
+
+    def make_this(self, keyword: Token) -> int:
+        return self.ast.add(THIS, keyword, NONE, 0)
+
+    def make_unary(self, operator: Token, right: int) -> int:
+        return self.ast.add(UNARY, operator, right)
+
+    def make_variable(self, name: Token) -> int:
+        return self.ast.add(VARIABLE, name, NONE, 0)
+
+    def make_block(self, statements: list[int | None]) -> int:
+        return self.ast.add(BLOCK, None, self.ast.add_list(statements))
+
+    def make_class(
+        self, name: Token, superclass: int | None, methods: list[int]
+    ) -> int:
+        superclass = NONE if superclass is None else superclass
+        return self.ast.add(CLASS, name, superclass, self.ast.add_list(methods))
+
+    def make_expression(self, expression: int, token: Token | None = None) -> int:
+        return self.ast.add(EXPRESSION, token, expression)
+
+    def make_function(
+        self, name: Token, params: list[Token], body: list[int | None]
+    ) -> int:
+        ast = self.ast
+        tokens = ast.add_list([ast.add_token(param) for param in params])
+        return ast.add(FUNCTION, name, tokens, ast.add_list(body))
+
+    def make_if(
+        self,
+        condition: int,
+        then_branch: int,
+        else_branch: int | None,
+        token: Token | None = None,
+    ) -> int:
+        else_branch = NONE if else_branch is None else else_branch
+        return self.ast.add(IF, token, condition, then_branch, else_branch)
+
+    def make_print(self, expression: int, token: Token | None = None) -> int:
+        return self.ast.add(PRINT, token, expression)
+
+    def make_return(self, keyword: Token, value: int | None) -> int:
+        return self.ast.add(RETURN, keyword, NONE if value is None else value, NONE, 0)
+
+    def make_while(self, condition: int, body: int, token: Token | None = None) -> int:
+        return self.ast.add(WHILE, token, condition, body)
+
+    def make_var(self, name: Token, initializer: int | None) -> int:
+        initializer = NONE if initializer is None else initializer
+        return self.ast.add(VAR, name, initializer)
+
+
+class FlatResolver(Resolver):
+    # The Resolver's scope handling over a FlatAst, with the depths and slots
+    # written back into its columns.
+    def __init__(self, ast: FlatAst) -> None:
+        super().__init__()
+        self.ast = ast
+        visitors: dict[int, Callable[[int], None]] = {
+            ASSIGN: self.visit_assign,
+            BINARY: self.visit_operands,
+            CALL: self.visit_call,
+            GET: self.visit_get,
+            GROUPING: self.visit_child,
+            LITERAL: self.visit_nothing,
+            LOGICAL: self.visit_operands,
+            SET: self.visit_set,
+            SUPER: self.visit_super,
+            THIS: self.visit_this,
+            UNARY: self.visit_child,
+            VARIABLE: self.visit_variable,
+            BLOCK: self.visit_block,
+            CLASS: self.visit_class,
+            EXPRESSION: self.visit_child,
+            FUNCTION: self.visit_function,
+            IF: self.visit_if,
+            PRINT: self.visit_child,
+            RETURN: self.visit_return,
+            WHILE: self.visit_operands,
+            VAR: self.visit_var,
+        }
+        self.visitors = [visitors[kind] for kind in range(len(visitors))]
+
+    def visit(self, node: int):
+        self.visitors[self.ast.kinds[node]](node)
+
+    def name(self, node: int) -> Token:
+        return self.ast.tokens[self.ast.token[node]]
+
+    def resolve_function(self, function: int, typ: FunctionType):
+        ast = self.ast
+        enclosing_function = self.current_function
+        self.current_function = typ
+        self.begin_scope()
+        for param in ast.items(ast.a[function]):
+            self.declare(ast.tokens[param])
+            self.define(ast.tokens[param])
+        self.resolve(ast.items(ast.b[function]))
+        self.end_scope()
+        self.current_function = enclosing_function
+
+    def resolve_local(self, node: int, name: Token):
+        for i in reversed(range(len(self.scopes))):
+            if name.lexeme in self.scopes[i]:
+                self.ast.c[node] = len(self.scopes) - 1 - i
+                self.ast.b[node] = self.slots[i][name.lexeme]
+                return
+
+    def visit_nothing(self, node: int):
+        pass
+
+    def visit_child(self, node: int):
+        self.visit(self.ast.a[node])
+
+    def visit_operands(self, node: int):
+        self.visit(self.ast.a[node])
+        self.visit(self.ast.b[node])
+
+    def visit_block(self, node: int):
+        self.begin_scope()
+        self.resolve(self.ast.items(self.ast.a[node]))
+        self.end_scope()
+
+    def visit_class(self, node: int):
+        ast = self.ast
+        name = self.name(node)
+        superclass = ast.a[node]
+        enclosing_class = self.current_class
+        self.current_class = ClassType.CLASS
+        self.declare(name)
+        self.define(name)
+        if superclass != NONE and name.lexeme == self.name(superclass).lexeme:
+            error.error_token(
+                self.name(superclass), "A class can't inherit from itself."
+            )
+        if superclass != NONE:
+            self.current_class = ClassType.SUBCLASS
+            self.visit(superclass)
+            self.begin_scope()
+            self.declare_synthetic("super")
+        self.begin_scope()
+        self.declare_synthetic("this")
+        for method in ast.items(ast.b[node]):
+            declaration = (
+                FunctionType.INITIALIZER
+                if self.name(method).lexeme == "init"
+                else FunctionType.METHOD
+            )
+            self.resolve_function(method, declaration)
+        self.end_scope()
+        if superclass != NONE:
+            self.end_scope()
+        self.current_class = enclosing_class
+
+    def visit_if(self, node: int):
+        self.visit(self.ast.a[node])
+        self.visit(self.ast.b[node])
+        if self.ast.c[node] != NONE:
+            self.visit(self.ast.c[node])
+
+    def visit_return(self, node: int):
+        ast = self.ast
+        keyword = self.name(node)
+        value = ast.a[node]
+        if self.current_function == FunctionType.NONE:
+            error.error_token(keyword, "Can't return from top-lovel code.")
+        if value != NONE:
+            if self.current_function == FunctionType.INITIALIZER:
+                error.error_token(keyword, "Can't return a value from an initializer.")
+            elif ast.kinds[value] == CALL:
+                ast.c[node] = 1
+            self.visit(value)
+
+    def visit_function(self, node: int):
+        self.declare(self.name(node))
+        self.define(self.name(node))
+        self.resolve_function(node, FunctionType.FUNCTION)
+
+    def visit_var(self, node: int):
+        self.declare(self.name(node))
+        if self.ast.a[node] != NONE:
+            self.visit(self.ast.a[node])
+        self.define(self.name(node))
+
+    def visit_assign(self, node: int):
+        self.visit(self.ast.a[node])
+        self.resolve_local(node, self.name(node))
+
+    def visit_call(self, node: int):
+        self.visit(self.ast.a[node])
+        for argument in self.ast.items(self.ast.b[node]):
+            self.visit(argument)
+
+    def visit_get(self, node: int):
+        self.visit(self.ast.a[node])
+
+    def visit_set(self, node: int):
+        self.visit(self.ast.b[node])
+        self.visit(self.ast.a[node])
+
+    def visit_super(self, node: int):
+        keyword = self.name(node)
+        if self.current_class == ClassType.NONE:
+            error.error_token(keyword, "Can't use 'super' outside of a class")
+        elif self.current_class != ClassType.SUBCLASS:
+            error.error_token(
+                keyword, "Can't use 'super' in a class with no superclass."
+            )
+        self.resolve_local(node, keyword)
+
+    def visit_this(self, node: int):
+        keyword = self.name(node)
+        if self.current_class == ClassType.NONE:
+            error.error_token(keyword, "Can't use 'this' outside of a class.")
+            return
+        self.resolve_local(node, keyword)
+
+    def visit_variable(self, node: int):
+        name = self.name(node)
+        if self.scopes and self.scopes[-1].get(name.lexeme) is False:
+            error.error_token(name, "Can't read local variable in its own initializer.")
+        self.resolve_local(node, name)
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable
+
+from lox.callable import LoxCallable
+from lox.environment import Environment, GlobalEnvironment
+from lox.error import LoxRuntimeError
+from lox.flat_ast import (
+    ASSIGN,
+    BINARY,
+    BLOCK,
+    CALL,
+    CLASS,
+    EXPRESSION,
+    FUNCTION,
+    GET,
+    GROUPING,
+    IF,
+    LITERAL,
+    LOGICAL,
+    NONE,
+    PRINT,
+    RETURN,
+    SET,
+    SUPER,
+    THIS,
+    UNARY,
+    VAR,
+    VARIABLE,
+    WHILE,
+    FlatAst,
+)
+from lox.interpreter import Interpreter, is_equal, is_truthy, stringify
+from lox.lox_class import LoxClass
+from lox.lox_function import LoxFunction
+from lox.lox_instance import LoxInstance
+from lox.return_class import Completion, TailCall
+from lox.token_type import TokenType
+
+
+class FlatFunction(LoxFunction):
+    # The declaration is the function's row in `ast`.
+    __slots__ = ("ast", "body")
+
+    def __init__(
+        self,
+        declaration: int,
+        closure: Environment | GlobalEnvironment,
+        is_initializer: bool,
+        ast: FlatAst,
+        body: array[int],
+    ) -> None:
+        super().__init__(declaration, closure, is_initializer)
+        self.ast = ast
+        self.body = body
+
+    def run(
+        self, interpreter: FlatInterpreter, environment: Environment
+    ) -> Completion | TailCall | None:
+        if interpreter.ast is self.ast:
+            return interpreter.execute_block(self.body, environment)
+        # declared by an earlier prompt line, which was parsed into its own tree
+        previous = interpreter.ast
+        interpreter.load(self.ast)
+        try:
+            return interpreter.execute_block(self.body, environment)
+        finally:
+            interpreter.load(previous)
+
+    def bind(self, instance: LoxInstance) -> LoxFunction:
+        environment = Environment(self.closure, [instance])
+        return FlatFunction(
+            self.declaration, environment, self.is_initializer, self.ast, self.body
+        )
+
+    @property
+    def arity(self) -> int:
+        ast = self.ast
+        return ast.lists[ast.a[self.declaration]]
+
+    def __str__(self) -> str:
+        ast = self.ast
+        return f"<fn {ast.tokens[ast.token[self.declaration]].lexeme}>"
+
+
+class FlatInterpreter(Interpreter):
+    # Runs a FlatAst, dispatching on the kind column through a table. Its
+    # columns are copied to attributes, which makes them one lookup away.
+    def __init__(self) -> None:
+        super().__init__()
+        handlers: dict[int, Callable[[int], Any]] = {
+            ASSIGN: self.assign,
+            BINARY: self.binary,
+            CALL: self.call,
+            GET: self.get_property,
+            GROUPING: self.child,
+            LITERAL: self.literal,
+            LOGICAL: self.logical,
+            SET: self.set_property,
+            SUPER: self.super_method,
+            THIS: self.variable,
+            UNARY: self.unary,
+            VARIABLE: self.variable,
+            BLOCK: self.block,
+            CLASS: self.class_declaration,
+            EXPRESSION: self.expression_statement,
+            FUNCTION: self.function,
+            IF: self.if_statement,
+            PRINT: self.print_statement,
+            RETURN: self.return_statement,
+            WHILE: self.while_statement,
+            VAR: self.var,
+        }
+        self.handlers = [handlers[kind] for kind in range(len(handlers))]
+        self.load(FlatAst())
+
+    def load(self, ast: FlatAst):
+        self.ast = ast
+        self.kinds = ast.kinds
+        self.token = ast.token
+        self.a = ast.a
+        self.b = ast.b
+        self.c = ast.c
+        self.tokens = ast.tokens
+        self.literals = ast.literals
+
+    def interpret(self, ast: FlatAst):
+        self.load(ast)
+        super().interpret(ast.items(ast.program))
+
+    def execute(self, node: int) -> Any:
+        return self.handlers[self.kinds[node]](node)
+
+    evaluate = execute
+
+    # statements
+    def var(self, node: int):
+        initializer = self.a[node]
+        value = None if initializer == NONE else self.evaluate(initializer)
+        self.define(self.tokens[self.token[node]], value)
+
+    def expression_statement(self, node: int):
+        self.evaluate(self.a[node])
+
+    def function(self, node: int):
+        function = self.make_function(node, self.environment, False)
+        self.define(self.tokens[self.token[node]], function)
+
+    def make_function(
+        self,
+        node: int,
+        closure: Environment | GlobalEnvironment,
+        is_initializer: bool,
+    ) -> FlatFunction:
+        body = self.ast.items(self.b[node])
+        return FlatFunction(node, closure, is_initializer, self.ast, body)
+
+    def if_statement(self, node: int) -> Completion | TailCall | None:
+        if is_truthy(self.evaluate(self.a[node])):
+            return self.execute(self.b[node])
+        if self.c[node] != NONE:
+            return self.execute(self.c[node])
+        return None
+
+    def print_statement(self, node: int):
+        print(stringify(self.evaluate(self.a[node])))
+
+    def return_statement(self, node: int) -> Completion | TailCall:
+        value = self.a[node]
+        if self.c[node]:
+            function, this, arguments = self.call_target(value)
+            if isinstance(function, LoxFunction):
+                return TailCall(function, this, arguments)
+            return Completion(function(self, arguments))
+        return Completion(None if value == NONE else self.evaluate(value))
+
+    def while_statement(self, node: int) -> Completion | TailCall | None:
+        condition = self.a[node]
+        body = self.b[node]
+        while is_truthy(self.evaluate(condition)):
+            completion = self.execute(body)
+            if completion is not None:
+                return completion
+        return None
+
+    def block(self, node: int) -> Completion | TailCall | None:
+        statements = self.ast.items(self.a[node])
+        return self.execute_block(statements, Environment(self.environment))
+
+    def class_declaration(self, node: int):
+        name = self.tokens[self.token[node]]
+        superclass = None
+        if self.a[node] != NONE:
+            superclass = self.evaluate(self.a[node])
+            if not isinstance(superclass, LoxClass):
+                name = self.tokens[self.token[self.a[node]]]
+                raise LoxRuntimeError(name, "Superclass must be a class.")
+        closure = self.environment
+        if superclass is not None:
+            closure = Environment(self.environment, [superclass])
+        methods: dict[str, LoxFunction] = {}
+        for method in self.ast.items(self.b[node]):
+            method_name = self.tokens[self.token[method]].lexeme
+            methods[method_name] = self.make_function(
+                method, closure, method_name == "init"
+            )
+        self.define(name, LoxClass(name.lexeme, superclass, methods))
+
+    # expressions
+    def child(self, node: int) -> Any:
+        return self.evaluate(self.a[node])
+
+    def assign(self, node: int) -> Any:
+        value = self.evaluate(self.a[node])
+        depth = self.c[node]
+        if depth != NONE:
+            self.environment.assign_at(depth, self.b[node], value)
+        else:
+            self.global_env.assign(self.tokens[self.token[node]], value)
+        return value
+
+    def literal(self, node: int) -> Any:
+        return self.literals[self.a[node]]
+
+    def logical(self, node: int) -> Any:
+        left = self.evaluate(self.a[node])
+        if self.tokens[self.token[node]].type == TokenType.OR:
+            if is_truthy(left):
+                return left
+        else:  # TokenType.AND
+            if not is_truthy(left):
+                return left
+        return self.evaluate(self.b[node])
+
+    def set_property(self, node: int) -> Any:
+        obj = self.evaluate(self.a[node])
+        name = self.tokens[self.token[node]]
+        if not isinstance(obj, LoxInstance):
+            raise LoxRuntimeError(name, "Only instances have fields.")
+        value = self.evaluate(self.b[node])
+        obj.set(name, value)
+        return value
+
+    def super_method(self, node: int) -> LoxCallable:
+        obj, method = self.find_super_method(node)
+        return method.bind(obj)
+
+    def find_super_method(self, node: int) -> tuple[LoxInstance, LoxFunction]:
+        distance = self.c[node]
+        superclass = self.environment.get_at(distance, 0)
+        obj = self.environment.get_at(distance - 1, 0)
+        name = self.tokens[self.a[node]]
+        method = superclass.find_method(name.lexeme)
+        if method is None:
+            raise LoxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
+        return obj, method
+
+    def variable(self, node: int) -> Any:
+        depth = self.c[node]
+        if depth != NONE:
+            return self.environment.get_at(depth, self.b[node])
+        return self.global_env.get(self.tokens[self.token[node]])
+
+    def unary(self, node: int) -> float | bool:
+        right = self.evaluate(self.a[node])
+        operator = self.tokens[self.token[node]]
+        match operator.type:
+            case TokenType.MINUS:
+                self.check_number_operand(operator, right)
+                return -right
+            case TokenType.BANG:
+                return not is_truthy(right)
+            case _:
+                raise Exception("Must not be reached")
+
+    def binary(self, node: int) -> Any:
+        left = self.evaluate(self.a[node])
+        right = self.evaluate(self.b[node])
+        operator = self.tokens[self.token[node]]
+        match operator.type:
+            case TokenType.BANG_EQUAL:
+                return not is_equal(left, right)
+            case TokenType.EQUAL_EQUAL:
+                return is_equal(left, right)
+            case TokenType.GREATER:
+                self.check_number_operands(operator, left, right)
+                return left > right
+            case TokenType.GREATER_EQUAL:
+                self.check_number_operands(operator, left, right)
+                return left >= right
+            case TokenType.LESS:
+                self.check_number_operands(operator, left, right)
+                return left < right
+            case TokenType.LESS_EQUAL:
+                self.check_number_operands(operator, left, right)
+                return left <= right
+            case TokenType.MINUS:
+                self.check_number_operands(operator, left, right)
+                return left - right
+            case TokenType.PLUS:
+                self.check_number_or_string_operands(operator, left, right)
+                return left + right
+            case TokenType.SLASH:
+                self.check_number_operands(operator, left, right)
+                return left / right
+            case TokenType.STAR:
+                self.check_number_operands(operator, left, right)
+                return left * right
+            case _:
+                raise Exception("Must not be reached")
+
+    def call(self, node: int) -> Any:
+        function, this, arguments = self.call_target(node)
+        if this is not None:
+            return function.invoke(self, this, arguments)
+        return function(self, arguments)
+
+    def call_target(
+        self, node: int
+    ) -> tuple[LoxCallable, LoxInstance | None, list[Any]]:
+        this: LoxInstance | None = None
+        callee_node = self.a[node]
+        kind = self.kinds[callee_node]
+        if kind == GET:
+            this = self.evaluate(self.a[callee_node])
+            name = self.tokens[self.token[callee_node]]
+            if not isinstance(this, LoxInstance):
+                raise LoxRuntimeError(name, "Only instances have properties.")
+            callee, is_method = this.lookup(name)
+            if not is_method:
+                this = None
+        elif kind == SUPER:
+            this, callee = self.find_super_method(callee_node)
+        else:
+            callee = self.evaluate(callee_node)
+        arguments: list[Any] = []
+        for argument in self.ast.items(self.b[node]):
+            arguments.append(self.evaluate(argument))
+        paren = self.tokens[self.token[node]]
+        if not isinstance(callee, LoxCallable):
+            raise LoxRuntimeError(paren, "Can only call functions and classes.")
+        if len(arguments) != callee.arity:
+            raise LoxRuntimeError(
+                paren, f"Expected {callee.arity} arguments but got {len(arguments)}"
+            )
+        return callee, this, arguments
+
+    def get_property(self, node: int) -> Any:
+        obj = self.evaluate(self.a[node])
+        name = self.tokens[self.token[node]]
+        if isinstance(obj, LoxInstance):
+            return obj.get(name)
+        raise LoxRuntimeError(name, "Only instances have properties.")
@@ -5,13 +5,14 @@ import lox.error as error
 import lox.expr as expr
 import lox.stmt as stmt
 from lox.callable import LoxCallable
-from lox.environment import Environment
+from lox.environment import Environment, GlobalEnvironment
 from lox.error import LoxRuntimeError
+from lox.expr import Get, Super
 from lox.lox_class import LoxClass
 from lox.lox_function import LoxFunction
 from lox.lox_instance import LoxInstance
 from lox.native_function import Clock
-from lox.return_class import Return
+from lox.return_class import Completion, TailCall
 from lox.token_type import Token, TokenType
 
 
@@ -43,11 +44,15 @@ def stringify(object: Any) -> str:
 
 
 class Interpreter:
+    # The types the interpreter creates at runtime, so a subclass such as the
+    # profiler can swap in its own without touching the per-call path.
+    function_type = LoxFunction
+    class_type = LoxClass
+
     def __init__(self) -> None:
-        self.global_env = Environment()
-        self.environment = self.global_env
+        self.global_env = GlobalEnvironment()
+        self.environment: Environment | GlobalEnvironment = self.global_env
         self.global_env.define("clock", Clock())
-        self.locals: dict[int, int] = {}
 
     def interpret(self, statements: list[stmt.Stmt]):
         try:
@@ -56,8 +61,10 @@ class Interpreter:
         except LoxRuntimeError as e:
             error.error_runtime(e)
 
+    # Statements return None, or the Completion / TailCall of a return statement,
+    # which every enclosing statement hands straight back to the LoxFunction.
     @singledispatchmethod
-    def execute(self, stmt: stmt.Stmt) -> None:
+    def execute(self, stmt: stmt.Stmt) -> Completion | TailCall | None:
         raise NotImplementedError(
             f"Interpreter.execute() is not implemented for {type(stmt)}"
         )
@@ -67,7 +74,7 @@ class Interpreter:
         value = None
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
-        self.environment.define(stmt.name.lexeme, value)
+        self.define(stmt.name, value)
 
     @execute.register
     def _(self, stmt: stmt.Expression) -> None:
@@ -75,15 +82,16 @@ class Interpreter:
 
     @execute.register
     def _(self, stmt: stmt.Function) -> None:
-        function = LoxFunction(stmt, self.environment, False)
-        self.environment.define(stmt.name.lexeme, function)
+        function = self.function_type(stmt, self.environment, False)
+        self.define(stmt.name, function)
 
     @execute.register
-    def _(self, stmt: stmt.If) -> None:
+    def _(self, stmt: stmt.If) -> Completion | TailCall | None:
         if is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
-        elif stmt.else_branch is not None:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.then_branch)
+        if stmt.else_branch is not None:
+            return self.execute(stmt.else_branch)
+        return None
 
     @execute.register
     def _(self, stmt: stmt.Print) -> None:
@@ -91,29 +99,42 @@ class Interpreter:
         print(stringify(value))
 
     @execute.register
-    def _(self, stmt: stmt.Return) -> None:
+    def _(self, stmt: stmt.Return) -> Completion | TailCall:
+        if stmt.tail_call:
+            function, this, arguments = self.call_target(stmt.value)
+            if isinstance(function, LoxFunction):
+                return TailCall(function, this, arguments)
+            return Completion(function(self, arguments))
         value = None
         if stmt.value is not None:
             value = self.evaluate(stmt.value)
-        raise Return(value)
+        return Completion(value)
 
     @execute.register
-    def _(self, stmt: stmt.While) -> None:
+    def _(self, stmt: stmt.While) -> Completion | TailCall | None:
         while is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            completion = self.execute(stmt.body)
+            if completion is not None:
+                return completion
+        return None
 
     @execute.register
-    def _(self, stmt: stmt.Block) -> None:
-        self.execute_block(stmt.statements, Environment(self.environment))
+    def _(self, stmt: stmt.Block) -> Completion | TailCall | None:
+        return self.execute_block(stmt.statements, Environment(self.environment))
 
     def execute_block(
-        self, statements: list[stmt.Stmt | None], environment: Environment
-    ):
+        self,
+        statements: list[stmt.Stmt | None],
+        environment: Environment | GlobalEnvironment,
+    ) -> Completion | TailCall | None:
         previous = self.environment
         self.environment = environment
         try:
             for statement in statements:
-                self.execute(statement)
+                completion = self.execute(statement)
+                if completion is not None:
+                    return completion
+            return None
         finally:
             self.environment = previous
 
@@ -126,22 +147,22 @@ class Interpreter:
                 raise LoxRuntimeError(
                     stmt.superclass.name, "Superclass must be a class."
                 )
-        self.environment.define(stmt.name.lexeme, None)
-        if stmt.superclass is not None:
-            self.environment = Environment(self.environment)
-            self.environment.define("super", superclass)
+        closure = self.environment
+        if superclass is not None:
+            closure = Environment(self.environment, [superclass])
         methods: dict[str, LoxFunction] = {}
         for method in stmt.methods:
-            methods[method.name.lexeme] = LoxFunction(
-                method, self.environment, method.name.lexeme == "init"
+            methods[method.name.lexeme] = self.function_type(
+                method, closure, method.name.lexeme == "init"
             )
-        klass = LoxClass(stmt.name.lexeme, superclass, methods)
-        if superclass is not None:
-            self.environment = self.environment.enclosing
-        self.environment.assign(stmt.name, klass)
+        klass = self.class_type(stmt.name.lexeme, superclass, methods)
+        self.define(stmt.name, klass)
 
-    def resolve(self, expr: expr.Expr, depth: int):
-        self.locals[id(expr)] = depth
+    def define(self, name: Token, value: Any):
+        if isinstance(self.environment, GlobalEnvironment):
+            self.environment.define(name.lexeme, value)
+        else:
+            self.environment.define(value)
 
     @singledispatchmethod
     def evaluate(self, expr: expr.Expr) -> str | float | bool | LoxCallable | None:
@@ -152,9 +173,8 @@ class Interpreter:
     @evaluate.register
     def _(self, expr: expr.Assign) -> str | float | bool | LoxCallable | None:
         value = self.evaluate(expr.value)
-        distance = self.locals.get(id(expr))
-        if distance is not None:
-            self.environment.assign_at(distance, expr.name, value)
+        if expr.depth is not None:
+            self.environment.assign_at(expr.depth, expr.slot, value)
         else:
             self.global_env.assign(expr.name, value)
         return value
@@ -185,15 +205,20 @@ class Interpreter:
 
     @evaluate.register
     def _(self, expr: expr.Super) -> LoxCallable:
-        distance = self.locals.get(id(expr))
-        superclass = self.environment.get_at(distance, "super")
-        obj = self.environment.get_at(distance - 1, "this")
+        obj, method = self.find_super_method(expr)
+        return method.bind(obj)
+
+    def find_super_method(self, expr: expr.Super) -> tuple[LoxInstance, LoxFunction]:
+        distance = expr.depth
+        assert distance is not None
+        superclass = self.environment.get_at(distance, 0)
+        obj = self.environment.get_at(distance - 1, 0)
         method = superclass.find_method(expr.method.lexeme)
         if method is None:
             raise LoxRuntimeError(
                 expr.method, f"Undefined property '{expr.method.lexeme}'."
             )
-        return method.bind(obj)
+        return obj, method
 
     @evaluate.register
     def _(self, expr: expr.This) -> LoxInstance:
@@ -219,10 +244,9 @@ class Interpreter:
     def _(self, expr: expr.Variable) -> str | float | bool | LoxCallable | None:
         return self.lookup_variable(expr.name, expr)
 
-    def lookup_variable(self, name: Token, expr: expr.Expr):
-        distance = self.locals.get(id(expr))
-        if distance is not None:
-            return self.environment.get_at(distance, name.lexeme)
+    def lookup_variable(self, name: Token, expr: expr.This | expr.Variable):
+        if expr.depth is not None:
+            return self.environment.get_at(expr.depth, expr.slot)
         else:
             return self.global_env.get(name)
 
@@ -264,19 +288,42 @@ class Interpreter:
 
     @evaluate.register
     def _(self, expr: expr.Call) -> str | float | bool | LoxCallable | None:
-        callee = self.evaluate(expr.callee)
+        function, this, arguments = self.call_target(expr)
+        if isinstance(function, LoxFunction):
+            # straight into the trampoline, rather than through __call__ or
+            # invoke, to keep deep recursion off Python's stack
+            return function.execute(self, function.frame(this, arguments))
+        return function(self, arguments)
+
+    def call_target(
+        self, expr: expr.Call
+    ) -> tuple[LoxCallable, LoxInstance | None, list[Any]]:
+        # obj.method(...) and super.method(...) run the method with `this` passed
+        # in directly, so no bound LoxFunction is allocated for the call.
+        this: LoxInstance | None = None
+        match expr.callee:
+            case Get(obj=obj, name=name):
+                this = self.evaluate(obj)
+                if not isinstance(this, LoxInstance):
+                    raise LoxRuntimeError(name, "Only instances have properties.")
+                callee, is_method = this.lookup(name)
+                if not is_method:
+                    this = None
+            case Super():
+                this, callee = self.find_super_method(expr.callee)
+            case _:
+                callee = self.evaluate(expr.callee)
         arguments: list[Any] = []
         for argument in expr.arguments:
             arguments.append(self.evaluate(argument))
         if not isinstance(callee, LoxCallable):
             raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
-        function = callee
-        if len(arguments) != function.arity:
+        if len(arguments) != callee.arity:
             raise LoxRuntimeError(
                 expr.paren,
-                f"Expected {function.arity} arguments but got {len(arguments)}",
+                f"Expected {callee.arity} arguments but got {len(arguments)}",
             )
-        return function(self, arguments)
+        return callee, this, arguments
 
     @evaluate.register
     def _(self, expr: expr.Get) -> str | float | bool | LoxCallable | None:
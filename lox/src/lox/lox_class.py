@@ -4,38 +4,49 @@ from typing import TYPE_CHECKING, Any
 
 from lox.callable import LoxCallable
 from lox.lox_function import LoxFunction
-from lox.lox_instance import LoxInstance
+from lox.lox_instance import LoxInstance, Shape
 
 if TYPE_CHECKING:
     from lox.interpreter import Interpreter
 
 
 class LoxClass(LoxCallable):
+    __slots__ = (
+        "name",
+        "superclass",
+        "methods",
+        "shape",
+        "initializer",
+        "init_arity",
+    )
+
     def __init__(
         self, name: str, superclass: LoxClass | None, methods: dict[str, LoxFunction]
     ) -> None:
         self.name = name
         self.superclass = superclass
-        self.methods = methods
+        # Classes can't change once defined, so the inherited methods are
+        # copied in up front and every lookup is a single dict access.
+        if superclass is not None:
+            self.methods = {**superclass.methods, **methods}
+        else:
+            self.methods = methods
+        self.shape = Shape({})
+        self.initializer = self.methods.get("init")
+        self.init_arity = self.initializer.arity if self.initializer else 0
 
     def __str__(self):
         return self.name
 
     def __call__(self, interpreter: Interpreter, arguments: list[Any]) -> Any:
         instance = LoxInstance(self)
-        initializer = self.find_method("init")
-        if initializer is not None:
-            initializer.bind(instance)(interpreter, arguments)
+        if self.initializer is not None:
+            self.initializer.invoke(interpreter, instance, arguments)
         return instance
 
     @property
     def arity(self) -> int:
-        initializer = self.find_method("init")
-        return initializer.arity if initializer is not None else 0
+        return self.init_arity
 
     def find_method(self, name: str) -> LoxFunction | None:
-        if name in self.methods:
-            return self.methods[name]
-        if self.superclass is not None:
-            return self.superclass.methods.get(name)
-        return None
+        return self.methods.get(name)
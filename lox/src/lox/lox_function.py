@@ -3,9 +3,9 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any
 
 from lox.callable import LoxCallable
-from lox.environment import Environment
+from lox.environment import Environment, GlobalEnvironment
 from lox.lox_instance import LoxInstance
-from lox.return_class import Return
+from lox.return_class import Completion, Return, TailCall
 from lox.stmt import Function
 
 if TYPE_CHECKING:
@@ -13,31 +13,70 @@ if TYPE_CHECKING:
 
 
 class LoxFunction(LoxCallable):
+    __slots__ = ("declaration", "closure", "is_initializer")
+
     def __init__(
-        self, declaration: Function, closure: Environment, is_initializer: bool
+        self,
+        declaration: Function,
+        closure: Environment | GlobalEnvironment,
+        is_initializer: bool,
     ) -> None:
         self.declaration = declaration
         self.closure = closure
         self.is_initializer = is_initializer
 
     def __call__(self, interpreter: Interpreter, arguments: list[Any]) -> Any:
-        environment = Environment(self.closure)
-        for param, arg in zip(self.declaration.params, arguments):
-            environment.define(param.lexeme, arg)
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return as r:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return r.value
-
-        if self.is_initializer:
-            return self.closure.get_at(0, "this")
+        return self.execute(interpreter, Environment(self.closure, arguments))
+
+    def invoke(
+        self, interpreter: Interpreter, instance: LoxInstance, arguments: list[Any]
+    ) -> Any:
+        # Calls the method as if it were bound to instance, without creating
+        # the bound LoxFunction.
+        return self.execute(interpreter, self.frame(instance, arguments))
+
+    def frame(self, this: LoxInstance | None, arguments: list[Any]) -> Environment:
+        if this is None:
+            return Environment(self.closure, arguments)
+        return Environment(Environment(self.closure, [this]), arguments)
+
+    def execute(self, interpreter: Any, environment: Environment) -> Any:
+        # Tail calls come back as a TailCall and are run by this loop, so a
+        # chain of them uses one Python frame however long it gets. The tree
+        # engine's run is inlined, so that a call costs it no frame either.
+        function = self
+        while True:
+            try:
+                run = type(function).run
+                if run is LoxFunction.run:
+                    completion = interpreter.execute_block(
+                        function.declaration.body, environment
+                    )
+                else:
+                    completion = run(function, interpreter, environment)
+            except Return as r:
+                # engines that signal returns by raising
+                completion = r.value
+                if type(completion) is not TailCall:
+                    if function.is_initializer:
+                        return environment.enclosing.values[0]
+                    return completion
+            if type(completion) is TailCall:
+                function = completion.function
+                environment = function.frame(completion.this, completion.arguments)
+                continue
+            if function.is_initializer:
+                return environment.enclosing.values[0]
+            return completion.value if completion is not None else None
+
+    def run(
+        self, interpreter: Interpreter, environment: Environment
+    ) -> Completion | TailCall | None:
+        return interpreter.execute_block(self.declaration.body, environment)
 
     def bind(self, instance: LoxInstance) -> LoxFunction:
-        environment = Environment(self.closure)
-        environment.define("this", instance)
-        return LoxFunction(self.declaration, environment, self.is_initializer)
+        environment = Environment(self.closure, [instance])
+        return type(self)(self.declaration, environment, self.is_initializer)
 
     @property
     def arity(self) -> int:
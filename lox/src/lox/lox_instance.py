@@ -9,21 +9,56 @@ if TYPE_CHECKING:
     from lox.lox_class import LoxClass
 
 
+class Shape:
+    # Maps field names to their index in an instance's values. Instances that
+    # gain the same fields in the same order share one shape.
+    __slots__ = ("index", "transitions")
+
+    def __init__(self, index: dict[str, int]) -> None:
+        self.index = index
+        self.transitions: dict[str, Shape] = {}
+
+    def add(self, name: str) -> Shape:
+        shape = self.transitions.get(name)
+        if shape is None:
+            shape = Shape({**self.index, name: len(self.index)})
+            self.transitions[name] = shape
+        return shape
+
+
 class LoxInstance:
+    __slots__ = ("klass", "shape", "values")
+
     def __init__(self, klass: LoxClass):
         self.klass = klass
-        self.fields: dict[str, Any] = {}
+        self.shape = klass.shape
+        self.values: list[Any] = []
+
+    @property
+    def fields(self) -> dict[str, Any]:
+        return {name: self.values[i] for name, i in self.shape.index.items()}
 
     def __str__(self) -> str:
         return f"{self.klass.name} instance"
 
     def get(self, name: Token) -> Any:
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
+        value, is_method = self.lookup(name)
+        return value.bind(self) if is_method else value
+
+    def lookup(self, name: Token) -> tuple[Any, bool]:
+        # Returns the field value, or the unbound method and True.
+        i = self.shape.index.get(name.lexeme)
+        if i is not None:
+            return self.values[i], False
         method = self.klass.find_method(name.lexeme)
         if method is not None:
-            return method.bind(self)
+            return method, True
         raise LoxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
 
     def set(self, name: Token, value: Any):
-        self.fields[name.lexeme] = value
+        i = self.shape.index.get(name.lexeme)
+        if i is not None:
+            self.values[i] = value
+        else:
+            self.shape = self.shape.add(name.lexeme)
+            self.values.append(value)
@@ -10,6 +10,8 @@ if TYPE_CHECKING:
 
 
 class Clock(LoxCallable):
+    __slots__ = ()
+
     @property
     def arity(self):
         return 0
@@ -0,0 +1,214 @@
+from dataclasses import replace
+from functools import singledispatchmethod
+from typing import Any
+
+import lox.expr as expr
+import lox.stmt as stmt
+from lox.interpreter import is_equal, is_truthy
+from lox.token_type import TokenType
+
+NUMBER = (int, float)
+
+
+def fold_binary(operator: TokenType, left: Any, right: Any) -> expr.Literal | None:
+    # Only operations that cannot fail at runtime are folded, so every error
+    # is still raised by the interpreter at the operator's line.
+    match operator:
+        case TokenType.EQUAL_EQUAL:
+            return expr.Literal(is_equal(left, right))
+        case TokenType.BANG_EQUAL:
+            return expr.Literal(not is_equal(left, right))
+        case _:
+            pass
+    numbers = isinstance(left, NUMBER) and isinstance(right, NUMBER)
+    if operator == TokenType.PLUS:
+        if numbers or (isinstance(left, str) and isinstance(right, str)):
+            return expr.Literal(left + right)
+        return None
+    if not numbers:
+        return None
+    match operator:
+        case TokenType.MINUS:
+            return expr.Literal(left - right)
+        case TokenType.STAR:
+            return expr.Literal(left * right)
+        case TokenType.SLASH:
+            return expr.Literal(left / right) if right != 0 else None
+        case TokenType.GREATER:
+            return expr.Literal(left > right)
+        case TokenType.GREATER_EQUAL:
+            return expr.Literal(left >= right)
+        case TokenType.LESS:
+            return expr.Literal(left < right)
+        case TokenType.LESS_EQUAL:
+            return expr.Literal(left <= right)
+        case _:
+            return None
+
+
+def is_pure(node: expr.Expr) -> bool:
+    # Expressions that have no side effects and can never raise.
+    match node:
+        case expr.Literal() | expr.This():
+            return True
+        case expr.Variable():
+            return node.depth is not None
+        case expr.Grouping():
+            return is_pure(node.expression)
+        case expr.Logical():
+            return is_pure(node.left) and is_pure(node.right)
+        case expr.Unary(operator=operator, right=right):
+            return operator.type == TokenType.BANG and is_pure(right)
+        case _:
+            return False
+
+
+class Optimizer:
+    def optimize(self, statements: list[stmt.Stmt | None]) -> list[stmt.Stmt | None]:
+        optimized: list[stmt.Stmt | None] = []
+        for statement in statements:
+            result = self.visit(statement)
+            if result is not None:
+                optimized.append(result)
+        return optimized
+
+    @singledispatchmethod
+    def visit(self, node: Any) -> Any:
+        raise NotImplementedError(
+            f"Optimizer.visit() is not implemented for {type(node)}"
+        )
+
+    # statements; returning None removes the statement
+    @visit.register
+    def _(self, node: stmt.Block) -> stmt.Stmt | None:
+        return replace(node, statements=self.optimize(node.statements))
+
+    @visit.register
+    def _(self, node: stmt.Class) -> stmt.Stmt | None:
+        return replace(node, methods=[self.visit(method) for method in node.methods])
+
+    @visit.register
+    def _(self, node: stmt.Expression) -> stmt.Stmt | None:
+        expression = self.visit(node.expression)
+        if is_pure(expression):
+            return None
+        return replace(node, expression=expression)
+
+    @visit.register
+    def _(self, node: stmt.Function) -> stmt.Stmt | None:
+        return replace(node, body=self.optimize(node.body))
+
+    @visit.register
+    def _(self, node: stmt.If) -> stmt.Stmt | None:
+        condition = self.visit(node.condition)
+        then_branch = self.visit(node.then_branch)
+        else_branch = None
+        if node.else_branch is not None:
+            else_branch = self.visit(node.else_branch)
+        if isinstance(condition, expr.Literal):
+            return then_branch if is_truthy(condition.value) else else_branch
+        if then_branch is None:
+            then_branch = stmt.Block([])
+        return replace(
+            node, condition=condition, then_branch=then_branch, else_branch=else_branch
+        )
+
+    @visit.register
+    def _(self, node: stmt.Print) -> stmt.Stmt | None:
+        return replace(node, expression=self.visit(node.expression))
+
+    @visit.register
+    def _(self, node: stmt.Return) -> stmt.Stmt | None:
+        if node.value is None:
+            return node
+        return replace(node, value=self.visit(node.value))
+
+    @visit.register
+    def _(self, node: stmt.Var) -> stmt.Stmt | None:
+        if node.initializer is None:
+            return node
+        return replace(node, initializer=self.visit(node.initializer))
+
+    @visit.register
+    def _(self, node: stmt.While) -> stmt.Stmt | None:
+        condition = self.visit(node.condition)
+        if isinstance(condition, expr.Literal) and not is_truthy(condition.value):
+            return None
+        body = self.visit(node.body)
+        if body is None:
+            body = stmt.Block([])
+        return replace(node, condition=condition, body=body)
+
+    # expressions
+    @visit.register
+    def _(self, node: expr.Assign) -> expr.Expr:
+        return replace(node, value=self.visit(node.value))
+
+    @visit.register
+    def _(self, node: expr.Binary) -> expr.Expr:
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if isinstance(left, expr.Literal) and isinstance(right, expr.Literal):
+            folded = fold_binary(node.operator.type, left.value, right.value)
+            if folded is not None:
+                return folded
+        return expr.Binary(left, node.operator, right)
+
+    @visit.register
+    def _(self, node: expr.Call) -> expr.Expr:
+        return expr.Call(
+            self.visit(node.callee),
+            node.paren,
+            [self.visit(argument) for argument in node.arguments],
+        )
+
+    @visit.register
+    def _(self, node: expr.Get) -> expr.Expr:
+        return expr.Get(self.visit(node.obj), node.name)
+
+    @visit.register
+    def _(self, node: expr.Grouping) -> expr.Expr:
+        expression = self.visit(node.expression)
+        if isinstance(expression, expr.Literal):
+            return expression
+        return expr.Grouping(expression)
+
+    @visit.register
+    def _(self, node: expr.Literal) -> expr.Expr:
+        return node
+
+    @visit.register
+    def _(self, node: expr.Logical) -> expr.Expr:
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if isinstance(left, expr.Literal):
+            if node.operator.type == TokenType.OR:
+                return left if is_truthy(left.value) else right
+            return right if is_truthy(left.value) else left
+        return expr.Logical(left, node.operator, right)
+
+    @visit.register
+    def _(self, node: expr.Set) -> expr.Expr:
+        return expr.Set(self.visit(node.obj), node.name, self.visit(node.value))
+
+    @visit.register
+    def _(self, node: expr.Super) -> expr.Expr:
+        return node
+
+    @visit.register
+    def _(self, node: expr.This) -> expr.Expr:
+        return node
+
+    @visit.register
+    def _(self, node: expr.Unary) -> expr.Expr:
+        right = self.visit(node.right)
+        if isinstance(right, expr.Literal):
+            if node.operator.type == TokenType.BANG:
+                return expr.Literal(not is_truthy(right.value))
+            if isinstance(right.value, NUMBER):
+                return expr.Literal(-right.value)
+        return expr.Unary(node.operator, right)
+
+    @visit.register
+    def _(self, node: expr.Variable) -> expr.Expr:
+        return node
@@ -27,6 +27,12 @@ call -> primary ( "(" arguments? ")" | "." IDENTIFIER )* ;
 arguments -> expression ( "," expression )* ;
 primary -> NUMBER | STRING | "true" | "false" | "nil" | "(" expression ")" | IDENTIFIER ;
 """
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from enum import IntEnum, auto
+
 import lox.error as error
 import lox.stmt as stmt
 from lox.expr import (
@@ -51,24 +57,62 @@ class ParseError(Exception):
     pass
 
 
+class Precedence(IntEnum):
+    NONE = 0
+    ASSIGNMENT = auto()  # =
+    OR = auto()  # or
+    AND = auto()  # and
+    EQUALITY = auto()  # == !=
+    COMPARISON = auto()  # < > <= >=
+    TERM = auto()  # + -
+    FACTOR = auto()  # * /
+    UNARY = auto()  # ! -
+    CALL = auto()  # . ()
+    PRIMARY = auto()
+
+
 class Parser:
-    def __init__(self, tokens: list[Token]) -> None:
-        self.tokens = tokens
-        self.current = 0
+    # Nodes are built through these, so a subclass can build another
+    # representation of the tree from the same grammar.
+    make_binary = Binary
+    make_call = Call
+    make_get = Get
+    make_grouping = Grouping
+    make_literal = Literal
+    make_logical = Logical
+    make_super = Super
+    make_this = This
+    make_unary = Unary
+    make_variable = Variable
+    make_block = stmt.Block
+    make_class = stmt.Class
+    make_expression = stmt.Expression
+    make_function = stmt.Function
+    make_if = stmt.If
+    make_print = stmt.Print
+    make_return = stmt.Return
+    make_while = stmt.While
+    make_var = stmt.Var
+
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        self.tokens = iter(tokens)
+        self.current = next(self.tokens)
+        self.last = self.current
 
     # utility methods
     def is_at_end(self) -> bool:
         return self.peek().type == TokenType.EOF
 
     def peek(self) -> Token:
-        return self.tokens[self.current]
+        return self.current
 
     def previous(self) -> Token:
-        return self.tokens[self.current - 1]
+        return self.last
 
     def advance(self) -> Token:
         if not self.is_at_end():
-            self.current += 1
+            self.last = self.current
+            self.current = next(self.tokens)
         return self.previous()
 
     def check(self, typ: TokenType) -> bool:
@@ -114,7 +158,13 @@ class Parser:
     def parse(self) -> list[stmt.Stmt | None]:
         statements: list[stmt.Stmt | None] = []
         while not self.is_at_end():
-            statements.append(self.declaration())
+            try:
+                statements.append(self.declaration())
+            except RecursionError:
+                # Report it out here, where the stack has unwound; the rest of
+                # the nested construct can't be parsed, so stop.
+                self.error(self.peek(), "Too much nesting.")
+                break
         return statements
 
     def declaration(self) -> stmt.Stmt | None:
@@ -135,13 +185,13 @@ class Parser:
         superclass = None
         if self.match(TokenType.LESS):
             self.consume(TokenType.IDENTIFIER, "Expect superclass name.")
-            superclass = Variable(self.previous())
+            superclass = self.make_variable(self.previous())
         self.consume(TokenType.LEFT_BRACE, "Expect '{' after class name.")
         methods: list[stmt.Function] = []
         while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
             methods.append(self.function("method"))
         self.consume(TokenType.RIGHT_BRACE, "Expect '}' after class body.")
-        return stmt.Class(name, superclass, methods)
+        return self.make_class(name, superclass, methods)
 
     def var_declaration(self) -> stmt.Var:
         name = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
@@ -149,7 +199,7 @@ class Parser:
         if self.match(TokenType.EQUAL):
             initializer = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration.")
-        return stmt.Var(name, initializer)
+        return self.make_var(name, initializer)
 
     def statement(self) -> stmt.Stmt:
         if self.match(TokenType.FOR):
@@ -163,10 +213,11 @@ class Parser:
         if self.match(TokenType.WHILE):
             return self.while_statement()
         if self.match(TokenType.LEFT_BRACE):
-            return stmt.Block(self.block())
+            return self.make_block(self.block())
         return self.expression_statement()
 
     def for_statement(self) -> stmt.While | stmt.Block:
+        keyword = self.previous()
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
 
         if self.match(TokenType.SEMICOLON):
@@ -191,18 +242,19 @@ class Parser:
         body = self.statement()
 
         if increment is not None:
-            body = stmt.Block([body, stmt.Expression(increment)])
+            body = self.make_block([body, self.make_expression(increment, keyword)])
 
         if condition is None:
-            condition = Literal(True)
-        body = stmt.While(condition, body)
+            condition = self.make_literal(True)
+        body = self.make_while(condition, body, keyword)
 
         if initializer is not None:
-            body = stmt.Block([initializer, body])
+            body = self.make_block([initializer, body])
 
         return body
 
     def if_statement(self) -> stmt.If:
+        keyword = self.previous()
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
         condition = self.expression()
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after if condition.")
@@ -210,12 +262,13 @@ class Parser:
         else_branch = None
         if self.match(TokenType.ELSE):
             else_branch = self.statement()
-        return stmt.If(condition, then_branch, else_branch)
+        return self.make_if(condition, then_branch, else_branch, keyword)
 
     def print_statement(self) -> stmt.Print:
+        keyword = self.previous()
         value = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
-        return stmt.Print(value)
+        return self.make_print(value, keyword)
 
     def return_statement(self) -> stmt.Return:
         keyword = self.previous()
@@ -223,14 +276,15 @@ class Parser:
         if not self.check(TokenType.SEMICOLON):
             value = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after return value.")
-        return stmt.Return(keyword, value)
+        return self.make_return(keyword, value)
 
     def while_statement(self) -> stmt.While:
+        keyword = self.previous()
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
         expr = self.expression()
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after 'while'.")
         body = self.statement()
-        return stmt.While(expr, body)
+        return self.make_while(expr, body, keyword)
 
     def block(self) -> list[stmt.Stmt | None]:
         statements: list[stmt.Stmt | None] = []
@@ -240,9 +294,10 @@ class Parser:
         return statements
 
     def expression_statement(self) -> stmt.Expression:
+        first = self.peek()
         expr = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
-        return stmt.Expression(expr)
+        return self.make_expression(expr, first)
 
     def function(self, kind: str) -> stmt.Function:
         name = self.consume(TokenType.IDENTIFIER, f"Expect {kind} name.")
@@ -263,99 +318,60 @@ class Parser:
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
         self.consume(TokenType.LEFT_BRACE, f"Expect '{{' before {kind} body.")
         body = self.block()
-        return stmt.Function(name, parameters, body)
+        return self.make_function(name, parameters, body)
+
+    # expressions
+    def parse_precedence(self, precedence: int) -> Expr:
+        # Parses an expression whose operators bind at least as tightly as
+        # `precedence`, looking each token's handlers up in `rules`.
+        token = self.current
+        prefix = rules[token.type].prefix
+        if prefix is None:
+            raise self.error(token, "Expect expression.")
+        self.advance()
+        expr = prefix(self, token)
+        while precedence <= rules[self.current.type].precedence:
+            token = self.advance()
+            infix = rules[token.type].infix
+            assert infix is not None
+            expr = infix(self, expr, token)
+        return expr
 
     def expression(self) -> Expr:
-        return self.assignment()
+        return self.parse_precedence(Precedence.ASSIGNMENT)
 
-    def assignment(self) -> Expr:
-        expr = self.logic_or()
-        if self.match(TokenType.EQUAL):
-            equals = self.previous()
-            value = self.assignment()
-            if isinstance(expr, Variable):
-                name = expr.name
-                return Assign(name, value)
-            elif isinstance(expr, Get):
-                return Set(expr.obj, expr.name, value)
+    def assignment(self, target: Expr, equals: Token) -> Expr:
+        value = self.parse_precedence(Precedence.ASSIGNMENT)
+        assignment = self.make_assignment(target, value)
+        if assignment is None:
             raise self.error(equals, "Invalid assignment target.")
-        return expr
+        return assignment
 
-    def logic_or(self) -> Expr:
-        expr = self.logic_and()
-        while self.match(TokenType.OR):
-            operator = self.previous()
-            right = self.logic_and()
-            expr = Logical(expr, operator, right)
-        return expr
+    def make_assignment(self, target: Expr, value: Expr) -> Expr | None:
+        if isinstance(target, Variable):
+            return Assign(target.name, value)
+        if isinstance(target, Get):
+            return Set(target.obj, target.name, value)
+        return None
 
-    def logic_and(self) -> Expr:
-        expr = self.equality()
-        while self.match(TokenType.AND):
-            operator = self.previous()
-            right = self.logic_and()
-            expr = Logical(expr, operator, right)
-        return expr
-
-    def equality(self) -> Expr:
-        expr = self.comparison()
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
-        return expr
+    def logic_or(self, left: Expr, operator: Token) -> Expr:
+        right = self.parse_precedence(Precedence.AND)
+        return self.make_logical(left, operator, right)
 
-    def comparison(self) -> Expr:
-        expr = self.term()
-        while self.match(
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        ):
-            operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)
-        return expr
+    def logic_and(self, left: Expr, operator: Token) -> Expr:
+        # "and" groups to the right: a and (b and c)
+        right = self.parse_precedence(Precedence.AND)
+        return self.make_logical(left, operator, right)
 
-    def term(self) -> Expr:
-        expr = self.factor()
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def factor(self) -> Expr:
-        expr = self.unary()
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-        return expr
+    def binary(self, left: Expr, operator: Token) -> Expr:
+        right = self.parse_precedence(rules[operator.type].precedence + 1)
+        return self.make_binary(left, operator, right)
 
-    def unary(self) -> Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-        return self.call()
-
-    def call(self) -> Expr:
-        expr = self.primary()
-        while True:
-            if self.match(TokenType.LEFT_PAREN):
-                expr = self.finish_call(expr)
-            elif self.match(TokenType.DOT):
-                name = self.consume(
-                    TokenType.IDENTIFIER, "Expect property name after '.'."
-                )
-                expr = Get(expr, name)
-            else:
-                break
-        return expr
+    def unary(self, operator: Token) -> Expr:
+        right = self.parse_precedence(Precedence.UNARY)
+        return self.make_unary(operator, right)
 
-    def finish_call(self, callee: Expr) -> Expr:
+    def call(self, callee: Expr, left_paren: Token) -> Expr:
         arguments: list[Expr] = []
         if not self.check(TokenType.RIGHT_PAREN):
             arguments.append(self.expression())
@@ -364,30 +380,89 @@ class Parser:
                     raise self.error(self.peek(), "Can't have more than 255 arguments.")
                 arguments.append(self.expression())
         paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
-        return Call(callee, paren, arguments)
-
-    def primary(self) -> Expr:
-        if self.match(TokenType.FALSE):
-            return Literal(False)
-        if self.match(TokenType.TRUE):
-            return Literal(True)
-        if self.match(TokenType.NIL):
-            return Literal(None)
-        if self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
-        if self.match(TokenType.SUPER):
-            keyword = self.previous()
-            self.consume(TokenType.DOT, "Expect '.' after 'super'.")
-            method = self.consume(
-                TokenType.IDENTIFIER, "Expect superclass method name."
-            )
-            return Super(keyword, method)
-        if self.match(TokenType.THIS):
-            return This(self.previous())
-        if self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
-        if self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
-        raise self.error(self.peek(), "Expect expression.")
+        return self.make_call(callee, paren, arguments)
+
+    def dot(self, obj: Expr, dot: Token) -> Expr:
+        name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+        return self.make_get(obj, name)
+
+    def grouping(self, paren: Token) -> Expr:
+        expr = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return self.make_grouping(expr)
+
+    def literal(self, token: Token) -> Expr:
+        match token.type:
+            case TokenType.FALSE:
+                return self.make_literal(False)
+            case TokenType.TRUE:
+                return self.make_literal(True)
+            case TokenType.NIL:
+                return self.make_literal(None)
+            case _:
+                return self.make_literal(token.literal)
+
+    def super_(self, keyword: Token) -> Expr:
+        self.consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        return self.make_super(keyword, method)
+
+    def this(self, keyword: Token) -> Expr:
+        return self.make_this(keyword)
+
+    def variable(self, name: Token) -> Expr:
+        return self.make_variable(name)
+
+
+PrefixFn = Callable[[Parser, Token], Expr]
+InfixFn = Callable[[Parser, Expr, Token], Expr]
+
+
+@dataclass(slots=True)
+class ParseRule:
+    prefix: PrefixFn | None
+    infix: InfixFn | None
+    precedence: Precedence
+
+
+rules: dict[TokenType, ParseRule] = {
+    TokenType.LEFT_PAREN: ParseRule(Parser.grouping, Parser.call, Precedence.CALL),
+    TokenType.RIGHT_PAREN: ParseRule(None, None, Precedence.NONE),
+    TokenType.LEFT_BRACE: ParseRule(None, None, Precedence.NONE),
+    TokenType.RIGHT_BRACE: ParseRule(None, None, Precedence.NONE),
+    TokenType.COMMA: ParseRule(None, None, Precedence.NONE),
+    TokenType.DOT: ParseRule(None, Parser.dot, Precedence.CALL),
+    TokenType.MINUS: ParseRule(Parser.unary, Parser.binary, Precedence.TERM),
+    TokenType.PLUS: ParseRule(None, Parser.binary, Precedence.TERM),
+    TokenType.SEMICOLON: ParseRule(None, None, Precedence.NONE),
+    TokenType.SLASH: ParseRule(None, Parser.binary, Precedence.FACTOR),
+    TokenType.STAR: ParseRule(None, Parser.binary, Precedence.FACTOR),
+    TokenType.BANG: ParseRule(Parser.unary, None, Precedence.NONE),
+    TokenType.BANG_EQUAL: ParseRule(None, Parser.binary, Precedence.EQUALITY),
+    TokenType.EQUAL: ParseRule(None, Parser.assignment, Precedence.ASSIGNMENT),
+    TokenType.EQUAL_EQUAL: ParseRule(None, Parser.binary, Precedence.EQUALITY),
+    TokenType.GREATER: ParseRule(None, Parser.binary, Precedence.COMPARISON),
+    TokenType.GREATER_EQUAL: ParseRule(None, Parser.binary, Precedence.COMPARISON),
+    TokenType.LESS: ParseRule(None, Parser.binary, Precedence.COMPARISON),
+    TokenType.LESS_EQUAL: ParseRule(None, Parser.binary, Precedence.COMPARISON),
+    TokenType.IDENTIFIER: ParseRule(Parser.variable, None, Precedence.NONE),
+    TokenType.STRING: ParseRule(Parser.literal, None, Precedence.NONE),
+    TokenType.NUMBER: ParseRule(Parser.literal, None, Precedence.NONE),
+    TokenType.AND: ParseRule(None, Parser.logic_and, Precedence.AND),
+    TokenType.CLASS: ParseRule(None, None, Precedence.NONE),
+    TokenType.ELSE: ParseRule(None, None, Precedence.NONE),
+    TokenType.FALSE: ParseRule(Parser.literal, None, Precedence.NONE),
+    TokenType.FUN: ParseRule(None, None, Precedence.NONE),
+    TokenType.FOR: ParseRule(None, None, Precedence.NONE),
+    TokenType.IF: ParseRule(None, None, Precedence.NONE),
+    TokenType.NIL: ParseRule(Parser.literal, None, Precedence.NONE),
+    TokenType.OR: ParseRule(None, Parser.logic_or, Precedence.OR),
+    TokenType.PRINT: ParseRule(None, None, Precedence.NONE),
+    TokenType.RETURN: ParseRule(None, None, Precedence.NONE),
+    TokenType.SUPER: ParseRule(Parser.super_, None, Precedence.NONE),
+    TokenType.THIS: ParseRule(Parser.this, None, Precedence.NONE),
+    TokenType.TRUE: ParseRule(Parser.literal, None, Precedence.NONE),
+    TokenType.VAR: ParseRule(None, None, Precedence.NONE),
+    TokenType.WHILE: ParseRule(None, None, Precedence.NONE),
+    TokenType.EOF: ParseRule(None, None, Precedence.NONE),
+}
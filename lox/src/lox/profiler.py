@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, TextIO
+
+import lox.expr as expr
+import lox.stmt as stmt
+from lox.callable import LoxCallable
+from lox.environment import Environment, GlobalEnvironment
+from lox.interpreter import Interpreter
+from lox.lox_class import LoxClass
+from lox.lox_function import LoxFunction
+from lox.lox_instance import LoxInstance
+from lox.return_class import Completion, TailCall
+
+
+@dataclass
+class Entry:
+    # what is profiled, held so that its id() can't be reused for another
+    target: object = field(repr=False)
+    name: str
+    line: int | None
+    calls: int = 0
+    # seconds; inclusive time counts only the outermost of recursive calls
+    inclusive: float = 0.0
+    exclusive: float = 0.0
+    active: int = 0
+    call_sites: Counter[int] = field(default_factory=Counter)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "line": self.line,
+            "calls": self.calls,
+            "inclusive": self.inclusive,
+            "exclusive": self.exclusive,
+            "call_sites": {str(line): n for line, n in sorted(self.call_sites.items())},
+        }
+
+
+class Profiler:
+    def __init__(self) -> None:
+        # keyed on the id() of the target, since declarations aren't hashable
+        self.entries: dict[int, Entry] = {}
+        # time spent in callees, one slot per active call plus the top level
+        self.children: list[float] = [0.0]
+        self.call_line: int | None = None
+
+    def entry(self, target: object, name: str, line: int | None) -> Entry:
+        entry = self.entries.get(id(target))
+        if entry is None:
+            entry = self.entries[id(target)] = Entry(target, name, line)
+        return entry
+
+    def measure(self, entry: Entry, call: Callable[..., Any], *args: Any) -> Any:
+        entry.calls += 1
+        if self.call_line is not None:
+            entry.call_sites[self.call_line] += 1
+        entry.active += 1
+        self.children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            entry.active -= 1
+            if not entry.active:
+                entry.inclusive += elapsed
+            entry.exclusive += elapsed - self.children.pop()
+            self.children[-1] += elapsed
+
+    def sorted_entries(self) -> list[Entry]:
+        return sorted(self.entries.values(), key=lambda e: e.exclusive, reverse=True)
+
+    def report(self, file: TextIO = sys.stderr):
+        print(
+            f"{'function':<24}{'line':>6}{'calls':>10}{'incl ms':>12}{'excl ms':>12}"
+            "  call sites",
+            file=file,
+        )
+        for entry in self.sorted_entries():
+            line = entry.line if entry.line is not None else "-"
+            sites = ", ".join(str(site) for site in sorted(entry.call_sites))
+            print(
+                f"{entry.name:<24}{line:>6}{entry.calls:>10}"
+                f"{entry.inclusive * 1000:>12.3f}{entry.exclusive * 1000:>12.3f}"
+                f"  {sites}",
+                file=file,
+            )
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump([entry.to_json() for entry in self.sorted_entries()], f, indent=2)
+
+
+class ProfiledFunction(LoxFunction):
+    # Profiles each activation, so a tail call is counted as a call of its own.
+    __slots__ = ("qualified_name",)
+
+    def __init__(
+        self,
+        declaration: stmt.Function,
+        closure: Environment | GlobalEnvironment,
+        is_initializer: bool,
+    ) -> None:
+        super().__init__(declaration, closure, is_initializer)
+        # a method's class fills in "Class.method"
+        self.qualified_name = declaration.name.lexeme
+
+    def run(
+        self, interpreter: ProfilingInterpreter, environment: Environment
+    ) -> Completion | TailCall | None:
+        profiler = interpreter.profiler
+        declaration = self.declaration
+        entry = profiler.entry(declaration, self.qualified_name, declaration.name.line)
+        return profiler.measure(entry, super().run, interpreter, environment)
+
+    def bind(self, instance: LoxInstance) -> LoxFunction:
+        function = super().bind(instance)
+        if isinstance(function, ProfiledFunction):
+            function.qualified_name = self.qualified_name
+        return function
+
+
+class ProfiledClass(LoxClass):
+    __slots__ = ()
+
+    def __init__(
+        self, name: str, superclass: LoxClass | None, methods: dict[str, LoxFunction]
+    ) -> None:
+        super().__init__(name, superclass, methods)
+        for method_name, method in methods.items():
+            if isinstance(method, ProfiledFunction):
+                method.qualified_name = f"{name}.{method_name}"
+
+    def __call__(self, interpreter: ProfilingInterpreter, arguments: list[Any]) -> Any:
+        profiler = interpreter.profiler
+        entry = profiler.entry(self, f"{self.name}()", None)
+        return profiler.measure(entry, super().__call__, interpreter, arguments)
+
+
+class ProfiledNative(LoxCallable):
+    __slots__ = ("name", "native")
+
+    def __init__(self, name: str, native: LoxCallable) -> None:
+        self.name = name
+        self.native = native
+
+    @property
+    def arity(self) -> int:
+        return self.native.arity
+
+    def __call__(self, interpreter: ProfilingInterpreter, arguments: list[Any]) -> Any:
+        profiler = interpreter.profiler
+        entry = profiler.entry(self.native, self.name, None)
+        return profiler.measure(entry, self.native, interpreter, arguments)
+
+    def __str__(self) -> str:
+        return str(self.native)
+
+
+class ProfilingInterpreter(Interpreter):
+    function_type = ProfiledFunction
+    class_type = ProfiledClass
+
+    def __init__(self, profiler: Profiler) -> None:
+        super().__init__()
+        self.profiler = profiler
+        for name, value in list(self.global_env.values.items()):
+            if isinstance(value, LoxCallable):
+                self.global_env.define(name, ProfiledNative(name, value))
+
+    def call_target(
+        self, expr: expr.Call
+    ) -> tuple[LoxCallable, LoxInstance | None, list[Any]]:
+        target = super().call_target(expr)
+        self.profiler.call_line = expr.paren.line
+        return target
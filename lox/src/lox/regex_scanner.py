@@ -0,0 +1,86 @@
+import re
+import sys
+from collections.abc import Iterator
+
+from lox.error import error
+from lox.scanner import keywords
+from lox.token_type import Token, TokenType
+
+TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<skip>[ \r\t]+|//[^\n]*)
+    | (?P<newline>\n)
+    | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<number>[0-9]+(?:\.[0-9]+)?)
+    | (?P<operator>[!=<>]=?|[(){},.\-+;*/])
+    | (?P<string>"[^"]*")
+    | (?P<unterminated>"[^"]*)
+    | (?P<unexpected>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+operators = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "/": TokenType.SLASH,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+}
+
+
+class RegexScanner:
+    def __init__(self, source: str):
+        self.source = source
+        self.line = 1
+
+    def scan_tokens(self) -> list[Token]:
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
+        source = self.source
+        span = Token.span
+        line = self.line
+        for m in TOKEN_PATTERN.finditer(source):
+            kind = m.lastgroup
+            if kind == "skip":
+                continue
+            start, end = m.span()
+            if kind == "identifier":
+                text = m.group()
+                token_type = keywords.get(text)
+                if token_type is None:
+                    text = sys.intern(text)
+                    yield span(TokenType.IDENTIFIER, source, start, end, line, text)
+                else:
+                    yield span(token_type, source, start, end, line)
+            elif kind == "operator":
+                yield span(operators[source[start:end]], source, start, end, line)
+            elif kind == "newline":
+                line += 1
+            elif kind == "number":
+                yield span(TokenType.NUMBER, source, start, end, line)
+            elif kind == "string":
+                line += source.count("\n", start, end)
+                yield span(TokenType.STRING, source, start, end, line)
+            elif kind == "unterminated":
+                line += source.count("\n", start, end)
+                error(line, "Unterminated string.")
+            else:
+                error(line, f"Unexpected character '{m.group()}'.")
+        self.line = line
+        yield span(TokenType.EOF, source, len(source), len(source), line)
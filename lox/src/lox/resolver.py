@@ -4,7 +4,6 @@ from functools import singledispatchmethod
 import lox.error as error
 import lox.expr as expr
 import lox.stmt as stmt
-from lox.interpreter import Interpreter
 from lox.token_type import Token
 
 
@@ -22,9 +21,9 @@ class ClassType(Enum):
 
 
 class Resolver:
-    def __init__(self, interpreter: Interpreter):
-        self.interpreter = interpreter
+    def __init__(self):
         self.scopes: list[dict[str, bool]] = []
+        self.slots: list[dict[str, int]] = []
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
 
@@ -70,9 +69,9 @@ class Resolver:
             self.current_class = ClassType.SUBCLASS
             self.visit(stmt.superclass)
             self.begin_scope()
-            self.scopes[-1]["super"] = True
+            self.declare_synthetic("super")
         self.begin_scope()
-        self.scopes[-1]["this"] = True
+        self.declare_synthetic("this")
         for method in stmt.methods:
             declaration = (
                 FunctionType.INITIALIZER
@@ -105,6 +104,8 @@ class Resolver:
                 error.error_token(
                     stmt.keyword, "Can't return a value from an initializer."
                 )
+            elif isinstance(stmt.value, expr.Call):
+                stmt.tail_call = True
             self.visit(stmt.value)
 
     @visit.register
@@ -198,9 +199,11 @@ class Resolver:
 
     def begin_scope(self):
         self.scopes.append({})
+        self.slots.append({})
 
     def end_scope(self):
         self.scopes.pop()
+        self.slots.pop()
 
     def declare(self, name: Token):
         if not self.scopes:
@@ -209,14 +212,24 @@ class Resolver:
         if name.lexeme in scope:
             error.error_token(name, "Already a variable with this name in this scope.")
         scope[name.lexeme] = False
+        self.slots[-1].setdefault(name.lexeme, len(self.slots[-1]))
+
+    def declare_synthetic(self, name: str):
+        self.scopes[-1][name] = True
+        self.slots[-1][name] = len(self.slots[-1])
 
     def define(self, name: Token):
         if not self.scopes:
             return
         self.scopes[-1][name.lexeme] = True
 
-    def resolve_local(self, expr: expr.Expr, name: Token):
+    def resolve_local(
+        self, expr: expr.Assign | expr.Super | expr.This | expr.Variable, name: Token
+    ):
+        # The resolution is recorded on the node itself, so it lives exactly as
+        # long as the program does.
         for i in reversed(range(len(self.scopes))):
             if name.lexeme in self.scopes[i]:
-                self.interpreter.resolve(expr, len(self.scopes) - 1 - i)
+                expr.depth = len(self.scopes) - 1 - i
+                expr.slot = self.slots[i][name.lexeme]
                 return
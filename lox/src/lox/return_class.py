@@ -5,3 +5,23 @@ class Return(Exception):
     def __init__(self, value: Any, *args: object) -> None:
         super().__init__(*args)
         self.value = value
+
+
+class Completion:
+    # Returned, not raised, by a statement that ends the function body, and
+    # passed up through the enclosing statements to the LoxFunction.
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+class TailCall:
+    # Completes the body for `return f(...)`, so the calling LoxFunction runs f
+    # in its own loop instead of nesting a Python call.
+    __slots__ = ("function", "this", "arguments")
+
+    def __init__(self, function: Any, this: Any, arguments: list[Any]) -> None:
+        self.function = function
+        self.this = this
+        self.arguments = arguments
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import Counter
+from types import FrameType, TracebackType
+
+from lox.lox_function import LoxFunction
+
+DEFAULT_RATE = 100
+
+
+def lox_stack(frame: FrameType | None) -> str:
+    # Every Lox activation in the tree and closure engines runs inside a
+    # LoxFunction.execute call, whose `function` is the one running now, so the
+    # Lox stack can be read off the Python one without the interpreter keeping
+    # any bookkeeping of its own.
+    names: list[str] = []
+    while frame is not None:
+        if frame.f_code.co_name == "execute" and isinstance(
+            frame.f_locals.get("self"), LoxFunction
+        ):
+            function = frame.f_locals.get("function")
+            if isinstance(function, LoxFunction):
+                name = function.declaration.name
+                names.append(f"{name.lexeme}:{name.line}")
+        frame = frame.f_back
+    names.append("main")
+    return ";".join(reversed(names))
+
+
+class Sampler:
+    # Samples the Lox call stack of the thread that starts it from a background
+    # thread, and writes collapsed stacks ("main;foo:3;bar:7 42") for flamegraph
+    # tools.
+    def __init__(self, rate: int = DEFAULT_RATE) -> None:
+        self.interval = 1 / rate
+        self.stacks: Counter[str] = Counter()
+        self.stopped = threading.Event()
+        self.thread: threading.Thread | None = None
+        self.target = 0
+
+    def start(self):
+        self.target = threading.get_ident()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is not None:
+                self.stacks[lox_stack(frame)] += 1
+            del frame
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def __enter__(self) -> Sampler:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ):
+        self.stop()
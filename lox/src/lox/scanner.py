@@ -1,4 +1,6 @@
 import string
+import sys
+from collections.abc import Iterator
 
 from lox.error import error
 from lox.token_type import Token, TokenType
@@ -32,12 +34,18 @@ class Scanner:
         self.line = 1
 
     def scan_tokens(self) -> list[Token]:
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
         while not self.is_at_end():
             self.start = self.current
             self.scan_token()
+            if self.tokens:
+                yield from self.tokens
+                self.tokens.clear()
 
-        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
-        return self.tokens
+        end = len(self.source)
+        yield Token.span(TokenType.EOF, self.source, end, end, self.line)
 
     def is_at_end(self) -> bool:
         return self.current >= len(self.source)
@@ -100,9 +108,10 @@ class Scanner:
             case _:
                 error(self.line, f"Unexpected character '{c}'.")
 
-    def add_token(self, token: TokenType, literal: str | float | None = None):
-        text = self.source[self.start : self.current]
-        self.tokens.append(Token(token, text, literal, self.line))
+    def add_token(self, token: TokenType, lexeme: str | None = None):
+        self.tokens.append(
+            Token.span(token, self.source, self.start, self.current, self.line, lexeme)
+        )
 
     def advance(self) -> str:
         c = self.source[self.current]
@@ -140,8 +149,7 @@ class Scanner:
             return
 
         self.advance()
-        value = self.source[self.start + 1 : self.current - 1]
-        self.add_token(TokenType.STRING, value)
+        self.add_token(TokenType.STRING)
 
     def number(self):
         while self.peek() in string.digits:
@@ -150,13 +158,15 @@ class Scanner:
             self.advance()
             while self.peek() in string.digits:
                 self.advance()
-        value = float(self.source[self.start : self.current])
-        self.add_token(TokenType.NUMBER, value)
+        self.add_token(TokenType.NUMBER)
 
     def identifier(self):
         alnum = string.ascii_letters + string.digits + "_"
         while self.peek() in alnum:
             self.advance()
         text = self.source[self.start : self.current]
-        token_type = keywords.get(text, TokenType.IDENTIFIER)
-        self.add_token(token_type)
+        token_type = keywords.get(text)
+        if token_type is None:
+            self.add_token(TokenType.IDENTIFIER, sys.intern(text))
+        else:
+            self.add_token(token_type)
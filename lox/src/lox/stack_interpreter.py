@@ -0,0 +1,588 @@
+from __future__ import annotations
+
+import operator
+from functools import singledispatchmethod
+from typing import Any
+
+import lox.error as error
+import lox.expr as expr
+import lox.stmt as stmt
+from lox.callable import LoxCallable
+from lox.environment import Environment, GlobalEnvironment
+from lox.error import LoxRuntimeError
+from lox.interpreter import is_equal, stringify
+from lox.lox_class import LoxClass
+from lox.lox_function import LoxFunction
+from lox.lox_instance import LoxInstance
+from lox.native_function import Clock
+from lox.return_class import Completion
+from lox.token_type import TokenType
+
+# Lox calls may nest this deep before "Stack overflow." is reported.
+MAX_FRAMES = 1 << 18
+
+# Every instruction is an (opcode, operand) pair.
+CONSTANT = 0  # value
+POP = 1
+GET_LOCAL = 2  # slot in the innermost scope
+GET_ENCLOSING = 3  # (depth, slot)
+GET_GLOBAL = 4  # name token
+SET_LOCAL = 5  # slot in the innermost scope
+SET_ENCLOSING = 6  # (depth, slot)
+SET_GLOBAL = 7  # name token
+DEFINE_LOCAL = 8
+DEFINE_GLOBAL = 9  # lexeme
+GET_PROPERTY = 10  # name token
+CHECK_FIELDS = 11  # name token
+SET_PROPERTY = 12  # name token
+GET_SUPER = 13  # expr.Super
+ARITHMETIC = 14  # (function, operator token)
+ADD = 15  # operator token
+EQUAL = 16
+NOT_EQUAL = 17
+NEGATE = 18  # operator token
+NOT = 19
+JUMP = 20  # target
+JUMP_IF_FALSE = 21  # target
+JUMP_IF_FALSE_OR_POP = 22  # target
+JUMP_IF_TRUE_OR_POP = 23  # target
+PRINT = 24
+PUSH_SCOPE = 25
+POP_SCOPE = 26
+FUNCTION = 27  # (declaration, code)
+CLASS = 28  # (declaration, [(method, code)])
+METHOD = 29  # name token
+SUPER_METHOD = 30  # expr.Super
+CALL = 31  # (argument count, paren, tail call)
+CALL_METHOD = 32  # (argument count, paren, tail call)
+RETURN = 33
+
+Code = list[tuple[int, Any]]
+
+ARITHMETIC_OPERATORS = {
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+NUMBER = (int, float)
+
+
+class StackFunction(LoxFunction):
+    __slots__ = ("code",)
+
+    def __init__(
+        self,
+        declaration: stmt.Function,
+        closure: Environment | GlobalEnvironment,
+        is_initializer: bool,
+        code: Code,
+    ) -> None:
+        super().__init__(declaration, closure, is_initializer)
+        self.code = code
+
+    def run(self, interpreter: Any, environment: Environment) -> Completion:
+        # Only used when the function is called from outside the loop.
+        return Completion(interpreter.execute(Frame(self.code, environment)))
+
+    def bind(self, instance: LoxInstance) -> LoxFunction:
+        environment = Environment(self.closure, [instance])
+        return StackFunction(
+            self.declaration, environment, self.is_initializer, self.code
+        )
+
+
+class Frame:
+    __slots__ = ("code", "ip", "env", "receiver")
+
+    def __init__(
+        self,
+        code: Code,
+        env: Environment | GlobalEnvironment,
+        receiver: LoxInstance | None = None,
+    ) -> None:
+        self.code = code
+        self.ip = 0
+        self.env = env
+        # set for initializers, which return their instance whatever happens
+        self.receiver = receiver
+
+
+class Compiler:
+    # Flattens the resolved tree of each function into a list of instructions,
+    # with control flow as jumps, so nothing needs Python recursion to run.
+    def __init__(self) -> None:
+        self.code: Code = []
+        self.scope_depth = 0
+
+    def compile_script(self, statements: list[stmt.Stmt | None]) -> Code | None:
+        for index, statement in enumerate(statements):
+            try:
+                self.compile(statement)
+            except RecursionError:
+                error.error_nesting(statements, index)
+                return None
+        self.emit(CONSTANT, None)
+        self.emit(RETURN)
+        return self.code
+
+    def compile_function(self, function: stmt.Function) -> Code:
+        code, self.code = self.code, []
+        self.scope_depth += 1
+        try:
+            for statement in function.body:
+                self.compile(statement)
+            self.emit(CONSTANT, None)
+            self.emit(RETURN)
+            return self.code
+        finally:
+            self.scope_depth -= 1
+            self.code = code
+
+    def emit(self, op: int, operand: Any = None) -> int:
+        self.code.append((op, operand))
+        return len(self.code) - 1
+
+    def patch(self, index: int):
+        self.code[index] = (self.code[index][0], len(self.code))
+
+    def define(self, name: str):
+        if self.scope_depth == 0:
+            self.emit(DEFINE_GLOBAL, name)
+        else:
+            self.emit(DEFINE_LOCAL)
+
+    def call(self, node: expr.Call, tail: bool):
+        match node.callee:
+            case expr.Get(obj=obj, name=name):
+                self.compile(obj)
+                self.emit(METHOD, name)
+                op = CALL_METHOD
+            case expr.Super():
+                self.emit(SUPER_METHOD, node.callee)
+                op = CALL_METHOD
+            case _:
+                self.compile(node.callee)
+                op = CALL
+        for argument in node.arguments:
+            self.compile(argument)
+        self.emit(op, (len(node.arguments), node.paren, tail))
+
+    @singledispatchmethod
+    def compile(self, node: stmt.Stmt | expr.Expr) -> None:
+        raise NotImplementedError(
+            f"Compiler.compile() is not implemented for {type(node)}"
+        )
+
+    # statements
+    @compile.register
+    def _(self, node: stmt.Block):
+        self.emit(PUSH_SCOPE)
+        self.scope_depth += 1
+        for statement in node.statements:
+            self.compile(statement)
+        self.scope_depth -= 1
+        self.emit(POP_SCOPE)
+
+    @compile.register
+    def _(self, node: stmt.Class):
+        if node.superclass is not None:
+            self.compile(node.superclass)
+        methods = [(method, self.compile_function(method)) for method in node.methods]
+        self.emit(CLASS, (node, methods))
+        self.define(node.name.lexeme)
+
+    @compile.register
+    def _(self, node: stmt.Expression):
+        self.compile(node.expression)
+        self.emit(POP)
+
+    @compile.register
+    def _(self, node: stmt.Function):
+        self.emit(FUNCTION, (node, self.compile_function(node)))
+        self.define(node.name.lexeme)
+
+    @compile.register
+    def _(self, node: stmt.If):
+        self.compile(node.condition)
+        to_else = self.emit(JUMP_IF_FALSE)
+        self.compile(node.then_branch)
+        if node.else_branch is None:
+            self.patch(to_else)
+            return
+        to_end = self.emit(JUMP)
+        self.patch(to_else)
+        self.compile(node.else_branch)
+        self.patch(to_end)
+
+    @compile.register
+    def _(self, node: stmt.Print):
+        self.compile(node.expression)
+        self.emit(PRINT)
+
+    @compile.register
+    def _(self, node: stmt.Return):
+        if node.tail_call:
+            assert isinstance(node.value, expr.Call)
+            self.call(node.value, True)
+        elif node.value is not None:
+            self.compile(node.value)
+        else:
+            self.emit(CONSTANT, None)
+        self.emit(RETURN)
+
+    @compile.register
+    def _(self, node: stmt.Var):
+        if node.initializer is not None:
+            self.compile(node.initializer)
+        else:
+            self.emit(CONSTANT, None)
+        self.define(node.name.lexeme)
+
+    @compile.register
+    def _(self, node: stmt.While):
+        start = len(self.code)
+        self.compile(node.condition)
+        to_end = self.emit(JUMP_IF_FALSE)
+        self.compile(node.body)
+        self.emit(JUMP, start)
+        self.patch(to_end)
+
+    # expressions
+    @compile.register
+    def _(self, node: expr.Assign):
+        self.compile(node.value)
+        if node.depth is None:
+            self.emit(SET_GLOBAL, node.name)
+        elif node.depth == 0:
+            self.emit(SET_LOCAL, node.slot)
+        else:
+            self.emit(SET_ENCLOSING, (node.depth, node.slot))
+
+    @compile.register
+    def _(self, node: expr.Binary):
+        self.compile(node.left)
+        self.compile(node.right)
+        match node.operator.type:
+            case TokenType.EQUAL_EQUAL:
+                self.emit(EQUAL)
+            case TokenType.BANG_EQUAL:
+                self.emit(NOT_EQUAL)
+            case TokenType.PLUS:
+                self.emit(ADD, node.operator)
+            case typ:
+                self.emit(ARITHMETIC, (ARITHMETIC_OPERATORS[typ], node.operator))
+
+    @compile.register
+    def _(self, node: expr.Call):
+        self.call(node, False)
+
+    @compile.register
+    def _(self, node: expr.Get):
+        self.compile(node.obj)
+        self.emit(GET_PROPERTY, node.name)
+
+    @compile.register
+    def _(self, node: expr.Grouping):
+        self.compile(node.expression)
+
+    @compile.register
+    def _(self, node: expr.Literal):
+        self.emit(CONSTANT, node.value)
+
+    @compile.register
+    def _(self, node: expr.Logical):
+        self.compile(node.left)
+        if node.operator.type == TokenType.OR:
+            to_end = self.emit(JUMP_IF_TRUE_OR_POP)
+        else:
+            to_end = self.emit(JUMP_IF_FALSE_OR_POP)
+        self.compile(node.right)
+        self.patch(to_end)
+
+    @compile.register
+    def _(self, node: expr.Set):
+        self.compile(node.obj)
+        self.emit(CHECK_FIELDS, node.name)
+        self.compile(node.value)
+        self.emit(SET_PROPERTY, node.name)
+
+    @compile.register
+    def _(self, node: expr.Super):
+        self.emit(GET_SUPER, node)
+
+    @compile.register
+    def _(self, node: expr.This):
+        self.variable(node)
+
+    @compile.register
+    def _(self, node: expr.Unary):
+        self.compile(node.right)
+        if node.operator.type == TokenType.MINUS:
+            self.emit(NEGATE, node.operator)
+        else:
+            self.emit(NOT)
+
+    @compile.register
+    def _(self, node: expr.Variable):
+        self.variable(node)
+
+    def variable(self, node: expr.This | expr.Variable):
+        if node.depth is None:
+            assert isinstance(node, expr.Variable)
+            self.emit(GET_GLOBAL, node.name)
+        elif node.depth == 0:
+            self.emit(GET_LOCAL, node.slot)
+        else:
+            self.emit(GET_ENCLOSING, (node.depth, node.slot))
+
+
+class StackInterpreter:
+    # Runs compiled code in a single loop that keeps Lox frames on an explicit
+    # stack, so Lox call depth is limited by max_frames rather than by Python's
+    # recursion limit.
+    def __init__(self, max_frames: int = MAX_FRAMES) -> None:
+        self.global_env = GlobalEnvironment()
+        self.global_env.define("clock", Clock())
+        self.max_frames = max_frames
+
+    def interpret(self, statements: list[stmt.Stmt]):
+        code = Compiler().compile_script(statements)
+        if code is None:
+            return
+        try:
+            self.execute(Frame(code, self.global_env))
+        except LoxRuntimeError as e:
+            error.error_runtime(e)
+
+    def execute(self, frame: Frame) -> Any:
+        frames = [frame]
+        stack: list[Any] = []
+        push = stack.append
+        pop = stack.pop
+        global_env = self.global_env
+        code = frame.code
+        env = frame.env
+        ip = 0
+        while True:
+            op, operand = code[ip]
+            ip += 1
+            if op == GET_LOCAL:
+                push(env.values[operand])
+            elif op == CONSTANT:
+                push(operand)
+            elif op == GET_ENCLOSING:
+                depth, slot = operand
+                push(env.ancestor(depth).values[slot])
+            elif op == GET_GLOBAL:
+                push(global_env.get(operand))
+            elif op == ARITHMETIC:
+                b = pop()
+                a = pop()
+                if not (isinstance(a, NUMBER) and isinstance(b, NUMBER)):
+                    raise LoxRuntimeError(operand[1], "Operands must be numbers.")
+                push(operand[0](a, b))
+            elif op == ADD:
+                b = pop()
+                a = pop()
+                if not (
+                    (isinstance(a, NUMBER) and isinstance(b, NUMBER))
+                    or (isinstance(a, str) and isinstance(b, str))
+                ):
+                    raise LoxRuntimeError(
+                        operand, "Operands must be two numbers or two strings."
+                    )
+                push(a + b)
+            elif op == JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = operand
+            elif op == JUMP:
+                ip = operand
+            elif op == POP:
+                pop()
+            elif op == CALL or op == CALL_METHOD:
+                count, paren, tail = operand
+                arguments = stack[len(stack) - count :]
+                del stack[len(stack) - count :]
+                callee = pop()
+                this = pop() if op == CALL_METHOD else None
+                callee_frame = self.call(callee, this, arguments, paren, stack)
+                if callee_frame is None:
+                    continue
+                if tail:
+                    frames[-1] = callee_frame
+                else:
+                    if len(frames) >= self.max_frames:
+                        raise LoxRuntimeError(paren, "Stack overflow.")
+                    frame.ip = ip
+                    frame.env = env
+                    frames.append(callee_frame)
+                frame = callee_frame
+                code = frame.code
+                env = frame.env
+                ip = 0
+            elif op == RETURN:
+                value = pop()
+                if frame.receiver is not None:
+                    value = frame.receiver
+                frames.pop()
+                if not frames:
+                    return value
+                frame = frames[-1]
+                code = frame.code
+                env = frame.env
+                ip = frame.ip
+                push(value)
+            elif op == SET_LOCAL:
+                env.values[operand] = stack[-1]
+            elif op == SET_ENCLOSING:
+                depth, slot = operand
+                env.ancestor(depth).values[slot] = stack[-1]
+            elif op == SET_GLOBAL:
+                global_env.assign(operand, stack[-1])
+            elif op == DEFINE_LOCAL:
+                env.values.append(pop())
+            elif op == DEFINE_GLOBAL:
+                global_env.define(operand, pop())
+            elif op == EQUAL:
+                b = pop()
+                push(is_equal(pop(), b))
+            elif op == NOT_EQUAL:
+                b = pop()
+                push(not is_equal(pop(), b))
+            elif op == NOT:
+                value = pop()
+                push(value is None or value is False)
+            elif op == NEGATE:
+                value = pop()
+                if not isinstance(value, NUMBER):
+                    raise LoxRuntimeError(operand, "Operand must be a number.")
+                push(-value)
+            elif op == JUMP_IF_FALSE_OR_POP:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = operand
+                else:
+                    pop()
+            elif op == JUMP_IF_TRUE_OR_POP:
+                value = stack[-1]
+                if value is None or value is False:
+                    pop()
+                else:
+                    ip = operand
+            elif op == PUSH_SCOPE:
+                env = Environment(env)
+            elif op == POP_SCOPE:
+                env = env.enclosing
+            elif op == METHOD:
+                obj = pop()
+                if not isinstance(obj, LoxInstance):
+                    raise LoxRuntimeError(operand, "Only instances have properties.")
+                value, is_method = obj.lookup(operand)
+                push(obj if is_method else None)
+                push(value)
+            elif op == GET_PROPERTY:
+                obj = stack[-1]
+                if not isinstance(obj, LoxInstance):
+                    raise LoxRuntimeError(operand, "Only instances have properties.")
+                stack[-1] = obj.get(operand)
+            elif op == CHECK_FIELDS:
+                if not isinstance(stack[-1], LoxInstance):
+                    raise LoxRuntimeError(operand, "Only instances have fields.")
+            elif op == SET_PROPERTY:
+                value = pop()
+                pop().set(operand, value)
+                push(value)
+            elif op == SUPER_METHOD:
+                obj, method = self.find_super_method(operand, env)
+                push(obj)
+                push(method)
+            elif op == GET_SUPER:
+                obj, method = self.find_super_method(operand, env)
+                push(method.bind(obj))
+            elif op == PRINT:
+                print(stringify(pop()))
+            elif op == FUNCTION:
+                declaration, function_code = operand
+                push(StackFunction(declaration, env, False, function_code))
+            elif op == CLASS:
+                push(self.make_class(operand, env, stack))
+            else:
+                raise Exception("Must not be reached")
+
+    def call(
+        self,
+        callee: Any,
+        this: LoxInstance | None,
+        arguments: list[Any],
+        paren: Any,
+        stack: list[Any],
+    ) -> Frame | None:
+        # Returns the frame to run for Lox code; anything else is called here
+        # and its result pushed.
+        if not isinstance(callee, LoxCallable):
+            raise LoxRuntimeError(paren, "Can only call functions and classes.")
+        if len(arguments) != callee.arity:
+            raise LoxRuntimeError(
+                paren,
+                f"Expected {callee.arity} arguments but got {len(arguments)}",
+            )
+        if isinstance(callee, StackFunction):
+            function = callee
+        elif isinstance(callee, LoxClass):
+            this = LoxInstance(callee)
+            if callee.initializer is None:
+                stack.append(this)
+                return None
+            function = callee.initializer
+        else:
+            stack.append(callee(self, arguments))
+            return None
+        closure = function.closure
+        if this is not None:
+            closure = Environment(closure, [this])
+        receiver = None
+        if function.is_initializer:
+            receiver = this if this is not None else closure.values[0]
+        return Frame(function.code, Environment(closure, arguments), receiver)
+
+    def find_super_method(
+        self, node: expr.Super, env: Environment
+    ) -> tuple[LoxInstance, LoxFunction]:
+        distance = node.depth
+        assert distance is not None
+        superclass = env.get_at(distance, 0)
+        obj = env.get_at(distance - 1, 0)
+        method = superclass.find_method(node.method.lexeme)
+        if method is None:
+            raise LoxRuntimeError(
+                node.method, f"Undefined property '{node.method.lexeme}'."
+            )
+        return obj, method
+
+    def make_class(
+        self,
+        operand: tuple[stmt.Class, list[tuple[stmt.Function, Code]]],
+        env: Environment | GlobalEnvironment,
+        stack: list[Any],
+    ) -> LoxClass:
+        declaration, methods = operand
+        superclass = None
+        closure = env
+        if declaration.superclass is not None:
+            superclass = stack.pop()
+            if not isinstance(superclass, LoxClass):
+                raise LoxRuntimeError(
+                    declaration.superclass.name, "Superclass must be a class."
+                )
+            closure = Environment(env, [superclass])
+        table: dict[str, LoxFunction] = {}
+        for method, code in methods:
+            lexeme = method.name.lexeme
+            table[lexeme] = StackFunction(method, closure, lexeme == "init", code)
+        return LoxClass(declaration.name.lexeme, superclass, table)
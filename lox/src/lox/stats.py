@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import lox.error as error
+import lox.expr as expr
+import lox.stmt as stmt
+from lox.environment import Environment
+from lox.error import LoxRuntimeError
+from lox.interpreter import Interpreter
+from lox.lox_class import LoxClass
+from lox.lox_function import LoxFunction
+from lox.lox_instance import LoxInstance
+from lox.return_class import Completion, TailCall
+
+
+@dataclass
+class Stats:
+    statements: Counter[str] = field(default_factory=Counter)
+    expressions: Counter[str] = field(default_factory=Counter)
+    environments: int = 0
+    binds: int = 0
+    instances: int = 0
+    runtime_errors: int = 0
+    depth: int = 0
+    peak_depth: int = 0
+    # bytes, from tracemalloc; the largest peak over all runs
+    peak_memory: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "statements": dict(sorted(self.statements.items())),
+            "expressions": dict(sorted(self.expressions.items())),
+            "environments": self.environments,
+            "binds": self.binds,
+            "instances": self.instances,
+            "runtime_errors": self.runtime_errors,
+            "peak_depth": self.peak_depth,
+            "peak_memory": self.peak_memory,
+        }
+
+
+class CountingFunction(LoxFunction):
+    __slots__ = ()
+
+    def run(
+        self, interpreter: CountingInterpreter, environment: Environment
+    ) -> Completion | TailCall | None:
+        stats = interpreter.stats
+        # the call's environment, and the one for `this` when a method was
+        # invoked (or tail called) without being bound first
+        stats.environments += 1 if environment.enclosing is self.closure else 2
+        stats.depth += 1
+        stats.peak_depth = max(stats.peak_depth, stats.depth)
+        try:
+            return super().run(interpreter, environment)
+        finally:
+            stats.depth -= 1
+
+    def bind(self, instance: LoxInstance) -> LoxFunction:
+        klass = instance.klass
+        if isinstance(klass, CountingClass):
+            klass.stats.binds += 1
+            klass.stats.environments += 1
+        return super().bind(instance)
+
+
+class CountingClass(LoxClass):
+    # Holds the counters of the interpreter that made its instances, for the
+    # methods bound to them.
+    __slots__ = ("stats",)
+
+    def __call__(self, interpreter: CountingInterpreter, arguments: list[Any]) -> Any:
+        self.stats = interpreter.stats
+        self.stats.instances += 1
+        return super().__call__(interpreter, arguments)
+
+
+class CountingInterpreter(Interpreter):
+    # The tree interpreter with counters; the plain Interpreter pays nothing
+    # for them.
+    function_type = CountingFunction
+    class_type = CountingClass
+
+    def __init__(self, stats: Stats) -> None:
+        super().__init__()
+        self.stats = stats
+
+    def interpret(self, statements: list[stmt.Stmt]):
+        try:
+            for statement in statements:
+                self.execute(statement)
+        except LoxRuntimeError as e:
+            self.stats.runtime_errors += 1
+            error.error_runtime(e)
+
+    def execute(self, node: stmt.Stmt) -> Completion | TailCall | None:
+        self.stats.statements[type(node).__name__] += 1
+        if isinstance(node, stmt.Block):
+            self.stats.environments += 1
+        completion = super().execute(node)
+        if isinstance(node, stmt.Class) and node.superclass is not None:
+            self.stats.environments += 1
+        return completion
+
+    def evaluate(self, node: expr.Expr) -> Any:
+        self.stats.expressions[type(node).__name__] += 1
+        return super().evaluate(node)
@@ -1,65 +1,155 @@
+# Generated by generate_ast.py
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import ClassVar, Protocol, TypeVar
 
 from lox.expr import Expr, Variable
 from lox.token_type import Token
 
+R = TypeVar("R", covariant=True)
 
-@dataclass(frozen=True)
+
+class StmtVisitor(Protocol[R]):
+    def visit_block_stmt(self, stmt: Block) -> R:
+        ...
+
+    def visit_class_stmt(self, stmt: Class) -> R:
+        ...
+
+    def visit_expression_stmt(self, stmt: Expression) -> R:
+        ...
+
+    def visit_function_stmt(self, stmt: Function) -> R:
+        ...
+
+    def visit_if_stmt(self, stmt: If) -> R:
+        ...
+
+    def visit_print_stmt(self, stmt: Print) -> R:
+        ...
+
+    def visit_return_stmt(self, stmt: Return) -> R:
+        ...
+
+    def visit_while_stmt(self, stmt: While) -> R:
+        ...
+
+    def visit_var_stmt(self, stmt: Var) -> R:
+        ...
+
+
+@dataclass(slots=True)
 class Stmt:
-    pass
+    kind: ClassVar[int]
 
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        raise NotImplementedError
 
-@dataclass(frozen=True)
+
+@dataclass(slots=True)
 class Block(Stmt):
+    kind: ClassVar[int] = 0
     statements: list[Stmt | None]
 
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        return visitor.visit_block_stmt(self)
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Class(Stmt):
+    kind: ClassVar[int] = 1
     name: Token
     superclass: Variable | None
     methods: list[Function]
 
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        return visitor.visit_class_stmt(self)
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Expression(Stmt):
+    kind: ClassVar[int] = 2
     expression: Expr
+    token: Token | None = field(default=None, compare=False)
 
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        return visitor.visit_expression_stmt(self)
 
-@dataclass(frozen=True)
+
+@dataclass(slots=True)
 class Function(Stmt):
+    kind: ClassVar[int] = 3
     name: Token
     params: list[Token]
     body: list[Stmt | None]
 
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        return visitor.visit_function_stmt(self)
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class If(Stmt):
+    kind: ClassVar[int] = 4
     condition: Expr
     then_branch: Stmt
     else_branch: Stmt | None
+    token: Token | None = field(default=None, compare=False)
 
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        return visitor.visit_if_stmt(self)
 
-@dataclass(frozen=True)
+
+@dataclass(slots=True)
 class Print(Stmt):
+    kind: ClassVar[int] = 5
     expression: Expr
+    token: Token | None = field(default=None, compare=False)
+
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        return visitor.visit_print_stmt(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Return(Stmt):
+    kind: ClassVar[int] = 6
     keyword: Token
     value: Expr | None
+    tail_call: bool = field(default=False, compare=False)
+
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        return visitor.visit_return_stmt(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class While(Stmt):
+    kind: ClassVar[int] = 7
     condition: Expr
     body: Stmt
+    token: Token | None = field(default=None, compare=False)
 
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        return visitor.visit_while_stmt(self)
 
-@dataclass(frozen=True)
+
+@dataclass(slots=True)
 class Var(Stmt):
+    kind: ClassVar[int] = 8
     name: Token
     initializer: Expr | None
+
+    def accept(self, visitor: StmtVisitor[R]) -> R:
+        return visitor.visit_var_stmt(self)
+
+
+KINDS: tuple[type[Stmt], ...] = (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    While,
+    Var,
+)
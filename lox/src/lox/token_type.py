@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+from __future__ import annotations
+
+import sys
 from enum import Enum, auto
 
 
@@ -47,13 +49,94 @@ class TokenType(Enum):
 
     EOF = auto()
 
+    # Members are singletons, so identity hashing agrees with ==, and it
+    # keeps the parser's rule lookups out of Enum's Python-level __hash__.
+    __hash__ = object.__hash__
+
 
-@dataclass(frozen=True)
 class Token:
+    # A token is a span of the shared source. The lexeme slot is only filled
+    # in (by __getattr__) the first time someone asks for it.
+    __slots__ = ("type", "line", "source", "start", "length", "lexeme")
+
     type: TokenType
-    lexeme: str
-    literal: str | float | None
     line: int
+    source: str
+    start: int
+    length: int
+    lexeme: str
+
+    def __init__(
+        self, type: TokenType, lexeme: str, literal: str | float | None, line: int
+    ) -> None:
+        self.type = type
+        self.line = line
+        self.source = lexeme
+        self.start = 0
+        self.length = len(lexeme)
+        self.lexeme = lexeme
+        if literal is not None and literal != self.literal:
+            raise ValueError(f"literal {literal!r} does not match {lexeme!r}")
+
+    @classmethod
+    def span(
+        cls,
+        type: TokenType,
+        source: str,
+        start: int,
+        end: int,
+        line: int,
+        lexeme: str | None = None,
+    ) -> Token:
+        token = cls.__new__(cls)
+        token.type = type
+        token.line = line
+        token.source = source
+        token.start = start
+        token.length = end - start
+        if lexeme is not None:
+            token.lexeme = lexeme
+        return token
+
+    @property
+    def end(self) -> int:
+        return self.start + self.length
+
+    def __getattr__(self, name: str) -> str:
+        if name != "lexeme":
+            raise AttributeError(name)
+        lexeme = self.source[self.start : self.start + self.length]
+        if self.type == TokenType.IDENTIFIER:
+            lexeme = sys.intern(lexeme)
+        self.lexeme = lexeme
+        return lexeme
+
+    @property
+    def literal(self) -> str | float | None:
+        if self.type == TokenType.NUMBER:
+            return float(self.source[self.start : self.start + self.length])
+        if self.type == TokenType.STRING:
+            return self.source[self.start + 1 : self.start + self.length - 1]
+        return None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+        return (
+            self.type == other.type
+            and self.line == other.line
+            and self.lexeme == other.lexeme
+            and self.literal == other.literal
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.type, self.lexeme, self.line))
+
+    def __repr__(self) -> str:
+        return (
+            f"Token(type={self.type}, lexeme={self.lexeme!r}, "
+            f"literal={self.literal!r}, line={self.line})"
+        )
 
     def __str__(self):
         return f"{self.type} {self.lexeme} {self.literal}"
@@ -0,0 +1,877 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from functools import partial, singledispatchmethod
+from types import CodeType, MethodType
+from typing import Any, Callable, NoReturn
+
+import lox.error as error
+import lox.expr as expr
+import lox.stmt as stmt
+from lox.callable import LoxCallable
+from lox.environment import GlobalEnvironment
+from lox.error import LoxRuntimeError
+from lox.interpreter import Interpreter, stringify
+from lox.lox_class import LoxClass
+from lox.lox_instance import LoxInstance
+from lox.native_function import Clock
+from lox.token_type import Token, TokenType
+
+NUMBER = (int, float)
+CODE_CACHE_SIZE = 256
+# operators in a left-nested chain beyond which it is built in steps
+CHAIN_LIMIT = 32
+
+# compiled programs keyed by the sha256 of their Lox source
+code_cache: OrderedDict[str, tuple[CodeType, list[Token]]] = OrderedDict()
+
+
+class PyFunction(LoxCallable):
+    __slots__ = ("name", "param_count", "fn", "is_initializer")
+
+    def __init__(
+        self,
+        name: str,
+        param_count: int,
+        fn: Callable[..., Any],
+        is_initializer: bool = False,
+    ) -> None:
+        self.name = name
+        self.param_count = param_count
+        self.fn = fn
+        self.is_initializer = is_initializer
+
+    @property
+    def arity(self) -> int:
+        return self.param_count
+
+    def __call__(self, interpreter: Any, arguments: list[Any]) -> Any:
+        return self.fn(*arguments)
+
+    def invoke(self, interpreter: Any, instance: LoxInstance, arguments: list[Any]):
+        return self.fn(instance, *arguments)
+
+    def bind(self, instance: LoxInstance) -> PyFunction:
+        return PyFunction(
+            self.name,
+            self.param_count,
+            MethodType(self.fn, instance),
+            self.is_initializer,
+        )
+
+    def __str__(self) -> str:
+        return f"<fn {self.name}>"
+
+
+# runtime support for generated code
+def fail(token: Token, message: str) -> NoReturn:
+    raise LoxRuntimeError(token, message)
+
+
+def undefined(name: Token) -> NoReturn:
+    raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+
+
+def assign_global(values: dict[str, Any], name: Token, value: Any) -> Any:
+    if name.lexeme in values:
+        values[name.lexeme] = value
+        return value
+    undefined(name)
+
+
+def assign_cell(cell: list[Any], value: Any) -> Any:
+    cell[0] = value
+    return value
+
+
+def deferred_call(
+    interpreter: Interpreter, value: Any, paren: Token
+) -> Callable[..., Any]:
+    return partial(call, interpreter, value, paren)
+
+
+def deferred_method_call(
+    interpreter: Interpreter, value: Any, paren: Token
+) -> Callable[..., Any]:
+    # Like deferred_call, for call sites that pass `this` as the first argument.
+    def call_value(this: Any, *arguments: Any) -> Any:
+        return call(interpreter, value, paren, *arguments)
+
+    return call_value
+
+
+def call(interpreter: Interpreter, callee: Any, paren: Token, *arguments: Any) -> Any:
+    # Functions declared by the fallback tree interpreter run on `interpreter`.
+    if not isinstance(callee, LoxCallable):
+        fail(paren, "Can only call functions and classes.")
+    if len(arguments) != callee.arity:
+        fail(paren, f"Expected {callee.arity} arguments but got {len(arguments)}")
+    return callee(interpreter, list(arguments))
+
+
+def get(obj: Any, name: Token) -> Any:
+    if isinstance(obj, LoxInstance):
+        return obj.get(name)
+    fail(name, "Only instances have properties.")
+
+
+def set_field(obj: LoxInstance, name: Token, value: Any) -> Any:
+    obj.set(name, value)
+    return value
+
+
+def super_method(superclass: LoxClass, this: LoxInstance, method: Token) -> Any:
+    function = superclass.find_method(method.lexeme)
+    if function is None:
+        fail(method, f"Undefined property '{method.lexeme}'.")
+    return function.bind(this)
+
+
+def check_superclass(value: Any, name: Token) -> LoxClass:
+    if not isinstance(value, LoxClass):
+        fail(name, "Superclass must be a class.")
+    return value
+
+
+def check_numbers(operator: Token, left: Any, right: Any):
+    if not (isinstance(left, NUMBER) and isinstance(right, NUMBER)):
+        fail(operator, "Operands must be numbers.")
+
+
+def add(left: Any, right: Any, operator: Token) -> Any:
+    if isinstance(left, NUMBER) and isinstance(right, NUMBER):
+        return left + right
+    if isinstance(left, str) and isinstance(right, str):
+        return left + right
+    fail(operator, "Operands must be two numbers or two strings.")
+
+
+def subtract(left: Any, right: Any, operator: Token) -> Any:
+    check_numbers(operator, left, right)
+    return left - right
+
+
+def multiply(left: Any, right: Any, operator: Token) -> Any:
+    check_numbers(operator, left, right)
+    return left * right
+
+
+def divide(left: Any, right: Any, operator: Token) -> Any:
+    check_numbers(operator, left, right)
+    return left / right
+
+
+def greater(left: Any, right: Any, operator: Token) -> Any:
+    check_numbers(operator, left, right)
+    return left > right
+
+
+def greater_equal(left: Any, right: Any, operator: Token) -> Any:
+    check_numbers(operator, left, right)
+    return left >= right
+
+
+def less(left: Any, right: Any, operator: Token) -> Any:
+    check_numbers(operator, left, right)
+    return left < right
+
+
+def less_equal(left: Any, right: Any, operator: Token) -> Any:
+    check_numbers(operator, left, right)
+    return left <= right
+
+
+RUNTIME = {
+    "_N": NUMBER,
+    "_F": PyFunction,
+    "_I": LoxInstance,
+    "_C": LoxClass,
+    "_fail": fail,
+    "_undefined": undefined,
+    "_gset": assign_global,
+    "_cset": assign_cell,
+    "_get": get,
+    "_set": set_field,
+    "_super": super_method,
+    "_superclass": check_superclass,
+    "_str": stringify,
+    "_add": add,
+    "_sub": subtract,
+    "_mul": multiply,
+    "_div": divide,
+    "_gt": greater,
+    "_ge": greater_equal,
+    "_lt": less,
+    "_le": less_equal,
+}
+
+ARITHMETIC = {
+    TokenType.MINUS: ("-", "_sub"),
+    TokenType.SLASH: ("/", "_div"),
+    TokenType.STAR: ("*", "_mul"),
+    TokenType.GREATER: (">", "_gt"),
+    TokenType.GREATER_EQUAL: (">=", "_ge"),
+    TokenType.LESS: ("<", "_lt"),
+    TokenType.LESS_EQUAL: ("<=", "_le"),
+}
+
+
+class Decl:
+    def __init__(self, pyname: str, function: FunctionInfo) -> None:
+        self.pyname = pyname
+        self.function = function
+        self.in_loop = function.loop_depth > 0
+        self.captured = False
+
+    @property
+    def is_cell(self) -> bool:
+        # Python closures share one cell per function call, but Lox gives a
+        # variable declared in a loop body a fresh binding on every iteration.
+        return self.captured and self.in_loop
+
+
+class FunctionInfo:
+    def __init__(self, parent: FunctionInfo | None) -> None:
+        self.parent = parent
+        self.loop_depth = 0
+        self.free: dict[Decl, None] = {}
+        self.assigned: dict[Decl, None] = {}
+
+
+class Analyzer:
+    # Works out which Python name every Lox local maps to and which locals are
+    # captured by closures, mirroring the resolver's scoping rules.
+    def __init__(self) -> None:
+        self.scopes: list[dict[str, Decl]] = []
+        self.function = FunctionInfo(None)
+        self.decls: dict[int, Decl] = {}
+        self.functions: dict[int, FunctionInfo] = {}
+        self.count = 0
+
+    def analyze(self, statements: list[stmt.Stmt | None]):
+        for statement in statements:
+            self.visit(statement)
+
+    def declare(self, key: object, name: str):
+        if not self.scopes:
+            return
+        self.count += 1
+        decl = Decl(f"v_{name}_{self.count}", self.function)
+        self.scopes[-1][name] = decl
+        self.decls[id(key)] = decl
+
+    def reference(self, node: expr.Expr, name: str, assigned: bool = False):
+        for scope in reversed(self.scopes):
+            decl = scope.get(name)
+            if decl is None:
+                continue
+            self.decls[id(node)] = decl
+            function = self.function
+            if decl.function is not function:
+                decl.captured = True
+                if assigned:
+                    function.assigned[decl] = None
+                while function is not decl.function and function is not None:
+                    function.free[decl] = None
+                    function = function.parent
+            return
+
+    def analyze_function(self, node: stmt.Function):
+        function = FunctionInfo(self.function)
+        self.functions[id(node)] = function
+        self.function = function
+        self.scopes.append({})
+        for param in node.params:
+            self.declare(param, param.lexeme)
+        self.analyze(node.body)
+        self.scopes.pop()
+        assert function.parent is not None
+        self.function = function.parent
+
+    @singledispatchmethod
+    def visit(self, node: stmt.Stmt | expr.Expr | None) -> None:
+        raise NotImplementedError(
+            f"Analyzer.visit() is not implemented for {type(node)}"
+        )
+
+    @visit.register
+    def _(self, node: stmt.Block):
+        self.scopes.append({})
+        self.analyze(node.statements)
+        self.scopes.pop()
+
+    @visit.register
+    def _(self, node: stmt.Class):
+        self.declare(node, node.name.lexeme)
+        if node.superclass is not None:
+            self.visit(node.superclass)
+        for method in node.methods:
+            self.analyze_function(method)
+
+    @visit.register
+    def _(self, node: stmt.Expression):
+        self.visit(node.expression)
+
+    @visit.register
+    def _(self, node: stmt.Function):
+        self.declare(node, node.name.lexeme)
+        self.analyze_function(node)
+
+    @visit.register
+    def _(self, node: stmt.If):
+        self.visit(node.condition)
+        self.visit(node.then_branch)
+        if node.else_branch is not None:
+            self.visit(node.else_branch)
+
+    @visit.register
+    def _(self, node: stmt.Print):
+        self.visit(node.expression)
+
+    @visit.register
+    def _(self, node: stmt.Return):
+        if node.value is not None:
+            self.visit(node.value)
+
+    @visit.register
+    def _(self, node: stmt.Var):
+        if node.initializer is not None:
+            self.visit(node.initializer)
+        self.declare(node, node.name.lexeme)
+
+    @visit.register
+    def _(self, node: stmt.While):
+        self.visit(node.condition)
+        self.function.loop_depth += 1
+        self.visit(node.body)
+        self.function.loop_depth -= 1
+
+    @visit.register
+    def _(self, node: expr.Assign):
+        self.visit(node.value)
+        self.reference(node, node.name.lexeme, assigned=True)
+
+    @visit.register
+    def _(self, node: expr.Binary):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    @visit.register
+    def _(self, node: expr.Call):
+        self.visit(node.callee)
+        for argument in node.arguments:
+            self.visit(argument)
+
+    @visit.register
+    def _(self, node: expr.Get):
+        self.visit(node.obj)
+
+    @visit.register
+    def _(self, node: expr.Grouping):
+        self.visit(node.expression)
+
+    @visit.register
+    def _(self, node: expr.Literal):
+        pass
+
+    @visit.register
+    def _(self, node: expr.Logical):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    @visit.register
+    def _(self, node: expr.Set):
+        self.visit(node.obj)
+        self.visit(node.value)
+
+    @visit.register
+    def _(self, node: expr.Super):
+        pass
+
+    @visit.register
+    def _(self, node: expr.This):
+        pass
+
+    @visit.register
+    def _(self, node: expr.Unary):
+        self.visit(node.right)
+
+    @visit.register
+    def _(self, node: expr.Variable):
+        if node.depth is not None:
+            self.reference(node, node.name.lexeme)
+
+
+class Transpiler:
+    def __init__(self) -> None:
+        self.analyzer = Analyzer()
+        self.lines: list[str] = []
+        self.indent = 0
+        self.tokens: list[Token] = []
+        self.token_names: dict[int, str] = {}
+        self.count = 0
+        self.function = self.analyzer.function
+        self.method_kind: str | None = None
+        self.superclass: str | None = None
+
+    def transpile(self, statements: list[stmt.Stmt | None]) -> str:
+        self.analyzer.analyze(statements)
+        self.emit("def _main():")
+        self.body(stmt.Block(statements))
+        return "\n".join(self.lines) + "\n"
+
+    # helpers
+    def emit(self, line: str):
+        self.lines.append("    " * self.indent + line)
+
+    def body(self, statement: stmt.Stmt | None):
+        self.indent += 1
+        start = len(self.lines)
+        self.visit(statement)
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.indent -= 1
+
+    def temp(self) -> str:
+        self.count += 1
+        return f"_t{self.count}"
+
+    def token(self, token: Token) -> str:
+        name = self.token_names.get(id(token))
+        if name is None:
+            name = f"_k{len(self.tokens)}"
+            self.tokens.append(token)
+            self.token_names[id(token)] = name
+        return name
+
+    def decl(self, node: object) -> Decl | None:
+        return self.analyzer.decls.get(id(node))
+
+    def define(self, node: stmt.Var | stmt.Function | stmt.Class, value: str):
+        decl = self.decl(node)
+        if decl is None:
+            self.emit(f"_g[{node.name.lexeme!r}] = {value}")
+        elif decl.is_cell:
+            self.emit(f"{decl.pyname}[0] = {value}")
+        else:
+            self.emit(f"{decl.pyname} = {value}")
+
+    def declare_cell(self, node: stmt.Var | stmt.Function | stmt.Class):
+        decl = self.decl(node)
+        if decl is not None and decl.is_cell:
+            self.emit(f"{decl.pyname} = [None]")
+
+    def is_simple(self, node: expr.Expr) -> bool:
+        # Operands that can be re-read without side effects or errors.
+        if isinstance(node, expr.Literal | expr.This):
+            return True
+        return isinstance(node, expr.Variable) and self.decl(node) is not None
+
+    def condition(self, node: expr.Expr) -> str:
+        value = self.expression(node)
+        if is_boolean(node):
+            return value
+        t = self.temp()
+        return f"(({t} := {value}) is not None and {t} is not False)"
+
+    def expression(self, node: expr.Expr) -> str:
+        return self.visit(node)
+
+    def function_def(
+        self,
+        node: stmt.Function,
+        pyname: str,
+        method_kind: str | None = None,
+    ) -> None:
+        info = self.analyzer.functions[id(node)]
+        params = [self.decl(param) for param in node.params]
+        names = [decl.pyname for decl in params if decl is not None]
+        for decl in info.free:
+            if decl.is_cell:
+                names.append(f"{decl.pyname}={decl.pyname}")
+        if method_kind is not None:
+            names.insert(0, "_this")
+            if self.superclass is not None:
+                names.append(f"_base={self.superclass}")
+        self.emit(f"def {pyname}({', '.join(names)}):")
+        self.indent += 1
+        nonlocals = [decl.pyname for decl in info.assigned if not decl.is_cell]
+        if nonlocals:
+            self.emit(f"nonlocal {', '.join(nonlocals)}")
+        for decl in params:
+            if decl is not None and decl.is_cell:
+                self.emit(f"{decl.pyname} = [{decl.pyname}]")
+        enclosing = self.function, self.method_kind
+        self.function = info
+        self.method_kind = method_kind
+        for statement in node.body:
+            self.visit(statement)
+        self.emit("return _this" if method_kind == "init" else "return None")
+        self.function, self.method_kind = enclosing
+        self.indent -= 1
+
+    @singledispatchmethod
+    def visit(self, node: stmt.Stmt | expr.Expr | None) -> Any:
+        raise NotImplementedError(
+            f"Transpiler.visit() is not implemented for {type(node)}"
+        )
+
+    # statements
+    @visit.register
+    def _(self, node: stmt.Block):
+        for statement in node.statements:
+            self.visit(statement)
+
+    @visit.register
+    def _(self, node: stmt.Class):
+        self.declare_cell(node)
+        superclass = None
+        if node.superclass is not None:
+            superclass = self.temp()
+            value = self.expression(node.superclass)
+            name = self.token(node.superclass.name)
+            self.emit(f"{superclass} = _superclass({value}, {name})")
+        enclosing = self.superclass
+        self.superclass = superclass
+        methods: list[str] = []
+        for method in node.methods:
+            self.count += 1
+            pyname = f"m_{method.name.lexeme}_{self.count}"
+            is_init = method.name.lexeme == "init"
+            self.function_def(method, pyname, "init" if is_init else "method")
+            methods.append(
+                f"{method.name.lexeme!r}: _F({method.name.lexeme!r}, "
+                f"{len(method.params)}, {pyname}, {is_init})"
+            )
+        self.superclass = enclosing
+        table = "{" + ", ".join(methods) + "}"
+        self.define(node, f"_C({node.name.lexeme!r}, {superclass}, {table})")
+
+    @visit.register
+    def _(self, node: stmt.Expression):
+        self.emit(self.expression(node.expression))
+
+    @visit.register
+    def _(self, node: stmt.Function):
+        self.declare_cell(node)
+        self.count += 1
+        pyname = f"f_{node.name.lexeme}_{self.count}"
+        self.function_def(node, pyname)
+        self.define(node, f"_F({node.name.lexeme!r}, {len(node.params)}, {pyname})")
+
+    @visit.register
+    def _(self, node: stmt.If):
+        self.emit(f"if {self.condition(node.condition)}:")
+        self.body(node.then_branch)
+        if node.else_branch is not None:
+            self.emit("else:")
+            self.body(node.else_branch)
+
+    @visit.register
+    def _(self, node: stmt.Print):
+        self.emit(f"print(_str({self.expression(node.expression)}))")
+
+    @visit.register
+    def _(self, node: stmt.Return):
+        if self.method_kind == "init":
+            self.emit("return _this")
+        elif node.value is None:
+            self.emit("return None")
+        else:
+            self.emit(f"return {self.expression(node.value)}")
+
+    @visit.register
+    def _(self, node: stmt.Var):
+        value = "None"
+        if node.initializer is not None:
+            value = self.expression(node.initializer)
+        decl = self.decl(node)
+        if decl is not None and decl.is_cell:
+            self.emit(f"{decl.pyname} = [{value}]")
+        else:
+            self.define(node, value)
+
+    @visit.register
+    def _(self, node: stmt.While):
+        self.emit(f"while {self.condition(node.condition)}:")
+        self.body(node.body)
+
+    # expressions
+    @visit.register
+    def _(self, node: expr.Assign) -> str:
+        value = self.expression(node.value)
+        decl = self.decl(node)
+        if decl is None:
+            return f"_gset(_g, {self.token(node.name)}, {value})"
+        if decl.is_cell:
+            return f"_cset({decl.pyname}, {value})"
+        return f"({decl.pyname} := {value})"
+
+    @visit.register
+    def _(self, node: expr.Binary) -> str:
+        operand = node.left
+        length = 1
+        while isinstance(operand, expr.Binary) and length <= CHAIN_LIMIT:
+            operand = operand.left
+            length += 1
+        if length > CHAIN_LIMIT:
+            return self.chain(node)
+        left = self.expression(node.left)
+        return self.binary(node, left, self.is_simple(node.left))
+
+    def chain(self, node: expr.Binary) -> str:
+        # Nesting one conditional expression per operator would take a long
+        # chain such as a + b + c + ... past the parser's limit on nested
+        # parentheses, so each step stores its result in the same temporary
+        # and the steps run in order as the items of a tuple.
+        spine: list[expr.Binary] = []
+        operand: expr.Expr = node
+        while isinstance(operand, expr.Binary):
+            spine.append(operand)
+            operand = operand.left
+        t = self.temp()
+        steps = [f"{t} := {self.expression(operand)}"]
+        for link in reversed(spine):
+            steps.append(f"{t} := {self.binary(link, t, True)}")
+        return f"({', '.join(steps)})[-1]"
+
+    def binary(self, node: expr.Binary, left: str, left_is_simple: bool) -> str:
+        operator = node.operator
+        right = self.expression(node.right)
+        match operator.type:
+            case TokenType.EQUAL_EQUAL:
+                return f"({left} == {right})"
+            case TokenType.BANG_EQUAL:
+                return f"({left} != {right})"
+            case _:
+                pass
+        token = self.token(operator)
+        if not self.is_simple(node.right):
+            helper = "_add"
+            if operator.type != TokenType.PLUS:
+                helper = ARITHMETIC[operator.type][1]
+            return f"{helper}({left}, {right}, {token})"
+
+        # The right operand is side-effect free, so both operands can be type
+        # checked inline after the left one has been evaluated exactly once.
+        a = b = left
+        if not left_is_simple:
+            a = self.temp()
+            b = f"({a} := {left})"
+        constant = node.right.value if isinstance(node.right, expr.Literal) else None
+        if isinstance(constant, float):
+            numbers = f"isinstance({b}, _N)"
+        else:
+            numbers = f"isinstance({b}, _N) and isinstance({right}, _N)"
+        if operator.type == TokenType.PLUS:
+            if isinstance(constant, float):
+                check = numbers
+            elif isinstance(constant, str):
+                check = f"type({b}) is str"
+            else:
+                strings = f"type({a}) is str and type({right}) is str"
+                check = f"({numbers}) or ({strings})"
+            message = "Operands must be two numbers or two strings."
+            return f"({a} + {right} if {check} " f"else _fail({token}, {message!r}))"
+        symbol = ARITHMETIC[operator.type][0]
+        return (
+            f"({a} {symbol} {right} if {numbers} "
+            f"else _fail({token}, 'Operands must be numbers.'))"
+        )
+
+    @visit.register
+    def _(self, node: expr.Call) -> str:
+        if isinstance(node.callee, expr.Get | expr.Super):
+            return self.invoke(node, node.callee)
+        callee = self.expression(node.callee)
+        arguments = ", ".join(self.expression(a) for a in node.arguments)
+        paren = self.token(node.paren)
+        t = self.temp()
+        return (
+            f"({t}.fn if type({t} := {callee}) is _F and {t}.param_count == "
+            f"{len(node.arguments)} else _callee({t}, {paren}))({arguments})"
+        )
+
+    def invoke(self, node: expr.Call, callee: expr.Get | expr.Super) -> str:
+        # obj.method(...) calls the method's function with `this` as its first
+        # argument instead of allocating a bound method. Fields, missing
+        # properties and arity errors take the generic path.
+        arguments = "".join(f", {self.expression(a)}" for a in node.arguments)
+        paren = self.token(node.paren)
+        arity = len(node.arguments)
+        method = self.temp()
+        if isinstance(callee, expr.Super):
+            name = callee.method.lexeme
+            this = "_this"
+            fast = f"({method} := _base.methods.get({name!r})) is not None"
+            slow = f"_super(_base, _this, {self.token(callee.method)})"
+        else:
+            name = callee.name.lexeme
+            this = self.temp()
+            fast = (
+                f"type({this} := {self.expression(callee.obj)}) is _I "
+                f"and {name!r} not in {this}.shape.index "
+                f"and ({method} := {this}.klass.methods.get({name!r})) is not None"
+            )
+            slow = f"_get({this}, {self.token(callee.name)})"
+        return (
+            f"({method}.fn if {fast} and {method}.param_count == {arity} "
+            f"else _method({slow}, {paren}))({this}{arguments})"
+        )
+
+    @visit.register
+    def _(self, node: expr.Get) -> str:
+        return f"_get({self.expression(node.obj)}, {self.token(node.name)})"
+
+    @visit.register
+    def _(self, node: expr.Grouping) -> str:
+        return self.expression(node.expression)
+
+    @visit.register
+    def _(self, node: expr.Literal) -> str:
+        return repr(node.value)
+
+    @visit.register
+    def _(self, node: expr.Logical) -> str:
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        t = self.temp()
+        truthy = f"(({t} := {left}) is not None and {t} is not False)"
+        if node.operator.type == TokenType.OR:
+            return f"({t} if {truthy} else {right})"
+        return f"({right} if {truthy} else {t})"
+
+    @visit.register
+    def _(self, node: expr.Set) -> str:
+        t = self.temp()
+        name = self.token(node.name)
+        value = self.expression(node.value)
+        return (
+            f"(_set({t}, {name}, {value}) if isinstance({t} := "
+            f"{self.expression(node.obj)}, _I) "
+            f"else _fail({name}, 'Only instances have fields.'))"
+        )
+
+    @visit.register
+    def _(self, node: expr.Super) -> str:
+        return f"_super(_base, _this, {self.token(node.method)})"
+
+    @visit.register
+    def _(self, node: expr.This) -> str:
+        return "_this"
+
+    @visit.register
+    def _(self, node: expr.Unary) -> str:
+        right = self.expression(node.right)
+        t = self.temp()
+        if node.operator.type == TokenType.BANG:
+            return f"(({t} := {right}) is None or {t} is False)"
+        operator = self.token(node.operator)
+        return (
+            f"(-{t} if isinstance({t} := {right}, _N) "
+            f"else _fail({operator}, 'Operand must be a number.'))"
+        )
+
+    @visit.register
+    def _(self, node: expr.Variable) -> str:
+        decl = self.decl(node)
+        if decl is None:
+            name = node.name.lexeme
+            return (
+                f"(_g[{name!r}] if {name!r} in _g "
+                f"else _undefined({self.token(node.name)}))"
+            )
+        if decl.is_cell:
+            return f"{decl.pyname}[0]"
+        return decl.pyname
+
+
+def is_boolean(node: expr.Expr) -> bool:
+    if isinstance(node, expr.Grouping):
+        return is_boolean(node.expression)
+    if isinstance(node, expr.Literal):
+        return isinstance(node.value, bool)
+    if isinstance(node, expr.Unary):
+        return node.operator.type == TokenType.BANG
+    if isinstance(node, expr.Binary):
+        return node.operator.type in (
+            TokenType.EQUAL_EQUAL,
+            TokenType.BANG_EQUAL,
+            TokenType.GREATER,
+            TokenType.GREATER_EQUAL,
+            TokenType.LESS,
+            TokenType.LESS_EQUAL,
+        )
+    return False
+
+
+def transpile(statements: list[stmt.Stmt | None]) -> tuple[str, list[Token]]:
+    transpiler = Transpiler()
+    source = transpiler.transpile(statements)
+    return source, transpiler.tokens
+
+
+class PythonInterpreter:
+    # Translates the resolved program into Python source and lets CPython's
+    # own compiler and bytecode interpreter run it. Programs too deeply nested
+    # for CPython's compiler run on a tree interpreter sharing the globals.
+    def __init__(self) -> None:
+        self.global_env = GlobalEnvironment()
+        self.global_env.define("clock", Clock())
+        self.tree = Interpreter()
+        self.tree.global_env = self.global_env
+        self.tree.environment = self.global_env
+
+    def run(
+        self,
+        source: str,
+        front_end: Callable[[str], list[stmt.Stmt | None] | None],
+    ):
+        key = hashlib.sha256(source.encode()).hexdigest()
+        program = code_cache.get(key)
+        if program is None:
+            statements = front_end(source)
+            if statements is None:
+                return
+            program = self.compile(statements)
+            if program is None:
+                self.tree.interpret(statements)
+                return
+            code_cache[key] = program
+            if len(code_cache) > CODE_CACHE_SIZE:
+                code_cache.popitem(last=False)
+        else:
+            code_cache.move_to_end(key)
+        self.execute(*program)
+
+    def interpret(self, statements: list[stmt.Stmt | None]):
+        program = self.compile(statements)
+        if program is None:
+            self.tree.interpret(statements)
+        else:
+            self.execute(*program)
+
+    def compile(
+        self, statements: list[stmt.Stmt | None]
+    ) -> tuple[CodeType, list[Token]] | None:
+        # None if the generated code nests too deeply for CPython, such as
+        # more than 20 nested loops
+        try:
+            source, tokens = transpile(statements)
+            return compile(source, "<lox>", "exec"), tokens
+        except (SyntaxError, RecursionError, MemoryError):
+            return None
+
+    def execute(self, code: CodeType, tokens: list[Token]):
+        namespace = dict(RUNTIME)
+        namespace["_g"] = self.global_env.values
+        namespace["_callee"] = partial(deferred_call, self.tree)
+        namespace["_method"] = partial(deferred_method_call, self.tree)
+        for i, token in enumerate(tokens):
+            namespace[f"_k{i}"] = token
+        exec(code, namespace)
+        try:
+            namespace["_main"]()
+        except LoxRuntimeError as e:
+            error.error_runtime(e)
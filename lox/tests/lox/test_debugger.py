@@ -0,0 +1,87 @@
+import io
+import textwrap
+from typing import Any
+
+import pytest
+
+from lox import Lox
+from lox.debugger import CommandLineDebugger, Debugger, DebuggingInterpreter
+from lox.error import LoxRuntimeError
+from lox.lox_function import LoxFunction
+
+SOURCE = textwrap.dedent(
+    """\
+    fun add(a, b) {
+        var sum = a + b;
+        return sum;
+    }
+    var total = add(1, 2);
+    print total;
+    print total + nil;
+    """
+)
+
+
+class Recorder(Debugger):
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: list[Any] = []
+
+    def on_call(
+        self,
+        interpreter: DebuggingInterpreter,
+        function: LoxFunction,
+        arguments: list[Any],
+    ):
+        self.events.append(("call", str(function), arguments))
+
+    def on_return(
+        self, interpreter: DebuggingInterpreter, function: LoxFunction, value: Any
+    ):
+        self.events.append(("return", str(function), value))
+
+    def on_error(self, interpreter: DebuggingInterpreter, error: LoxRuntimeError):
+        self.events.append(("error", error.token.line))
+
+    def pause(self, interpreter: DebuggingInterpreter, line: int):
+        self.events.append(("pause", line, interpreter.scopes()[0]))
+
+
+def test_debugger_hooks(capsys: pytest.CaptureFixture[str]):
+    debugger = Recorder()
+    debugger.breakpoints.add(3)
+    Lox(debugger=debugger).run(SOURCE)
+    assert debugger.events == [
+        ("call", "<fn add>", [1.0, 2.0]),
+        ("pause", 3, {"a": 1.0, "b": 2.0, "sum": 3.0}),
+        ("return", "<fn add>", 3.0),
+        ("error", 7),
+    ]
+
+
+def test_command_line_debugger(capsys: pytest.CaptureFixture[str]):
+    out = io.StringIO()
+    commands = io.StringIO("p b\nstep\nenv\nwhere\ncontinue\n")
+    debugger = CommandLineDebugger(commands, out)
+    debugger.breakpoints.add(2)
+    Lox(debugger=debugger).run(SOURCE)
+    assert out.getvalue().splitlines()[:7] == [
+        "line 2: var sum = a + b;",
+        "(debug) b = 2",
+        "(debug) line 3: return sum;",
+        "(debug) [0] a = 1, b = 2, sum = 3",
+        "[1] clock = <native fn>, add = <fn add>",
+        "(debug) add (line 1)",
+        "<script>",
+    ]
+    assert capsys.readouterr().out.startswith("3\n")
+
+
+def test_debugger_pauses_at_literal_only_statements(
+    capsys: pytest.CaptureFixture[str],
+):
+    debugger = Recorder()
+    debugger.breakpoints.update({2, 3})
+    Lox(debugger=debugger).run('print "one";\nprint "two";\nwhile (false) 1;\n')
+    assert [event[:2] for event in debugger.events] == [("pause", 2), ("pause", 3)]
+    assert capsys.readouterr().out == "one\ntwo\n"
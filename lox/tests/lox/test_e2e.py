@@ -1,12 +1,25 @@
+import gc
+import hashlib
+import os
 import textwrap
+import tracemalloc
+from pathlib import Path
 
 import pytest
 
-from lox import Lox
+import lox.cache as cache
+import lox.error as error
+import lox.transpiler as transpiler
+from lox import ENGINES, Lox
+from lox.stack_interpreter import StackInterpreter
 
 
-def test_for_fibonacci(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+@pytest.fixture(params=list(ENGINES))
+def lox(request: pytest.FixtureRequest) -> Lox:
+    return Lox(engine=request.param)
+
+
+def test_for_fibonacci(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         var a = 0;
@@ -34,8 +47,7 @@ def test_for_fibonacci(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_scope(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_scope(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         var a = "global a";
@@ -78,8 +90,7 @@ def test_scope(capsys: pytest.CaptureFixture[str]):
 
 
 @pytest.mark.freeze_time("2023-12-16 18:17:00")
-def test_native_function(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_native_function(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         var t = clock();
@@ -92,8 +103,7 @@ def test_native_function(capsys: pytest.CaptureFixture[str]):
     assert actual == expected
 
 
-def test_lox_function(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_lox_function(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         fun sayHi(first, last) {
@@ -109,8 +119,7 @@ def test_lox_function(capsys: pytest.CaptureFixture[str]):
     assert actual == expected
 
 
-def test_fibonacci_recursion(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_fibonacci_recursion(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         fun fib(n) {
@@ -142,8 +151,7 @@ def test_fibonacci_recursion(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_counter(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_counter(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         fun makeCounter() {
@@ -171,8 +179,7 @@ def test_counter(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_lexical_scope(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_lexical_scope(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         var a = "global";
@@ -198,8 +205,7 @@ def test_lexical_scope(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_class_instantiation(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_class_instantiation(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         class Bagel {}
@@ -217,8 +223,7 @@ def test_class_instantiation(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_method_call(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_method_call(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         class Bacon {
@@ -240,8 +245,7 @@ def test_method_call(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_this(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_this(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         class Person {
@@ -270,8 +274,7 @@ def test_this(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_init_1(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_init_1(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         class Foo {
@@ -296,8 +299,7 @@ def test_init_1(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_init_2(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_init_2(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         class Foo {
@@ -317,8 +319,7 @@ def test_init_2(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_init_3(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_init_3(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         class Foo {
@@ -341,8 +342,7 @@ def test_init_3(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_superclass(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_superclass(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         class Doughnut {
@@ -364,8 +364,7 @@ def test_superclass(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_super_method(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_super_method(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         class Doughnut {
@@ -393,8 +392,7 @@ def test_super_method(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_invalid_super_1(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_invalid_super_1(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         class Eclair {
@@ -415,8 +413,7 @@ def test_invalid_super_1(capsys: pytest.CaptureFixture[str]):
     assert actual.out == expected
 
 
-def test_invalid_super_2(capsys: pytest.CaptureFixture[str]):
-    lox = Lox()
+def test_invalid_super_2(lox: Lox, capsys: pytest.CaptureFixture[str]):
     source = textwrap.dedent(
         """\
         super.method();
@@ -430,3 +427,296 @@ def test_invalid_super_2(capsys: pytest.CaptureFixture[str]):
     lox.run(source)
     actual = capsys.readouterr()
     assert actual.out == expected
+
+
+def test_runtime_error(lox: Lox, capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        fun add(a, b) {
+            return a +
+                b;
+        }
+        print add(1, 2);
+        print add(1, "two");
+        """
+    )
+    expected = textwrap.dedent(
+        """\
+        3
+        Operands must be two numbers or two strings.
+        [line 2]
+        """
+    )
+    lox.run(source)
+    actual = capsys.readouterr()
+    assert actual.out == expected
+
+
+def test_local_slots(lox: Lox, capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        {
+            var a = "outer";
+            var closures = nil;
+            fun keep(f) {
+                var previous = closures;
+                fun chain() {
+                    if (previous != nil) previous();
+                    f();
+                }
+                closures = chain;
+            }
+            for (var i = 0; i < 3; i = i + 1) {
+                var j = i * 10;
+                fun show() {
+                    print j;
+                }
+                keep(show);
+            }
+            {
+                var a = "shadow";
+                print a;
+            }
+            closures();
+            class Base {
+                name() { return "base"; }
+            }
+            class Derived < Base {
+                name() { return "derived of " + super.name(); }
+            }
+            print Derived().name();
+            print a;
+        }
+        """
+    )
+    lox.run(source)
+    assert capsys.readouterr().out == textwrap.dedent(
+        """\
+        shadow
+        0
+        10
+        20
+        derived of base
+        outer
+        """
+    )
+
+
+def test_memory_is_flat_across_runs(lox: Lox):
+    source = textwrap.dedent(
+        """\
+        {
+            var a = 1;
+            fun add(x) {
+                return x + a;
+            }
+            var b = add(2);
+        }
+        """
+    )
+    for _ in range(200):
+        lox.run(source)
+    tracemalloc.start()
+    try:
+        retained: list[int] = []
+        for _ in range(2):
+            for _ in range(1000):
+                lox.run(source)
+            gc.collect()
+            retained.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+    assert retained[1] - retained[0] < 16 * 1024
+
+
+def test_python_engine_caches_code(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        var fs = nil;
+        for (var i = 0; i < 3; i = i + 1) {
+            var j = i;
+            fun f() {
+                j = j + 10;
+                return j;
+            }
+            if (i == 1) fs = f;
+        }
+        print fs();
+        print fs();
+        """
+    )
+    lox = Lox(engine="python")
+    lox.run(source)
+    key = hashlib.sha256(source.encode()).hexdigest()
+    assert key in transpiler.code_cache
+    lox.run(source)
+    assert capsys.readouterr().out == "11\n21\n11\n21\n"
+
+
+def test_run_file_uses_cache(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+):
+    script = tmp_path / "script.lox"
+    script.write_text('fun greet(name) { return "hi " + name; }\nprint greet("a");\n')
+    Lox().run_file(str(script))
+    assert (tmp_path / "__loxcache__").is_dir()
+
+    def fail(source: str):
+        raise AssertionError("front end should not run on a warm cache")
+
+    lox = Lox()
+    monkeypatch.setattr(lox, "analyze", fail)
+    lox.run_file(str(script))
+    monkeypatch.undo()
+
+    script.write_text('print "changed";\n')
+    Lox().run_file(str(script))
+    assert capsys.readouterr().out == "hi a\nhi a\nchanged\n"
+
+
+def test_run_file_ignores_unloadable_cache(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    script = tmp_path / "script.lox"
+    script.write_text('print "fresh";\n')
+    source = script.read_text()
+    path = cache.cache_path(str(script))
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        # unpickling this imports a module that doesn't exist
+        f.write(cache.header(source) + b"cno_such_module\nProgram\n.")
+    Lox().run_file(str(script))
+    assert capsys.readouterr().out == "fresh\n"
+
+
+def test_three_level_inheritance(lox: Lox, capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        class A {
+            init(name) {
+                this.name = name;
+            }
+            hello() {
+                return "A says hi to " + this.name;
+            }
+            who() {
+                return "A";
+            }
+        }
+        class B < A {
+            who() {
+                return "B<" + super.who();
+            }
+        }
+        class C < B {
+            who() {
+                return "C<" + super.who();
+            }
+        }
+        var c = C("c");
+        print c.hello();
+        print c.who();
+        print C;
+        """
+    )
+    lox.run(source)
+    assert capsys.readouterr().out == "A says hi to c\nC<B<A\nC\n"
+
+
+@pytest.mark.parametrize("engine", ["tree", "closure"])
+def test_tail_calls_run_in_constant_stack(
+    engine: str, capsys: pytest.CaptureFixture[str]
+):
+    source = textwrap.dedent(
+        """\
+        fun even(n) { if (n == 0) return "even"; return odd(n - 1); }
+        fun odd(n) { if (n == 0) return "odd"; return even(n - 1); }
+        class Counter {
+            init(n) { this.n = n; }
+            down(i) { if (i == 0) return this; return this.down(i - 1); }
+        }
+        print even(20001);
+        print Counter(3).down(20000).n;
+        """
+    )
+    Lox(engine=engine).run(source)
+    assert capsys.readouterr().out == "odd\n3\n"
+
+
+def test_tree_engine_recursion_depth(capsys: pytest.CaptureFixture[str]):
+    # at Python's default recursion limit; a frame more per Lox call drops
+    # the reachable depth below this
+    source = textwrap.dedent(
+        """\
+        fun depth(n) { if (n == 0) return 0; return 1 + depth(n - 1); }
+        class Node {
+            depth(n) { if (n == 0) return 0; return 1 + this.depth(n - 1); }
+        }
+        print depth(110);
+        print Node().depth(110);
+        """
+    )
+    Lox().run(source)
+    assert capsys.readouterr().out == "110\n110\n"
+
+
+def test_stack_engine_recursion_depth(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        fun sum(n) { if (n == 0) return 0; return n + sum(n - 1); }
+        print sum(100000);
+        """
+    )
+    Lox(engine="stack").run(source)
+    assert capsys.readouterr().out == "5000050000\n"
+
+
+def test_stack_engine_overflow(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        fun down(n) {
+            return 1 + down(n - 1);
+        }
+        print down(10);
+        """
+    )
+    lox = Lox(engine="stack")
+    lox.interpreter = StackInterpreter(max_frames=5)
+    lox.run(source)
+    assert capsys.readouterr().out == "Stack overflow.\n[line 2]\n"
+
+
+def test_long_operator_chain(lox: Lox, capsys: pytest.CaptureFixture[str]):
+    terms = " + ".join(["x"] * 200)
+    source = f"fun f(x) {{ return {terms}; }}\nprint f(1);\nprint {terms};\n"
+    lox.run(f"var x = 2;\n{source}")
+    assert capsys.readouterr().out == "200\n400\n"
+
+
+def test_python_engine_runs_deep_nesting_on_the_tree(
+    capsys: pytest.CaptureFixture[str],
+):
+    loops = "".join(f"while (x < {i}) {{\n" for i in range(1, 26))
+    lox = Lox(engine="python")
+    lox.run(f"var x = 0;\n{loops}x = x + 1;\n{'}' * 25}\nfun f() {{ return x; }}")
+    lox.run("print f();")
+    assert capsys.readouterr().out == "25\n"
+
+
+def test_too_much_nesting_is_a_lox_error(lox: Lox, capsys: pytest.CaptureFixture[str]):
+    arms = "".join(f"else if (x == {i}) print {i};\n" for i in range(1, 1000))
+    for source in [
+        f"var x = 1;\nif (x == 0) print 0;\n{arms}",
+        "print " + "-" * 1000 + "1;",
+        "var a = 1;\n\nprint " + " + ".join(["a"] * 2000) + ";",
+    ]:
+        lox.run(source)
+        error.had_error = False
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1:] == [
+        "[line 1] Error at '-': Too much nesting.",
+        "[line 3] Error: Too much nesting.",
+    ]
+    assert lines[0].endswith(": Too much nesting.")
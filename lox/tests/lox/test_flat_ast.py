@@ -0,0 +1,42 @@
+import pickle
+import textwrap
+
+import pytest
+
+from lox import Lox
+from lox.flat_ast import FlatAst, FlatParser, FlatResolver
+from lox.flat_interpreter import FlatInterpreter
+from lox.scanner import Scanner
+
+SOURCE = textwrap.dedent(
+    """\
+    class A { method() { return "A"; } }
+    class B < A {
+        init(n) { this.n = n; }
+        method() { return super.method() + this.n; }
+    }
+    fun count(n) { var i = 0; while (i < n) i = i + 1; return i; }
+    print B("b").method();
+    print count(3) == 3 and !nil;
+    """
+)
+
+
+def test_flat_ast_round_trips(capsys: pytest.CaptureFixture[str]):
+    ast = FlatParser(Scanner(SOURCE).iter_tokens()).parse()
+    FlatResolver(ast).resolve(ast.items(ast.program))
+    copy = FlatAst.load(ast.dump())
+    assert copy.dump() == ast.dump()
+    assert pickle.loads(pickle.dumps(ast)).dump() == ast.dump()
+    FlatInterpreter().interpret(copy)
+    assert capsys.readouterr().out == "Ab\nTrue\n"
+
+
+def test_flat_engine_reports_errors(capsys: pytest.CaptureFixture[str]):
+    Lox(engine="flat").run("var a = 1;\na = ;\n")
+    Lox(engine="flat").run('fun f() { return -"x"; }\nf();\n')
+    output = capsys.readouterr().out
+    assert "Expect expression." in output
+    assert "Operand must be a number." in output
+    with pytest.raises(ValueError):
+        Lox(engine="flat", optimize=True)
@@ -0,0 +1,20 @@
+from lox.lox_class import LoxClass
+from lox.lox_instance import LoxInstance
+from lox.token_type import Token, TokenType
+
+
+def name(lexeme: str) -> Token:
+    return Token(TokenType.IDENTIFIER, lexeme, None, 1)
+
+
+def test_instances_with_the_same_fields_share_a_shape():
+    klass = LoxClass("Point", None, {})
+    a, b, c = LoxInstance(klass), LoxInstance(klass), LoxInstance(klass)
+    for instance, order in ((a, "xy"), (b, "xy"), (c, "yx")):
+        for i, field in enumerate(order):
+            instance.set(name(field), float(i))
+    a.set(name("x"), 5.0)
+    assert a.shape is b.shape
+    assert c.shape is not a.shape
+    assert a.fields == {"x": 5.0, "y": 1.0}
+    assert c.fields == {"y": 0.0, "x": 1.0}
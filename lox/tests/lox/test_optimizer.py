@@ -0,0 +1,48 @@
+import textwrap
+
+import pytest
+
+from lox import Lox
+from lox.ast_printer import print_stmt
+
+SOURCE = textwrap.dedent(
+    """\
+    var debug = false;
+    var a = (1 + 2) * 4 - -1;
+    print "x" + "y" + a;
+    if (false) {
+        print "dead";
+    } else print !nil and 1 < 2;
+    while (1 == 2) print "never";
+    {
+        var local = a;
+        local;
+        "pure";
+        nil or local;
+    }
+    print 1 / 0 == 3 or "kept";
+    """
+)
+
+
+def test_folds_constants_and_drops_dead_code(capsys: pytest.CaptureFixture[str]):
+    lox = Lox(optimize=True)
+    statements = lox.front_end(SOURCE)
+    assert statements is not None
+    assert [print_stmt(s) for s in statements if s is not None] == [
+        "(var debug false)",
+        "(var a 13.0)",
+        '(print (+ "xy" a))',
+        "(print true)",
+        "(block (var local a))",
+        '(print (or (== (/ 1.0 0.0) 3.0) "kept"))',
+    ]
+
+
+def test_runtime_errors_keep_their_line(capsys: pytest.CaptureFixture[str]):
+    source = 'var a = 1;\nif (true)\n    print (2 * 3) + "x";\n'
+    Lox().run(source)
+    expected = capsys.readouterr().out
+    Lox(optimize=True).run(source)
+    assert capsys.readouterr().out == expected
+    assert expected == "Operands must be two numbers or two strings.\n[line 3]\n"
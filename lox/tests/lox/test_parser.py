@@ -0,0 +1,52 @@
+import pytest
+
+import lox.error as error
+import lox.expr as expr
+import lox.stmt as stmt
+from lox.ast_printer import print_ast
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.stmt import Print, Var
+
+
+def test_parser_pulls_tokens_lazily():
+    source = "var a = 1;\nprint a;\n" * 1000
+    scanner = Scanner(source)
+    parser = Parser(scanner.iter_tokens())
+    assert isinstance(parser.declaration(), Var)
+    assert isinstance(parser.declaration(), Print)
+    assert scanner.current < 30
+    assert len(parser.parse()) == 1998
+
+
+def test_nodes_are_slotted_and_tagged():
+    for kinds in (expr.KINDS, stmt.KINDS):
+        for kind, node_type in enumerate(kinds):
+            assert node_type.kind == kind
+            assert "__dict__" not in dir(node_type)
+    statement = Parser(Scanner("print 1 + 2;").iter_tokens()).parse()[0]
+    assert isinstance(statement, Print)
+
+    class Kinds:
+        def visit_print_stmt(self, node: stmt.Print) -> str:
+            return "print " + node.expression.accept(self)
+
+        def visit_binary_expr(self, node: expr.Binary) -> str:
+            return "binary"
+
+    assert statement.accept(Kinds()) == "print binary"
+
+
+def test_expression_precedence_and_associativity(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(error, "had_error", False)
+    source = "a = b.c = -x * y + z and p and q or r;\n1 + 2 = 3;\n"
+    statements = Parser(Scanner(source).iter_tokens()).parse()
+    assert statements[1] is None
+    assert "Invalid assignment target." in capsys.readouterr().out
+    statement = statements[0]
+    assert isinstance(statement, stmt.Expression)
+    assert print_ast(statement.expression) == (
+        "(= a (= (. b c) (or (and (+ (* (- x) y) z) (and p q)) r)))"
+    )
@@ -0,0 +1,57 @@
+import textwrap
+
+import pytest
+
+from lox import Lox
+
+
+def test_profile_counts_calls_and_call_sites(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        fun count(n) {
+            if (n == 0) return 0;
+            return count(n - 1);
+        }
+        class Point {
+            init(x) { this.x = x; }
+        }
+        count(3);
+        Point(1);
+        clock();
+        """
+    )
+    lox = Lox(profile=True)
+    lox.run(source)
+    assert lox.profiler is not None
+    entries = {entry.name: entry for entry in lox.profiler.entries.values()}
+    assert entries["count"].calls == 4
+    assert entries["count"].line == 1
+    assert entries["count"].call_sites == {3: 3, 8: 1}
+    assert entries["Point()"].calls == 1
+    assert entries["Point.init"].call_sites == {9: 1}
+    assert entries["clock"].calls == 1
+    for entry in entries.values():
+        assert 0 <= entry.exclusive <= entry.inclusive
+
+
+def test_profile_tells_same_named_methods_apart():
+    source = textwrap.dedent(
+        """\
+        class A { m() { return 1; } } class B < A { m() { return 2; } }
+        A().m();
+        var m = B().m;
+        m();
+        m();
+        """
+    )
+    lox = Lox(profile=True)
+    lox.run(source)
+    assert lox.profiler is not None
+    calls = {entry.name: entry.calls for entry in lox.profiler.entries.values()}
+    assert calls["A.m"] == 1
+    assert calls["B.m"] == 2
+
+
+def test_profile_requires_tree_engine():
+    with pytest.raises(ValueError):
+        Lox(engine="closure", profile=True)
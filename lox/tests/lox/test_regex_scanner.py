@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from lox.regex_scanner import RegexScanner
+from lox.scanner import Scanner
+
+SOURCES = [
+    "",
+    'var a = "multi\nline";\nprint a;',
+    "fun f(x) { return x >= 1.5 and !(x == 2) or x != 3.; } // trailing",
+    "class A < B { init() { this.x_1 = super.y; } }\n\r\t1.2.3 a.b",
+    '@ # é\n"unterminated\n',
+    "a/b//c\n/d<=e<f>g>=h!i",
+]
+
+
+def scan(scanner_class: type[Scanner] | type[RegexScanner], source: str, capsys):
+    tokens = scanner_class(source).scan_tokens()
+    return tokens, capsys.readouterr().out
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_same_tokens_as_scanner(source: str, capsys: pytest.CaptureFixture[str]):
+    assert scan(RegexScanner, source, capsys) == scan(Scanner, source, capsys)
+
+
+def test_same_tokens_on_random_input(capsys: pytest.CaptureFixture[str]):
+    alphabet = 'ab_Z09 .\n\t"/=!<>(){};,+-*@'
+    rng = random.Random(8)
+    for _ in range(300):
+        source = "".join(rng.choices(alphabet, k=rng.randint(0, 40)))
+        assert scan(RegexScanner, source, capsys) == scan(Scanner, source, capsys)
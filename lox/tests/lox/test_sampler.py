@@ -0,0 +1,62 @@
+import sys
+import textwrap
+from typing import Any
+
+import pytest
+
+from lox import Lox
+from lox.callable import LoxCallable
+from lox.sampler import Sampler, lox_stack
+
+
+class Snapshot(LoxCallable):
+    def __init__(self) -> None:
+        self.stacks: list[str] = []
+
+    @property
+    def arity(self) -> int:
+        return 0
+
+    def __call__(self, interpreter: Any, arguments: list[Any]) -> Any:
+        self.stacks.append(lox_stack(sys._getframe()))
+
+
+@pytest.mark.parametrize("engine", ["tree", "closure"])
+def test_lox_stack(engine: str):
+    source = textwrap.dedent(
+        """\
+        fun inner() {
+            snapshot();
+        }
+        class Outer {
+            run() { inner(); }
+        }
+        Outer().run();
+        snapshot();
+        """
+    )
+    lox = Lox(engine=engine)
+    snapshot = Snapshot()
+    lox.interpreter.global_env.define("snapshot", snapshot)
+    lox.run(source)
+    assert snapshot.stacks == ["main;run:5;inner:1", "main"]
+
+
+def test_sampler_writes_collapsed_stacks(tmp_path):
+    lox = Lox()
+    lox.run("fun spin() { var i = 0; while (i < 2000) i = i + 1; }")
+    with Sampler(rate=1000) as sampler:
+        # keep spinning until a sample has landed inside spin, so that a slow
+        # machine (or a late sampler thread) can't leave the profile empty
+        for _ in range(1000):
+            lox.run("spin();")
+            if any("spin:1" in stack for stack in list(sampler.stacks)):
+                break
+    path = tmp_path / "stacks.txt"
+    sampler.write(str(path))
+    lines = path.read_text().splitlines()
+    assert any(line.startswith("main;spin:1 ") for line in lines)
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("main")
+        assert int(count) > 0
@@ -0,0 +1,52 @@
+import textwrap
+import tracemalloc
+
+import pytest
+
+from lox import Lox
+
+
+def test_stats_count_runtime_events(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        class Point {
+            init(x) { this.x = x; }
+            get() { return this.x; }
+        }
+        fun depth(n) {
+            if (n == 0) return 0;
+            return 1 + depth(n - 1);
+        }
+        var p = Point(1);
+        var get = p.get;
+        print get() + depth(3);
+        print nil + 1;
+        """
+    )
+    lox = Lox(stats=True)
+    lox.run(source)
+    assert capsys.readouterr().out.startswith("4\nOperands must be")
+    assert lox.stats is not None
+    stats = lox.stats.as_dict()
+    assert stats["statements"]["Print"] == 2
+    assert stats["expressions"]["Call"] == 6
+    assert stats["instances"] == 1
+    assert stats["binds"] == 1
+    assert stats["runtime_errors"] == 1
+    assert stats["peak_depth"] == 4
+    assert stats["environments"] == 8
+    assert stats["peak_memory"] > 0
+
+
+def test_stats_require_tree_engine():
+    with pytest.raises(ValueError):
+        Lox(engine="stack", stats=True)
+
+
+def test_stats_leave_existing_tracing_on():
+    tracemalloc.start()
+    try:
+        Lox(stats=True).run("print 1;")
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -1,64 +1,156 @@
+import argparse
 import io
-import sys
+import re
 import textwrap
 from pathlib import Path
 
+# filled in by the resolver, so they don't take part in comparisons
+RESOLVED = [
+    "depth: int | None = field(default=None, compare=False)",
+    "slot: int = field(default=0, compare=False)",
+]
+# the statement's first token, which gives its line to the debugger even when
+# its expressions have no tokens of their own (print "literal";)
+FIRST_TOKEN = ["token: Token | None = field(default=None, compare=False)"]
+
 
 def generate_ast():
-    if len(sys.argv) == 1:
-        print("Usage: generate_ast <output directory>")
-        sys.exit(64)
-    output_dir = sys.argv[1]
+    parser = argparse.ArgumentParser(prog="generate_ast")
+    parser.add_argument("output_dir", help="where to write expr.py and stmt.py")
+    output_dir = parser.parse_args().output_dir
     define_ast(
         output_dir,
         "Expr",
         [
+            "Assign   = name: Token, value: Expr",
             "Binary   = left: Expr, operator: Token, right: Expr",
+            "Call     = callee: Expr, paren: Token, arguments: list[Expr]",
+            "Get      = obj: Expr, name: Token",
             "Grouping = expression: Expr",
-            "Literal  = value: str | float | None",
+            "Literal  = value: str | float | bool | None",
+            "Logical  = left: Expr, operator: Token, right: Expr",
+            "Set      = obj: Expr, name: Token, value: Expr",
+            "Super    = keyword: Token, method: Token",
+            "This     = keyword: Token",
             "Unary    = operator: Token, right: Expr",
+            "Variable = name: Token",
         ],
+        ["from lox.token_type import Token"],
+        {"Assign": RESOLVED, "Super": RESOLVED, "This": RESOLVED, "Variable": RESOLVED},
+    )
+    define_ast(
+        output_dir,
+        "Stmt",
+        [
+            "Block      = statements: list[Stmt | None]",
+            "Class      = name: Token, superclass: Variable | None, "
+            "methods: list[Function]",
+            "Expression = expression: Expr",
+            "Function   = name: Token, params: list[Token], body: list[Stmt | None]",
+            "If         = condition: Expr, then_branch: Stmt, else_branch: Stmt | None",
+            "Print      = expression: Expr",
+            "Return     = keyword: Token, value: Expr | None",
+            "While      = condition: Expr, body: Stmt",
+            "Var        = name: Token, initializer: Expr | None",
+        ],
+        ["from lox.expr import Expr, Variable", "from lox.token_type import Token"],
+        {
+            "Expression": FIRST_TOKEN,
+            "If": FIRST_TOKEN,
+            "Print": FIRST_TOKEN,
+            "Return": ["tail_call: bool = field(default=False, compare=False)"],
+            "While": FIRST_TOKEN,
+        },
     )
 
 
-def define_ast(output_dir: str, base_name: str, types: list[str]):
+def define_ast(
+    output_dir: str,
+    base_name: str,
+    types: list[str],
+    imports: list[str],
+    extra_fields: dict[str, list[str]],
+):
+    # Nodes are slotted, and each has an integer kind, its index in KINDS, that
+    # can index a dispatch table in place of an isinstance chain.
     path = Path(output_dir) / f"{base_name.lower()}.py"
+    parsed = []
+    for typ in types:
+        class_name, fields = typ.split("=")
+        class_name = class_name.strip()
+        field_list = [field.strip() for field in fields.split(",")]
+        parsed.append((class_name, field_list + extra_fields.get(class_name, [])))
     with open(path, "w", encoding="utf-8") as f:
-        src = textwrap.dedent(
-            f"""\
-            # Generated by {Path(__file__).name}
-            from dataclasses import dataclass
+        f.write(
+            textwrap.dedent(
+                f"""\
+                # Generated by {Path(__file__).name}
+                from __future__ import annotations
 
-            from lox.token_type import Token
+                from dataclasses import dataclass, field
+                from typing import ClassVar, Protocol, TypeVar
 
+                """
+            )
+        )
+        f.write("".join(f"{line}\n" for line in imports))
+        f.write('\nR = TypeVar("R", covariant=True)\n')
+        define_visitor(f, base_name, [class_name for class_name, _ in parsed])
+        f.write(
+            textwrap.dedent(
+                f"""\
+
+
+                @dataclass(slots=True)
+                class {base_name}:
+                    kind: ClassVar[int]
 
-            @dataclass(frozen=True)
-            class {base_name}:
-                pass
-            """
+                    def accept(self, visitor: {base_name}Visitor[R]) -> R:
+                        raise NotImplementedError
+                """
+            )
         )
-        f.write(src)
+        for kind, (class_name, field_list) in enumerate(parsed):
+            define_type(f, base_name, class_name, kind, field_list)
+        f.write(f"\n\nKINDS: tuple[type[{base_name}], ...] = (\n")
+        f.write("".join(f"    {class_name},\n" for class_name, _ in parsed))
+        f.write(")\n")
+
+
+def visit_method(base_name: str, class_name: str) -> str:
+    snake = re.sub(r"(?<!^)(?=[A-Z])", "_", class_name).lower()
+    return f"visit_{snake}_{base_name.lower()}"
+
 
-        for typ in types:
-            class_name, fields = typ.split("=")
-            class_name = class_name.strip()
-            field_list = fields.strip().split(",")
-            field_list = [field.strip() for field in field_list]
-            define_type(f, base_name, class_name, field_list)
+def define_visitor(f: io.TextIOBase, base_name: str, class_names: list[str]):
+    f.write(f"\n\nclass {base_name}Visitor(Protocol[R]):\n")
+    for class_name in class_names:
+        method = visit_method(base_name, class_name)
+        argument = base_name.lower()
+        f.write(f"    def {method}(self, {argument}: {class_name}) -> R:\n")
+        f.write("        ...\n")
+        if class_name != class_names[-1]:
+            f.write("\n")
 
 
 def define_type(
-    f: io.TextIOBase, base_name: str, class_name: str, field_list: list[str]
+    f: io.TextIOBase,
+    base_name: str,
+    class_name: str,
+    kind: int,
+    field_list: list[str],
 ):
-    field_list = [field + "\n" for field in field_list]
     src = "\n\n"
     src += textwrap.dedent(
         f"""\
-        @dataclass(frozen=True)
+        @dataclass(slots=True)
         class {class_name}({base_name}):
+            kind: ClassVar[int] = {kind}
         """
     )
-    src += f"    {'    '.join(field for field in field_list)}"
+    src += "".join(f"    {field}\n" for field in field_list)
+    src += f"\n    def accept(self, visitor: {base_name}Visitor[R]) -> R:\n"
+    src += f"        return visitor.{visit_method(base_name, class_name)}(self)\n"
     f.write(src)
 
 
@@ -1,2 +1,55 @@
+import argparse
+import sys
+
+from lox2.compiler import compile
+from lox2.debug import disassemble_function
+from lox2.vm import VM, InterpretResult
+
+
 def main():
-    print("Hello, world!")
\ No newline at end of file
+    parser = argparse.ArgumentParser(prog="lox2")
+    parser.add_argument("script", nargs="?")
+    parser.add_argument(
+        "--disassemble",
+        action="store_true",
+        help="print the compiled bytecode instead of running the script",
+    )
+    args = parser.parse_args()
+    if args.script is None:
+        repl()
+    elif args.disassemble:
+        disassemble_file(args.script)
+    else:
+        run_file(args.script)
+
+
+def repl():
+    vm = VM()
+    while True:
+        try:
+            line = input("> ")
+        except EOFError:
+            print("exit")
+            break
+        if line == "":
+            break
+        vm.interpret(line)
+
+
+def run_file(path: str):
+    with open(path) as f:
+        source = f.read()
+    result = VM().interpret(source)
+    if result == InterpretResult.COMPILE_ERROR:
+        sys.exit(65)
+    if result == InterpretResult.RUNTIME_ERROR:
+        sys.exit(70)
+
+
+def disassemble_file(path: str):
+    with open(path) as f:
+        source = f.read()
+    function = compile(source)
+    if function is None:
+        sys.exit(65)
+    print(disassemble_function(function))
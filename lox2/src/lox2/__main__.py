@@ -0,0 +1,4 @@
+from lox2 import main
+
+if __name__ == "__main__":
+    main()
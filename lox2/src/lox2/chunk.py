@@ -0,0 +1,75 @@
+from enum import IntEnum, auto
+from typing import Any
+
+
+class OpCode(IntEnum):
+    CONSTANT = 0
+    NIL = auto()
+    TRUE = auto()
+    FALSE = auto()
+    POP = auto()
+    GET_LOCAL = auto()
+    SET_LOCAL = auto()
+    GET_GLOBAL = auto()
+    DEFINE_GLOBAL = auto()
+    SET_GLOBAL = auto()
+    GET_UPVALUE = auto()
+    SET_UPVALUE = auto()
+    GET_PROPERTY = auto()
+    SET_PROPERTY = auto()
+    GET_SUPER = auto()
+    EQUAL = auto()
+    GREATER = auto()
+    LESS = auto()
+    ADD = auto()
+    SUBTRACT = auto()
+    MULTIPLY = auto()
+    DIVIDE = auto()
+    NOT = auto()
+    NEGATE = auto()
+    PRINT = auto()
+    JUMP = auto()
+    JUMP_IF_FALSE = auto()
+    LOOP = auto()
+    CALL = auto()
+    INVOKE = auto()
+    SUPER_INVOKE = auto()
+    CLOSURE = auto()
+    CLOSE_UPVALUE = auto()
+    RETURN = auto()
+    CLASS = auto()
+    INHERIT = auto()
+    METHOD = auto()
+
+
+class Chunk:
+    def __init__(self) -> None:
+        self.code = bytearray()
+        self.constants: list[Any] = []
+        # run-length encoded as [line, count, line, count, ...]
+        self.lines: list[int] = []
+        self.constant_indices: dict[tuple[type, Any], int] = {}
+
+    def write(self, byte: int, line: int):
+        self.code.append(byte)
+        if self.lines and self.lines[-2] == line:
+            self.lines[-1] += 1
+        else:
+            self.lines.append(line)
+            self.lines.append(1)
+
+    def add_constant(self, value: Any) -> int:
+        key = (type(value), value)
+        index = self.constant_indices.get(key)
+        if index is None:
+            self.constants.append(value)
+            index = len(self.constants) - 1
+            self.constant_indices[key] = index
+        return index
+
+    def get_line(self, offset: int) -> int:
+        for i in range(0, len(self.lines), 2):
+            offset -= self.lines[i + 1]
+            if offset < 0:
+                return self.lines[i]
+        return self.lines[-2]
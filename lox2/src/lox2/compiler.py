@@ -0,0 +1,726 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from enum import Enum, IntEnum, auto
+from typing import Any, Callable
+
+from lox2.chunk import Chunk, OpCode
+from lox2.object import ObjFunction
+from lox2.scanner import Scanner, Token, TokenType
+
+UINT8_COUNT = 256
+
+
+class Precedence(IntEnum):
+    NONE = 0
+    ASSIGNMENT = auto()  # =
+    OR = auto()  # or
+    AND = auto()  # and
+    EQUALITY = auto()  # == !=
+    COMPARISON = auto()  # < > <= >=
+    TERM = auto()  # + -
+    FACTOR = auto()  # * /
+    UNARY = auto()  # ! -
+    CALL = auto()  # . ()
+    PRIMARY = auto()
+
+
+class FunctionType(Enum):
+    FUNCTION = auto()
+    INITIALIZER = auto()
+    METHOD = auto()
+    SCRIPT = auto()
+
+
+ParseFn = Callable[["Compiler", bool], None]
+
+
+@dataclass
+class ParseRule:
+    prefix: ParseFn | None
+    infix: ParseFn | None
+    precedence: Precedence
+
+
+@dataclass
+class Local:
+    name: str
+    depth: int
+    is_captured: bool = False
+
+
+@dataclass
+class Upvalue:
+    index: int
+    is_local: bool
+
+
+class FunctionState:
+    def __init__(
+        self, enclosing: FunctionState | None, typ: FunctionType, name: str | None
+    ) -> None:
+        self.enclosing = enclosing
+        self.function = ObjFunction(name)
+        self.type = typ
+        # slot zero holds the callee, or the receiver inside methods
+        is_method = typ in (FunctionType.METHOD, FunctionType.INITIALIZER)
+        self.locals: list[Local] = [Local("this" if is_method else "", 0)]
+        self.upvalues: list[Upvalue] = []
+        self.scope_depth = 0
+
+
+class ClassState:
+    def __init__(self, enclosing: ClassState | None) -> None:
+        self.enclosing = enclosing
+        self.has_superclass = False
+
+
+class Compiler:
+    def __init__(self, source: str) -> None:
+        self.scanner = Scanner(source)
+        self.current: Token = Token(TokenType.EOF, "", 1)
+        self.previous: Token = self.current
+        self.had_error = False
+        self.panic_mode = False
+        self.function_state = FunctionState(None, FunctionType.SCRIPT, None)
+        self.class_state: ClassState | None = None
+
+    def compile(self) -> ObjFunction | None:
+        self.advance()
+        while not self.match(TokenType.EOF):
+            self.declaration()
+        function = self.end_compiler()
+        return None if self.had_error else function
+
+    # token handling
+    def advance(self):
+        self.previous = self.current
+        while True:
+            self.current = self.scanner.scan_token()
+            if self.current.type != TokenType.ERROR:
+                break
+            self.error_at_current(self.current.lexeme)
+
+    def consume(self, typ: TokenType, message: str):
+        if self.current.type == typ:
+            self.advance()
+            return
+        self.error_at_current(message)
+
+    def check(self, typ: TokenType) -> bool:
+        return self.current.type == typ
+
+    def match(self, typ: TokenType) -> bool:
+        if not self.check(typ):
+            return False
+        self.advance()
+        return True
+
+    # error reporting
+    def error_at_current(self, message: str):
+        self.error_at(self.current, message)
+
+    def error(self, message: str):
+        self.error_at(self.previous, message)
+
+    def error_at(self, token: Token, message: str):
+        if self.panic_mode:
+            return
+        self.panic_mode = True
+        if token.type == TokenType.EOF:
+            where = " at end"
+        elif token.type == TokenType.ERROR:
+            where = ""
+        else:
+            where = f" at '{token.lexeme}'"
+        print(f"[line {token.line}] Error{where}: {message}", file=sys.stderr)
+        self.had_error = True
+
+    def synchronize(self):
+        self.panic_mode = False
+        while self.current.type != TokenType.EOF:
+            if self.previous.type == TokenType.SEMICOLON:
+                return
+            if self.current.type in (
+                TokenType.CLASS,
+                TokenType.FUN,
+                TokenType.VAR,
+                TokenType.FOR,
+                TokenType.IF,
+                TokenType.WHILE,
+                TokenType.PRINT,
+                TokenType.RETURN,
+            ):
+                return
+            self.advance()
+
+    # bytecode emission
+    def current_chunk(self) -> Chunk:
+        return self.function_state.function.chunk
+
+    def emit_byte(self, byte: int):
+        self.current_chunk().write(byte, self.previous.line)
+
+    def emit_bytes(self, byte1: int, byte2: int):
+        self.emit_byte(byte1)
+        self.emit_byte(byte2)
+
+    def emit_loop(self, loop_start: int):
+        self.emit_byte(OpCode.LOOP)
+        offset = len(self.current_chunk().code) - loop_start + 2
+        if offset > 0xFFFF:
+            self.error("Loop body too large.")
+        self.emit_byte((offset >> 8) & 0xFF)
+        self.emit_byte(offset & 0xFF)
+
+    def emit_jump(self, instruction: int) -> int:
+        self.emit_byte(instruction)
+        self.emit_byte(0xFF)
+        self.emit_byte(0xFF)
+        return len(self.current_chunk().code) - 2
+
+    def patch_jump(self, offset: int):
+        code = self.current_chunk().code
+        jump = len(code) - offset - 2
+        if jump > 0xFFFF:
+            self.error("Too much code to jump over.")
+        code[offset] = (jump >> 8) & 0xFF
+        code[offset + 1] = jump & 0xFF
+
+    def emit_return(self):
+        if self.function_state.type == FunctionType.INITIALIZER:
+            self.emit_bytes(OpCode.GET_LOCAL, 0)
+        else:
+            self.emit_byte(OpCode.NIL)
+        self.emit_byte(OpCode.RETURN)
+
+    def make_constant(self, value: Any) -> int:
+        constant = self.current_chunk().add_constant(value)
+        if constant >= UINT8_COUNT:
+            self.error("Too many constants in one chunk.")
+            return 0
+        return constant
+
+    def emit_constant(self, value: Any):
+        self.emit_bytes(OpCode.CONSTANT, self.make_constant(value))
+
+    def end_compiler(self) -> ObjFunction:
+        self.emit_return()
+        function = self.function_state.function
+        if self.function_state.enclosing is not None:
+            self.function_state = self.function_state.enclosing
+        return function
+
+    # scopes and variables
+    def begin_scope(self):
+        self.function_state.scope_depth += 1
+
+    def end_scope(self):
+        state = self.function_state
+        state.scope_depth -= 1
+        while state.locals and state.locals[-1].depth > state.scope_depth:
+            if state.locals[-1].is_captured:
+                self.emit_byte(OpCode.CLOSE_UPVALUE)
+            else:
+                self.emit_byte(OpCode.POP)
+            state.locals.pop()
+
+    def identifier_constant(self, name: Token) -> int:
+        return self.make_constant(name.lexeme)
+
+    def resolve_local(self, state: FunctionState, name: Token) -> int:
+        for i in reversed(range(len(state.locals))):
+            local = state.locals[i]
+            if local.name == name.lexeme:
+                if local.depth == -1:
+                    self.error("Can't read local variable in its own initializer.")
+                return i
+        return -1
+
+    def add_upvalue(self, state: FunctionState, index: int, is_local: bool) -> int:
+        for i, upvalue in enumerate(state.upvalues):
+            if upvalue.index == index and upvalue.is_local == is_local:
+                return i
+        if len(state.upvalues) == UINT8_COUNT:
+            self.error("Too many closure variables in function.")
+            return 0
+        state.upvalues.append(Upvalue(index, is_local))
+        state.function.upvalue_count = len(state.upvalues)
+        return len(state.upvalues) - 1
+
+    def resolve_upvalue(self, state: FunctionState, name: Token) -> int:
+        if state.enclosing is None:
+            return -1
+        local = self.resolve_local(state.enclosing, name)
+        if local != -1:
+            state.enclosing.locals[local].is_captured = True
+            return self.add_upvalue(state, local, True)
+        upvalue = self.resolve_upvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.add_upvalue(state, upvalue, False)
+        return -1
+
+    def add_local(self, name: Token):
+        if len(self.function_state.locals) == UINT8_COUNT:
+            self.error("Too many local variables in function.")
+            return
+        self.function_state.locals.append(Local(name.lexeme, -1))
+
+    def declare_variable(self):
+        state = self.function_state
+        if state.scope_depth == 0:
+            return
+        name = self.previous
+        for local in reversed(state.locals):
+            if local.depth != -1 and local.depth < state.scope_depth:
+                break
+            if local.name == name.lexeme:
+                self.error("Already a variable with this name in this scope.")
+        self.add_local(name)
+
+    def parse_variable(self, message: str) -> int:
+        self.consume(TokenType.IDENTIFIER, message)
+        self.declare_variable()
+        if self.function_state.scope_depth > 0:
+            return 0
+        return self.identifier_constant(self.previous)
+
+    def mark_initialized(self):
+        state = self.function_state
+        if state.scope_depth == 0:
+            return
+        state.locals[-1].depth = state.scope_depth
+
+    def define_variable(self, global_: int):
+        if self.function_state.scope_depth > 0:
+            self.mark_initialized()
+            return
+        self.emit_bytes(OpCode.DEFINE_GLOBAL, global_)
+
+    def named_variable(self, name: Token, can_assign: bool):
+        arg = self.resolve_local(self.function_state, name)
+        if arg != -1:
+            get_op, set_op = OpCode.GET_LOCAL, OpCode.SET_LOCAL
+        else:
+            arg = self.resolve_upvalue(self.function_state, name)
+            if arg != -1:
+                get_op, set_op = OpCode.GET_UPVALUE, OpCode.SET_UPVALUE
+            else:
+                arg = self.identifier_constant(name)
+                get_op, set_op = OpCode.GET_GLOBAL, OpCode.SET_GLOBAL
+        if can_assign and self.match(TokenType.EQUAL):
+            self.expression()
+            self.emit_bytes(set_op, arg)
+        else:
+            self.emit_bytes(get_op, arg)
+
+    def argument_list(self) -> int:
+        arg_count = 0
+        if not self.check(TokenType.RIGHT_PAREN):
+            while True:
+                self.expression()
+                if arg_count == 255:
+                    self.error("Can't have more than 255 arguments.")
+                arg_count += 1
+                if not self.match(TokenType.COMMA):
+                    break
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
+        return arg_count
+
+    # expressions
+    def parse_precedence(self, precedence: Precedence):
+        self.advance()
+        prefix_rule = rules[self.previous.type].prefix
+        if prefix_rule is None:
+            self.error("Expect expression.")
+            return
+        can_assign = precedence <= Precedence.ASSIGNMENT
+        prefix_rule(self, can_assign)
+        while precedence <= rules[self.current.type].precedence:
+            self.advance()
+            infix_rule = rules[self.previous.type].infix
+            assert infix_rule is not None
+            infix_rule(self, can_assign)
+        if can_assign and self.match(TokenType.EQUAL):
+            self.error("Invalid assignment target.")
+
+    def expression(self):
+        self.parse_precedence(Precedence.ASSIGNMENT)
+
+    def number(self, can_assign: bool):
+        self.emit_constant(float(self.previous.lexeme))
+
+    def string(self, can_assign: bool):
+        self.emit_constant(self.previous.lexeme[1:-1])
+
+    def literal(self, can_assign: bool):
+        match self.previous.type:
+            case TokenType.FALSE:
+                self.emit_byte(OpCode.FALSE)
+            case TokenType.NIL:
+                self.emit_byte(OpCode.NIL)
+            case TokenType.TRUE:
+                self.emit_byte(OpCode.TRUE)
+            case _:
+                raise Exception("Must not be reached")
+
+    def grouping(self, can_assign: bool):
+        self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+
+    def unary(self, can_assign: bool):
+        operator_type = self.previous.type
+        self.parse_precedence(Precedence.UNARY)
+        match operator_type:
+            case TokenType.BANG:
+                self.emit_byte(OpCode.NOT)
+            case TokenType.MINUS:
+                self.emit_byte(OpCode.NEGATE)
+            case _:
+                raise Exception("Must not be reached")
+
+    def binary(self, can_assign: bool):
+        operator_type = self.previous.type
+        rule = rules[operator_type]
+        self.parse_precedence(Precedence(rule.precedence + 1))
+        match operator_type:
+            case TokenType.BANG_EQUAL:
+                self.emit_bytes(OpCode.EQUAL, OpCode.NOT)
+            case TokenType.EQUAL_EQUAL:
+                self.emit_byte(OpCode.EQUAL)
+            case TokenType.GREATER:
+                self.emit_byte(OpCode.GREATER)
+            case TokenType.GREATER_EQUAL:
+                self.emit_bytes(OpCode.LESS, OpCode.NOT)
+            case TokenType.LESS:
+                self.emit_byte(OpCode.LESS)
+            case TokenType.LESS_EQUAL:
+                self.emit_bytes(OpCode.GREATER, OpCode.NOT)
+            case TokenType.PLUS:
+                self.emit_byte(OpCode.ADD)
+            case TokenType.MINUS:
+                self.emit_byte(OpCode.SUBTRACT)
+            case TokenType.STAR:
+                self.emit_byte(OpCode.MULTIPLY)
+            case TokenType.SLASH:
+                self.emit_byte(OpCode.DIVIDE)
+            case _:
+                raise Exception("Must not be reached")
+
+    def and_(self, can_assign: bool):
+        end_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.emit_byte(OpCode.POP)
+        self.parse_precedence(Precedence.AND)
+        self.patch_jump(end_jump)
+
+    def or_(self, can_assign: bool):
+        else_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        end_jump = self.emit_jump(OpCode.JUMP)
+        self.patch_jump(else_jump)
+        self.emit_byte(OpCode.POP)
+        self.parse_precedence(Precedence.OR)
+        self.patch_jump(end_jump)
+
+    def variable(self, can_assign: bool):
+        self.named_variable(self.previous, can_assign)
+
+    def call(self, can_assign: bool):
+        arg_count = self.argument_list()
+        self.emit_bytes(OpCode.CALL, arg_count)
+
+    def dot(self, can_assign: bool):
+        self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+        name = self.identifier_constant(self.previous)
+        if can_assign and self.match(TokenType.EQUAL):
+            self.expression()
+            self.emit_bytes(OpCode.SET_PROPERTY, name)
+        elif self.match(TokenType.LEFT_PAREN):
+            arg_count = self.argument_list()
+            self.emit_bytes(OpCode.INVOKE, name)
+            self.emit_byte(arg_count)
+        else:
+            self.emit_bytes(OpCode.GET_PROPERTY, name)
+
+    def this(self, can_assign: bool):
+        if self.class_state is None:
+            self.error("Can't use 'this' outside of a class.")
+            return
+        self.variable(False)
+
+    def super_(self, can_assign: bool):
+        if self.class_state is None:
+            self.error("Can't use 'super' outside of a class.")
+        elif not self.class_state.has_superclass:
+            self.error("Can't use 'super' in a class with no superclass.")
+        self.consume(TokenType.DOT, "Expect '.' after 'super'.")
+        self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        name = self.identifier_constant(self.previous)
+        self.named_variable(synthetic_token("this"), False)
+        if self.match(TokenType.LEFT_PAREN):
+            arg_count = self.argument_list()
+            self.named_variable(synthetic_token("super"), False)
+            self.emit_bytes(OpCode.SUPER_INVOKE, name)
+            self.emit_byte(arg_count)
+        else:
+            self.named_variable(synthetic_token("super"), False)
+            self.emit_bytes(OpCode.GET_SUPER, name)
+
+    # statements
+    def declaration(self):
+        if self.match(TokenType.CLASS):
+            self.class_declaration()
+        elif self.match(TokenType.FUN):
+            self.fun_declaration()
+        elif self.match(TokenType.VAR):
+            self.var_declaration()
+        else:
+            self.statement()
+        if self.panic_mode:
+            self.synchronize()
+
+    def class_declaration(self):
+        self.consume(TokenType.IDENTIFIER, "Expect class name.")
+        class_name = self.previous
+        name_constant = self.identifier_constant(self.previous)
+        self.declare_variable()
+        self.emit_bytes(OpCode.CLASS, name_constant)
+        self.define_variable(name_constant)
+
+        class_state = ClassState(self.class_state)
+        self.class_state = class_state
+
+        if self.match(TokenType.LESS):
+            self.consume(TokenType.IDENTIFIER, "Expect superclass name.")
+            self.variable(False)
+            if class_name.lexeme == self.previous.lexeme:
+                self.error("A class can't inherit from itself.")
+            self.begin_scope()
+            self.add_local(synthetic_token("super"))
+            self.define_variable(0)
+            self.named_variable(class_name, False)
+            self.emit_byte(OpCode.INHERIT)
+            class_state.has_superclass = True
+
+        self.named_variable(class_name, False)
+        self.consume(TokenType.LEFT_BRACE, "Expect '{' before class body.")
+        while not self.check(TokenType.RIGHT_BRACE) and not self.check(TokenType.EOF):
+            self.method()
+        self.consume(TokenType.RIGHT_BRACE, "Expect '}' after class body.")
+        self.emit_byte(OpCode.POP)
+
+        if class_state.has_superclass:
+            self.end_scope()
+        self.class_state = class_state.enclosing
+
+    def method(self):
+        self.consume(TokenType.IDENTIFIER, "Expect method name.")
+        constant = self.identifier_constant(self.previous)
+        typ = FunctionType.METHOD
+        if self.previous.lexeme == "init":
+            typ = FunctionType.INITIALIZER
+        self.function(typ)
+        self.emit_bytes(OpCode.METHOD, constant)
+
+    def fun_declaration(self):
+        global_ = self.parse_variable("Expect function name.")
+        self.mark_initialized()
+        self.function(FunctionType.FUNCTION)
+        self.define_variable(global_)
+
+    def function(self, typ: FunctionType):
+        state = FunctionState(self.function_state, typ, self.previous.lexeme)
+        self.function_state = state
+        self.begin_scope()
+
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after function name.")
+        if not self.check(TokenType.RIGHT_PAREN):
+            while True:
+                state.function.arity += 1
+                if state.function.arity > 255:
+                    self.error_at_current("Can't have more than 255 parameters.")
+                constant = self.parse_variable("Expect parameter name.")
+                self.define_variable(constant)
+                if not self.match(TokenType.COMMA):
+                    break
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
+        self.consume(TokenType.LEFT_BRACE, "Expect '{' before function body.")
+        self.block()
+
+        function = self.end_compiler()
+        self.emit_bytes(OpCode.CLOSURE, self.make_constant(function))
+        for upvalue in state.upvalues:
+            self.emit_byte(1 if upvalue.is_local else 0)
+            self.emit_byte(upvalue.index)
+
+    def var_declaration(self):
+        global_ = self.parse_variable("Expect variable name.")
+        if self.match(TokenType.EQUAL):
+            self.expression()
+        else:
+            self.emit_byte(OpCode.NIL)
+        self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration.")
+        self.define_variable(global_)
+
+    def statement(self):
+        if self.match(TokenType.PRINT):
+            self.print_statement()
+        elif self.match(TokenType.FOR):
+            self.for_statement()
+        elif self.match(TokenType.IF):
+            self.if_statement()
+        elif self.match(TokenType.RETURN):
+            self.return_statement()
+        elif self.match(TokenType.WHILE):
+            self.while_statement()
+        elif self.match(TokenType.LEFT_BRACE):
+            self.begin_scope()
+            self.block()
+            self.end_scope()
+        else:
+            self.expression_statement()
+
+    def block(self):
+        while not self.check(TokenType.RIGHT_BRACE) and not self.check(TokenType.EOF):
+            self.declaration()
+        self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
+
+    def print_statement(self):
+        self.expression()
+        self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
+        self.emit_byte(OpCode.PRINT)
+
+    def return_statement(self):
+        if self.function_state.type == FunctionType.SCRIPT:
+            self.error("Can't return from top-level code.")
+        if self.match(TokenType.SEMICOLON):
+            self.emit_return()
+            return
+        if self.function_state.type == FunctionType.INITIALIZER:
+            self.error("Can't return a value from an initializer.")
+        self.expression()
+        self.consume(TokenType.SEMICOLON, "Expect ';' after return value.")
+        self.emit_byte(OpCode.RETURN)
+
+    def expression_statement(self):
+        self.expression()
+        self.consume(TokenType.SEMICOLON, "Expect ';' after expression.")
+        self.emit_byte(OpCode.POP)
+
+    def if_statement(self):
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
+        self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after condition.")
+
+        then_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.emit_byte(OpCode.POP)
+        self.statement()
+        else_jump = self.emit_jump(OpCode.JUMP)
+
+        self.patch_jump(then_jump)
+        self.emit_byte(OpCode.POP)
+        if self.match(TokenType.ELSE):
+            self.statement()
+        self.patch_jump(else_jump)
+
+    def while_statement(self):
+        loop_start = len(self.current_chunk().code)
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
+        self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after condition.")
+
+        exit_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.emit_byte(OpCode.POP)
+        self.statement()
+        self.emit_loop(loop_start)
+
+        self.patch_jump(exit_jump)
+        self.emit_byte(OpCode.POP)
+
+    def for_statement(self):
+        self.begin_scope()
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
+        if self.match(TokenType.SEMICOLON):
+            pass
+        elif self.match(TokenType.VAR):
+            self.var_declaration()
+        else:
+            self.expression_statement()
+
+        loop_start = len(self.current_chunk().code)
+        exit_jump = -1
+        if not self.match(TokenType.SEMICOLON):
+            self.expression()
+            self.consume(TokenType.SEMICOLON, "Expect ';' after loop condition.")
+            exit_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+            self.emit_byte(OpCode.POP)
+
+        if not self.match(TokenType.RIGHT_PAREN):
+            body_jump = self.emit_jump(OpCode.JUMP)
+            increment_start = len(self.current_chunk().code)
+            self.expression()
+            self.emit_byte(OpCode.POP)
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after for clauses.")
+            self.emit_loop(loop_start)
+            loop_start = increment_start
+            self.patch_jump(body_jump)
+
+        self.statement()
+        self.emit_loop(loop_start)
+
+        if exit_jump != -1:
+            self.patch_jump(exit_jump)
+            self.emit_byte(OpCode.POP)
+        self.end_scope()
+
+
+def synthetic_token(text: str) -> Token:
+    return Token(TokenType.IDENTIFIER, text, 0)
+
+
+rules: dict[TokenType, ParseRule] = {
+    TokenType.LEFT_PAREN: ParseRule(Compiler.grouping, Compiler.call, Precedence.CALL),
+    TokenType.RIGHT_PAREN: ParseRule(None, None, Precedence.NONE),
+    TokenType.LEFT_BRACE: ParseRule(None, None, Precedence.NONE),
+    TokenType.RIGHT_BRACE: ParseRule(None, None, Precedence.NONE),
+    TokenType.COMMA: ParseRule(None, None, Precedence.NONE),
+    TokenType.DOT: ParseRule(None, Compiler.dot, Precedence.CALL),
+    TokenType.MINUS: ParseRule(Compiler.unary, Compiler.binary, Precedence.TERM),
+    TokenType.PLUS: ParseRule(None, Compiler.binary, Precedence.TERM),
+    TokenType.SEMICOLON: ParseRule(None, None, Precedence.NONE),
+    TokenType.SLASH: ParseRule(None, Compiler.binary, Precedence.FACTOR),
+    TokenType.STAR: ParseRule(None, Compiler.binary, Precedence.FACTOR),
+    TokenType.BANG: ParseRule(Compiler.unary, None, Precedence.NONE),
+    TokenType.BANG_EQUAL: ParseRule(None, Compiler.binary, Precedence.EQUALITY),
+    TokenType.EQUAL: ParseRule(None, None, Precedence.NONE),
+    TokenType.EQUAL_EQUAL: ParseRule(None, Compiler.binary, Precedence.EQUALITY),
+    TokenType.GREATER: ParseRule(None, Compiler.binary, Precedence.COMPARISON),
+    TokenType.GREATER_EQUAL: ParseRule(None, Compiler.binary, Precedence.COMPARISON),
+    TokenType.LESS: ParseRule(None, Compiler.binary, Precedence.COMPARISON),
+    TokenType.LESS_EQUAL: ParseRule(None, Compiler.binary, Precedence.COMPARISON),
+    TokenType.IDENTIFIER: ParseRule(Compiler.variable, None, Precedence.NONE),
+    TokenType.STRING: ParseRule(Compiler.string, None, Precedence.NONE),
+    TokenType.NUMBER: ParseRule(Compiler.number, None, Precedence.NONE),
+    TokenType.AND: ParseRule(None, Compiler.and_, Precedence.AND),
+    TokenType.CLASS: ParseRule(None, None, Precedence.NONE),
+    TokenType.ELSE: ParseRule(None, None, Precedence.NONE),
+    TokenType.FALSE: ParseRule(Compiler.literal, None, Precedence.NONE),
+    TokenType.FOR: ParseRule(None, None, Precedence.NONE),
+    TokenType.FUN: ParseRule(None, None, Precedence.NONE),
+    TokenType.IF: ParseRule(None, None, Precedence.NONE),
+    TokenType.NIL: ParseRule(Compiler.literal, None, Precedence.NONE),
+    TokenType.OR: ParseRule(None, Compiler.or_, Precedence.OR),
+    TokenType.PRINT: ParseRule(None, None, Precedence.NONE),
+    TokenType.RETURN: ParseRule(None, None, Precedence.NONE),
+    TokenType.SUPER: ParseRule(Compiler.super_, None, Precedence.NONE),
+    TokenType.THIS: ParseRule(Compiler.this, None, Precedence.NONE),
+    TokenType.TRUE: ParseRule(Compiler.literal, None, Precedence.NONE),
+    TokenType.VAR: ParseRule(None, None, Precedence.NONE),
+    TokenType.WHILE: ParseRule(None, None, Precedence.NONE),
+    TokenType.ERROR: ParseRule(None, None, Precedence.NONE),
+    TokenType.EOF: ParseRule(None, None, Precedence.NONE),
+}
+
+
+def compile(source: str) -> ObjFunction | None:
+    return Compiler(source).compile()
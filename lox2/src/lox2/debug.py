@@ -0,0 +1,79 @@
+from lox2.chunk import Chunk, OpCode
+from lox2.object import ObjFunction
+
+BYTE_INSTRUCTIONS = {
+    OpCode.GET_LOCAL,
+    OpCode.SET_LOCAL,
+    OpCode.GET_UPVALUE,
+    OpCode.SET_UPVALUE,
+    OpCode.CALL,
+}
+CONSTANT_INSTRUCTIONS = {
+    OpCode.CONSTANT,
+    OpCode.GET_GLOBAL,
+    OpCode.DEFINE_GLOBAL,
+    OpCode.SET_GLOBAL,
+    OpCode.GET_PROPERTY,
+    OpCode.SET_PROPERTY,
+    OpCode.GET_SUPER,
+    OpCode.CLASS,
+    OpCode.METHOD,
+}
+INVOKE_INSTRUCTIONS = {OpCode.INVOKE, OpCode.SUPER_INVOKE}
+
+
+def disassemble_chunk(chunk: Chunk, name: str) -> str:
+    lines = [f"== {name} =="]
+    offset = 0
+    while offset < len(chunk.code):
+        text, offset = disassemble_instruction(chunk, offset)
+        lines.append(text)
+    return "\n".join(lines)
+
+
+def disassemble_function(function: ObjFunction) -> str:
+    sections = [disassemble_chunk(function.chunk, str(function))]
+    for constant in function.chunk.constants:
+        if isinstance(constant, ObjFunction):
+            sections.append(disassemble_function(constant))
+    return "\n\n".join(sections)
+
+
+def disassemble_instruction(chunk: Chunk, offset: int) -> tuple[str, int]:
+    line = chunk.get_line(offset)
+    if offset > 0 and line == chunk.get_line(offset - 1):
+        prefix = f"{offset:04d}    | "
+    else:
+        prefix = f"{offset:04d} {line:4d} "
+    op = OpCode(chunk.code[offset])
+    name = f"OP_{op.name}"
+    code = chunk.code
+    if op in BYTE_INSTRUCTIONS:
+        return f"{prefix}{name:<16} {code[offset + 1]:4d}", offset + 2
+    if op in CONSTANT_INSTRUCTIONS:
+        constant = code[offset + 1]
+        value = chunk.constants[constant]
+        return f"{prefix}{name:<16} {constant:4d} '{value}'", offset + 2
+    if op in INVOKE_INSTRUCTIONS:
+        constant = code[offset + 1]
+        arg_count = code[offset + 2]
+        value = chunk.constants[constant]
+        text = f"{prefix}{name:<16} ({arg_count} args) {constant:4d} '{value}'"
+        return text, offset + 3
+    if op in (OpCode.JUMP, OpCode.JUMP_IF_FALSE, OpCode.LOOP):
+        jump = code[offset + 1] << 8 | code[offset + 2]
+        sign = -1 if op == OpCode.LOOP else 1
+        target = offset + 3 + sign * jump
+        return f"{prefix}{name:<16} {offset:4d} -> {target}", offset + 3
+    if op == OpCode.CLOSURE:
+        constant = code[offset + 1]
+        function: ObjFunction = chunk.constants[constant]
+        lines = [f"{prefix}{name:<16} {constant:4d} {function}"]
+        offset += 2
+        for _ in range(function.upvalue_count):
+            kind = "local" if code[offset] else "upvalue"
+            index = code[offset + 1]
+            lines.append(f"{offset:04d}      |{' ' * 21}{kind} {index}")
+            offset += 2
+        return "\n".join(lines), offset
+    return f"{prefix}{name}", offset + 1
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from lox2.chunk import Chunk
+
+
+class ObjFunction:
+    def __init__(self, name: str | None = None) -> None:
+        self.arity = 0
+        self.upvalue_count = 0
+        self.chunk = Chunk()
+        self.name = name
+
+    def __str__(self) -> str:
+        if self.name is None:
+            return "<script>"
+        return f"<fn {self.name}>"
+
+
+class ObjNative:
+    def __init__(self, name: str, arity: int, function: Callable[..., Any]) -> None:
+        self.name = name
+        self.arity = arity
+        self.function = function
+
+    def __str__(self) -> str:
+        return "<native fn>"
+
+
+class ObjUpvalue:
+    # An open upvalue points into the VM stack; closing it moves the value into
+    # a private one-element list so reads and writes never need to branch.
+    __slots__ = ("slots", "index")
+
+    def __init__(self, slots: list[Any], index: int) -> None:
+        self.slots = slots
+        self.index = index
+
+    def close(self):
+        self.slots = [self.slots[self.index]]
+        self.index = 0
+
+
+class ObjClosure:
+    __slots__ = ("function", "upvalues")
+
+    def __init__(self, function: ObjFunction, upvalues: list[ObjUpvalue]) -> None:
+        self.function = function
+        self.upvalues = upvalues
+
+    def __str__(self) -> str:
+        return str(self.function)
+
+
+class ObjClass:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.methods: dict[str, ObjClosure] = {}
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class ObjInstance:
+    __slots__ = ("klass", "fields")
+
+    def __init__(self, klass: ObjClass) -> None:
+        self.klass = klass
+        self.fields: dict[str, Any] = {}
+
+    def __str__(self) -> str:
+        return f"{self.klass.name} instance"
+
+
+class ObjBoundMethod:
+    __slots__ = ("receiver", "method")
+
+    def __init__(self, receiver: Any, method: ObjClosure) -> None:
+        self.receiver = receiver
+        self.method = method
+
+    def __str__(self) -> str:
+        return str(self.method.function)
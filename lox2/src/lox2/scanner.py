@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from enum import Enum, auto
+
+
+class TokenType(Enum):
+    LEFT_PAREN = auto()
+    RIGHT_PAREN = auto()
+    LEFT_BRACE = auto()
+    RIGHT_BRACE = auto()
+    COMMA = auto()
+    DOT = auto()
+    MINUS = auto()
+    PLUS = auto()
+    SEMICOLON = auto()
+    SLASH = auto()
+    STAR = auto()
+
+    BANG = auto()
+    BANG_EQUAL = auto()
+    EQUAL = auto()
+    EQUAL_EQUAL = auto()
+    GREATER = auto()
+    GREATER_EQUAL = auto()
+    LESS = auto()
+    LESS_EQUAL = auto()
+
+    IDENTIFIER = auto()
+    STRING = auto()
+    NUMBER = auto()
+
+    AND = auto()
+    CLASS = auto()
+    ELSE = auto()
+    FALSE = auto()
+    FUN = auto()
+    FOR = auto()
+    IF = auto()
+    NIL = auto()
+    OR = auto()
+    PRINT = auto()
+    RETURN = auto()
+    SUPER = auto()
+    THIS = auto()
+    TRUE = auto()
+    VAR = auto()
+    WHILE = auto()
+
+    ERROR = auto()
+    EOF = auto()
+
+
+@dataclass(frozen=True)
+class Token:
+    type: TokenType
+    lexeme: str
+    line: int
+
+
+keywords = {
+    "and": TokenType.AND,
+    "class": TokenType.CLASS,
+    "else": TokenType.ELSE,
+    "false": TokenType.FALSE,
+    "for": TokenType.FOR,
+    "fun": TokenType.FUN,
+    "if": TokenType.IF,
+    "nil": TokenType.NIL,
+    "or": TokenType.OR,
+    "print": TokenType.PRINT,
+    "return": TokenType.RETURN,
+    "super": TokenType.SUPER,
+    "this": TokenType.THIS,
+    "true": TokenType.TRUE,
+    "var": TokenType.VAR,
+    "while": TokenType.WHILE,
+}
+
+single_char_tokens = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ";": TokenType.SEMICOLON,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+}
+
+two_char_tokens = {
+    "!": (TokenType.BANG, TokenType.BANG_EQUAL),
+    "=": (TokenType.EQUAL, TokenType.EQUAL_EQUAL),
+    "<": (TokenType.LESS, TokenType.LESS_EQUAL),
+    ">": (TokenType.GREATER, TokenType.GREATER_EQUAL),
+}
+
+DIGITS = frozenset("0123456789")
+ALPHA = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+ALNUM = ALPHA | DIGITS
+
+
+class Scanner:
+    def __init__(self, source: str):
+        self.source = source
+        self.start = 0
+        self.current = 0
+        self.line = 1
+
+    def scan_token(self) -> Token:
+        self.skip_whitespace()
+        self.start = self.current
+        if self.is_at_end():
+            return self.make_token(TokenType.EOF)
+
+        c = self.advance()
+        if c in ALPHA:
+            return self.identifier()
+        if c in DIGITS:
+            return self.number()
+        if c in single_char_tokens:
+            return self.make_token(single_char_tokens[c])
+        if c in two_char_tokens:
+            single, double = two_char_tokens[c]
+            return self.make_token(double if self.match("=") else single)
+        if c == '"':
+            return self.string()
+        return self.error_token("Unexpected character.")
+
+    def is_at_end(self) -> bool:
+        return self.current >= len(self.source)
+
+    def advance(self) -> str:
+        self.current += 1
+        return self.source[self.current - 1]
+
+    def peek(self) -> str:
+        if self.is_at_end():
+            return "\0"
+        return self.source[self.current]
+
+    def peek_next(self) -> str:
+        if self.current + 1 >= len(self.source):
+            return "\0"
+        return self.source[self.current + 1]
+
+    def match(self, expected: str) -> bool:
+        if self.is_at_end() or self.source[self.current] != expected:
+            return False
+        self.current += 1
+        return True
+
+    def make_token(self, typ: TokenType) -> Token:
+        return Token(typ, self.source[self.start : self.current], self.line)
+
+    def error_token(self, message: str) -> Token:
+        return Token(TokenType.ERROR, message, self.line)
+
+    def skip_whitespace(self):
+        while True:
+            c = self.peek()
+            if c in " \r\t":
+                self.advance()
+            elif c == "\n":
+                self.line += 1
+                self.advance()
+            elif c == "/" and self.peek_next() == "/":
+                while self.peek() != "\n" and not self.is_at_end():
+                    self.advance()
+            else:
+                return
+
+    def identifier(self) -> Token:
+        while self.peek() in ALNUM:
+            self.advance()
+        text = self.source[self.start : self.current]
+        return self.make_token(keywords.get(text, TokenType.IDENTIFIER))
+
+    def number(self) -> Token:
+        while self.peek() in DIGITS:
+            self.advance()
+        if self.peek() == "." and self.peek_next() in DIGITS:
+            self.advance()
+            while self.peek() in DIGITS:
+                self.advance()
+        return self.make_token(TokenType.NUMBER)
+
+    def string(self) -> Token:
+        while self.peek() != '"' and not self.is_at_end():
+            if self.peek() == "\n":
+                self.line += 1
+            self.advance()
+        if self.is_at_end():
+            return self.error_token("Unterminated string.")
+        self.advance()
+        return self.make_token(TokenType.STRING)
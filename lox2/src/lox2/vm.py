@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+import sys
+import time
+from enum import Enum, auto
+from typing import Any
+
+from lox2.chunk import OpCode
+from lox2.compiler import compile
+from lox2.object import (
+    ObjBoundMethod,
+    ObjClass,
+    ObjClosure,
+    ObjFunction,
+    ObjInstance,
+    ObjNative,
+    ObjUpvalue,
+)
+
+FRAMES_MAX = 1024
+
+# plain ints so the dispatch loop compares against cached globals
+OP_CONSTANT = OpCode.CONSTANT.value
+OP_NIL = OpCode.NIL.value
+OP_TRUE = OpCode.TRUE.value
+OP_FALSE = OpCode.FALSE.value
+OP_POP = OpCode.POP.value
+OP_GET_LOCAL = OpCode.GET_LOCAL.value
+OP_SET_LOCAL = OpCode.SET_LOCAL.value
+OP_GET_GLOBAL = OpCode.GET_GLOBAL.value
+OP_DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+OP_SET_GLOBAL = OpCode.SET_GLOBAL.value
+OP_GET_UPVALUE = OpCode.GET_UPVALUE.value
+OP_SET_UPVALUE = OpCode.SET_UPVALUE.value
+OP_GET_PROPERTY = OpCode.GET_PROPERTY.value
+OP_SET_PROPERTY = OpCode.SET_PROPERTY.value
+OP_GET_SUPER = OpCode.GET_SUPER.value
+OP_EQUAL = OpCode.EQUAL.value
+OP_GREATER = OpCode.GREATER.value
+OP_LESS = OpCode.LESS.value
+OP_ADD = OpCode.ADD.value
+OP_SUBTRACT = OpCode.SUBTRACT.value
+OP_MULTIPLY = OpCode.MULTIPLY.value
+OP_DIVIDE = OpCode.DIVIDE.value
+OP_NOT = OpCode.NOT.value
+OP_NEGATE = OpCode.NEGATE.value
+OP_PRINT = OpCode.PRINT.value
+OP_JUMP = OpCode.JUMP.value
+OP_JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+OP_LOOP = OpCode.LOOP.value
+OP_CALL = OpCode.CALL.value
+OP_INVOKE = OpCode.INVOKE.value
+OP_SUPER_INVOKE = OpCode.SUPER_INVOKE.value
+OP_CLOSURE = OpCode.CLOSURE.value
+OP_CLOSE_UPVALUE = OpCode.CLOSE_UPVALUE.value
+OP_RETURN = OpCode.RETURN.value
+OP_CLASS = OpCode.CLASS.value
+OP_INHERIT = OpCode.INHERIT.value
+OP_METHOD = OpCode.METHOD.value
+
+
+class InterpretResult(Enum):
+    OK = auto()
+    COMPILE_ERROR = auto()
+    RUNTIME_ERROR = auto()
+
+
+class VMRuntimeError(Exception):
+    pass
+
+
+class CallFrame:
+    __slots__ = ("closure", "ip", "slots")
+
+    def __init__(self, closure: ObjClosure, ip: int, slots: int) -> None:
+        self.closure = closure
+        self.ip = ip
+        self.slots = slots
+
+
+def stringify(value: Any) -> str:
+    if value is None:
+        return "nil"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, float):
+        text = str(value)
+        if text.endswith(".0"):
+            text = text[:-2]
+        return text
+    return str(value)
+
+
+def clock_native(*args: Any) -> float:
+    return time.time()
+
+
+class VM:
+    def __init__(self) -> None:
+        self.stack: list[Any] = []
+        self.frames: list[CallFrame] = []
+        self.globals: dict[str, Any] = {}
+        self.open_upvalues: dict[int, ObjUpvalue] = {}
+        self.define_native("clock", 0, clock_native)
+
+    def define_native(self, name: str, arity: int, function: Any):
+        self.globals[name] = ObjNative(name, arity, function)
+
+    def interpret(self, source: str) -> InterpretResult:
+        function = compile(source)
+        if function is None:
+            return InterpretResult.COMPILE_ERROR
+        closure = ObjClosure(function, [])
+        self.stack.append(closure)
+        self.call(closure, 0)
+        return self.run()
+
+    def reset_stack(self):
+        self.stack.clear()
+        self.frames.clear()
+        self.open_upvalues.clear()
+
+    def runtime_error(self, message: str):
+        print(message, file=sys.stderr)
+        for frame in reversed(self.frames):
+            function = frame.closure.function
+            line = function.chunk.get_line(frame.ip - 1)
+            where = "script" if function.name is None else f"{function.name}()"
+            print(f"[line {line}] in {where}", file=sys.stderr)
+        self.reset_stack()
+
+    # calls
+    def call(self, closure: ObjClosure, arg_count: int):
+        if arg_count != closure.function.arity:
+            raise VMRuntimeError(
+                f"Expected {closure.function.arity} arguments but got {arg_count}."
+            )
+        if len(self.frames) == FRAMES_MAX:
+            raise VMRuntimeError("Stack overflow.")
+        self.frames.append(CallFrame(closure, 0, len(self.stack) - arg_count - 1))
+
+    def call_value(self, callee: Any, arg_count: int):
+        typ = type(callee)
+        if typ is ObjClosure:
+            self.call(callee, arg_count)
+        elif typ is ObjBoundMethod:
+            self.stack[-arg_count - 1] = callee.receiver
+            self.call(callee.method, arg_count)
+        elif typ is ObjClass:
+            self.stack[-arg_count - 1] = ObjInstance(callee)
+            initializer = callee.methods.get("init")
+            if initializer is not None:
+                self.call(initializer, arg_count)
+            elif arg_count != 0:
+                raise VMRuntimeError(f"Expected 0 arguments but got {arg_count}.")
+        elif typ is ObjNative:
+            if arg_count != callee.arity:
+                raise VMRuntimeError(
+                    f"Expected {callee.arity} arguments but got {arg_count}."
+                )
+            stack = self.stack
+            result = callee.function(*stack[len(stack) - arg_count :])
+            del stack[len(stack) - arg_count - 1 :]
+            stack.append(result)
+        else:
+            raise VMRuntimeError("Can only call functions and classes.")
+
+    def invoke_from_class(self, klass: ObjClass, name: str, arg_count: int):
+        method = klass.methods.get(name)
+        if method is None:
+            raise VMRuntimeError(f"Undefined property '{name}'.")
+        self.call(method, arg_count)
+
+    def invoke(self, name: str, arg_count: int):
+        receiver = self.stack[-arg_count - 1]
+        if type(receiver) is not ObjInstance:
+            raise VMRuntimeError("Only instances have methods.")
+        value = receiver.fields.get(name, receiver)
+        if value is not receiver:
+            self.stack[-arg_count - 1] = value
+            self.call_value(value, arg_count)
+            return
+        self.invoke_from_class(receiver.klass, name, arg_count)
+
+    def bind_method(self, klass: ObjClass, name: str):
+        method = klass.methods.get(name)
+        if method is None:
+            raise VMRuntimeError(f"Undefined property '{name}'.")
+        self.stack[-1] = ObjBoundMethod(self.stack[-1], method)
+
+    # upvalues
+    def capture_upvalue(self, index: int) -> ObjUpvalue:
+        upvalue = self.open_upvalues.get(index)
+        if upvalue is None:
+            upvalue = ObjUpvalue(self.stack, index)
+            self.open_upvalues[index] = upvalue
+        return upvalue
+
+    def close_upvalues(self, last: int):
+        open_upvalues = self.open_upvalues
+        for index in [index for index in open_upvalues if index >= last]:
+            open_upvalues.pop(index).close()
+
+    def run(self) -> InterpretResult:
+        stack = self.stack
+        frames = self.frames
+        globals_ = self.globals
+        open_upvalues = self.open_upvalues
+
+        frame = frames[-1]
+        closure = frame.closure
+        code = closure.function.chunk.code
+        constants = closure.function.chunk.constants
+        ip = frame.ip
+        slots = frame.slots
+
+        try:
+            while True:
+                op = code[ip]
+                ip += 1
+                if op == OP_GET_LOCAL:
+                    stack.append(stack[slots + code[ip]])
+                    ip += 1
+                elif op == OP_CONSTANT:
+                    stack.append(constants[code[ip]])
+                    ip += 1
+                elif op == OP_POP:
+                    stack.pop()
+                elif op == OP_GET_GLOBAL:
+                    name = constants[code[ip]]
+                    ip += 1
+                    try:
+                        stack.append(globals_[name])
+                    except KeyError:
+                        raise VMRuntimeError(f"Undefined variable '{name}'.")
+                elif op == OP_SET_LOCAL:
+                    stack[slots + code[ip]] = stack[-1]
+                    ip += 1
+                elif op == OP_JUMP_IF_FALSE:
+                    value = stack[-1]
+                    if value is None or value is False:
+                        ip += (code[ip] << 8 | code[ip + 1]) + 2
+                    else:
+                        ip += 2
+                elif op == OP_LOOP:
+                    ip -= (code[ip] << 8 | code[ip + 1]) - 2
+                elif op == OP_JUMP:
+                    ip += (code[ip] << 8 | code[ip + 1]) + 2
+                elif op == OP_LESS:
+                    b = stack.pop()
+                    a = stack[-1]
+                    if not isinstance(a, float) or not isinstance(b, float):
+                        raise VMRuntimeError("Operands must be numbers.")
+                    stack[-1] = a < b
+                elif op == OP_GREATER:
+                    b = stack.pop()
+                    a = stack[-1]
+                    if not isinstance(a, float) or not isinstance(b, float):
+                        raise VMRuntimeError("Operands must be numbers.")
+                    stack[-1] = a > b
+                elif op == OP_ADD:
+                    b = stack.pop()
+                    a = stack[-1]
+                    if isinstance(a, float) and isinstance(b, float):
+                        stack[-1] = a + b
+                    elif isinstance(a, str) and isinstance(b, str):
+                        stack[-1] = a + b
+                    else:
+                        raise VMRuntimeError(
+                            "Operands must be two numbers or two strings."
+                        )
+                elif op == OP_SUBTRACT:
+                    b = stack.pop()
+                    a = stack[-1]
+                    if not isinstance(a, float) or not isinstance(b, float):
+                        raise VMRuntimeError("Operands must be numbers.")
+                    stack[-1] = a - b
+                elif op == OP_MULTIPLY:
+                    b = stack.pop()
+                    a = stack[-1]
+                    if not isinstance(a, float) or not isinstance(b, float):
+                        raise VMRuntimeError("Operands must be numbers.")
+                    stack[-1] = a * b
+                elif op == OP_DIVIDE:
+                    b = stack.pop()
+                    a = stack[-1]
+                    if not isinstance(a, float) or not isinstance(b, float):
+                        raise VMRuntimeError("Operands must be numbers.")
+                    stack[-1] = a / b
+                elif op == OP_EQUAL:
+                    b = stack.pop()
+                    a = stack[-1]
+                    stack[-1] = type(a) is type(b) and a == b
+                elif op == OP_NOT:
+                    value = stack[-1]
+                    stack[-1] = value is None or value is False
+                elif op == OP_NEGATE:
+                    value = stack[-1]
+                    if not isinstance(value, float):
+                        raise VMRuntimeError("Operand must be a number.")
+                    stack[-1] = -value
+                elif op == OP_GET_UPVALUE:
+                    upvalue = closure.upvalues[code[ip]]
+                    ip += 1
+                    stack.append(upvalue.slots[upvalue.index])
+                elif op == OP_SET_UPVALUE:
+                    upvalue = closure.upvalues[code[ip]]
+                    ip += 1
+                    upvalue.slots[upvalue.index] = stack[-1]
+                elif op == OP_GET_PROPERTY:
+                    instance = stack[-1]
+                    if type(instance) is not ObjInstance:
+                        raise VMRuntimeError("Only instances have properties.")
+                    name = constants[code[ip]]
+                    ip += 1
+                    fields = instance.fields
+                    if name in fields:
+                        stack[-1] = fields[name]
+                    else:
+                        self.bind_method(instance.klass, name)
+                elif op == OP_SET_PROPERTY:
+                    instance = stack[-2]
+                    if type(instance) is not ObjInstance:
+                        raise VMRuntimeError("Only instances have fields.")
+                    value = stack.pop()
+                    instance.fields[constants[code[ip]]] = value
+                    ip += 1
+                    stack[-1] = value
+                elif op == OP_INVOKE:
+                    name = constants[code[ip]]
+                    arg_count = code[ip + 1]
+                    frame.ip = ip + 2
+                    self.invoke(name, arg_count)
+                    frame = frames[-1]
+                    closure = frame.closure
+                    code = closure.function.chunk.code
+                    constants = closure.function.chunk.constants
+                    ip = frame.ip
+                    slots = frame.slots
+                elif op == OP_CALL:
+                    arg_count = code[ip]
+                    frame.ip = ip + 1
+                    self.call_value(stack[-arg_count - 1], arg_count)
+                    frame = frames[-1]
+                    closure = frame.closure
+                    code = closure.function.chunk.code
+                    constants = closure.function.chunk.constants
+                    ip = frame.ip
+                    slots = frame.slots
+                elif op == OP_RETURN:
+                    result = stack.pop()
+                    if open_upvalues:
+                        self.close_upvalues(slots)
+                    frames.pop()
+                    if not frames:
+                        stack.pop()
+                        return InterpretResult.OK
+                    del stack[slots:]
+                    stack.append(result)
+                    frame = frames[-1]
+                    closure = frame.closure
+                    code = closure.function.chunk.code
+                    constants = closure.function.chunk.constants
+                    ip = frame.ip
+                    slots = frame.slots
+                elif op == OP_NIL:
+                    stack.append(None)
+                elif op == OP_TRUE:
+                    stack.append(True)
+                elif op == OP_FALSE:
+                    stack.append(False)
+                elif op == OP_PRINT:
+                    print(stringify(stack.pop()))
+                elif op == OP_DEFINE_GLOBAL:
+                    globals_[constants[code[ip]]] = stack.pop()
+                    ip += 1
+                elif op == OP_SET_GLOBAL:
+                    name = constants[code[ip]]
+                    ip += 1
+                    if name not in globals_:
+                        raise VMRuntimeError(f"Undefined variable '{name}'.")
+                    globals_[name] = stack[-1]
+                elif op == OP_CLOSURE:
+                    function: ObjFunction = constants[code[ip]]
+                    ip += 1
+                    upvalues: list[ObjUpvalue] = []
+                    for _ in range(function.upvalue_count):
+                        is_local = code[ip]
+                        index = code[ip + 1]
+                        ip += 2
+                        if is_local:
+                            upvalues.append(self.capture_upvalue(slots + index))
+                        else:
+                            upvalues.append(closure.upvalues[index])
+                    stack.append(ObjClosure(function, upvalues))
+                elif op == OP_CLOSE_UPVALUE:
+                    self.close_upvalues(len(stack) - 1)
+                    stack.pop()
+                elif op == OP_GET_SUPER:
+                    name = constants[code[ip]]
+                    ip += 1
+                    superclass = stack.pop()
+                    self.bind_method(superclass, name)
+                elif op == OP_SUPER_INVOKE:
+                    name = constants[code[ip]]
+                    arg_count = code[ip + 1]
+                    frame.ip = ip + 2
+                    superclass = stack.pop()
+                    self.invoke_from_class(superclass, name, arg_count)
+                    frame = frames[-1]
+                    closure = frame.closure
+                    code = closure.function.chunk.code
+                    constants = closure.function.chunk.constants
+                    ip = frame.ip
+                    slots = frame.slots
+                elif op == OP_CLASS:
+                    stack.append(ObjClass(constants[code[ip]]))
+                    ip += 1
+                elif op == OP_INHERIT:
+                    superclass = stack[-2]
+                    if type(superclass) is not ObjClass:
+                        raise VMRuntimeError("Superclass must be a class.")
+                    subclass: ObjClass = stack.pop()
+                    subclass.methods.update(superclass.methods)
+                elif op == OP_METHOD:
+                    method = stack.pop()
+                    klass: ObjClass = stack[-1]
+                    klass.methods[constants[code[ip]]] = method
+                    ip += 1
+                else:
+                    raise Exception(f"Unknown opcode {op}")
+        except VMRuntimeError as e:
+            if frames and frames[-1] is frame:
+                frame.ip = ip
+            self.runtime_error(str(e))
+            return InterpretResult.RUNTIME_ERROR
@@ -0,0 +1,191 @@
+import textwrap
+
+import pytest
+
+from lox2.vm import VM, InterpretResult
+
+
+def test_for_fibonacci(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        var a = 0;
+        var temp;
+        for (var b = 1; a < 10; b = temp + b) {
+            print a;
+            temp = a;
+            a = b;
+        }
+        """
+    )
+    expected = textwrap.dedent(
+        """\
+        0
+        1
+        1
+        2
+        3
+        5
+        8
+        """
+    )
+    assert VM().interpret(source) == InterpretResult.OK
+    assert capsys.readouterr().out == expected
+
+
+def test_scope(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        var a = "global a";
+        var b = "global b";
+        {
+            var a = "outer a";
+            {
+                var a = "inner a";
+                print a;
+                print b;
+            }
+            print a;
+        }
+        print a;
+        """
+    )
+    expected = textwrap.dedent(
+        """\
+        inner a
+        global b
+        outer a
+        global a
+        """
+    )
+    VM().interpret(source)
+    assert capsys.readouterr().out == expected
+
+
+def test_fibonacci_recursion(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        fun fib(n) {
+            if (n <= 1) return n;
+            return fib(n - 2) + fib(n - 1);
+        }
+        print fib(15);
+        """
+    )
+    VM().interpret(source)
+    assert capsys.readouterr().out == "610\n"
+
+
+def test_closures(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        fun makeCounter() {
+            var i = 0;
+            fun count() {
+                i = i + 1;
+                print i;
+            }
+            return count;
+        }
+        var counter = makeCounter();
+        counter();
+        counter();
+
+        var globalGet;
+        var globalSet;
+        {
+            var a = "initial";
+            fun set() { a = "updated"; }
+            fun get() { print a; }
+            globalSet = set;
+            globalGet = get;
+        }
+        globalSet();
+        globalGet();
+        """
+    )
+    expected = textwrap.dedent(
+        """\
+        1
+        2
+        updated
+        """
+    )
+    VM().interpret(source)
+    assert capsys.readouterr().out == expected
+
+
+def test_classes(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        class Doughnut {
+            init(topping) {
+                this.topping = topping;
+            }
+            cook() {
+                print "Fry until golden brown.";
+            }
+        }
+        class BostonCream < Doughnut {
+            cook() {
+                super.cook();
+                print "Pipe full of " + this.topping + ".";
+            }
+        }
+        class Glazed < BostonCream {}
+        var d = Glazed("custard");
+        d.cook();
+        var cook = d.cook;
+        cook();
+        print d;
+        print Glazed;
+        print d.init("jam") == d;
+        """
+    )
+    expected = textwrap.dedent(
+        """\
+        Fry until golden brown.
+        Pipe full of custard.
+        Fry until golden brown.
+        Pipe full of custard.
+        Glazed instance
+        Glazed
+        true
+        """
+    )
+    VM().interpret(source)
+    assert capsys.readouterr().out == expected
+
+
+def test_compile_error(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        class Foo {
+            init() {
+                return "something else";
+            }
+        }
+        """
+    )
+    assert VM().interpret(source) == InterpretResult.COMPILE_ERROR
+    expected = "[line 3] Error at 'return': Can't return a value from an initializer.\n"
+    assert capsys.readouterr().err == expected
+
+
+def test_runtime_error(capsys: pytest.CaptureFixture[str]):
+    source = textwrap.dedent(
+        """\
+        fun add(a, b) {
+            return a + b;
+        }
+        print add(1, "two");
+        """
+    )
+    assert VM().interpret(source) == InterpretResult.RUNTIME_ERROR
+    expected = textwrap.dedent(
+        """\
+        Operands must be two numbers or two strings.
+        [line 2] in add()
+        [line 4] in script
+        """
+    )
+    assert capsys.readouterr().err == expected